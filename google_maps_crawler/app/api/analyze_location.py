@@ -2,13 +2,53 @@
 API endpoint for location analysis
 """
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, List, Optional
+from math import cos, radians
 from ..crawler.business_analyzer import BusinessAnalyzer
+from ..crawler.road_sampler import RoadSampler
 from ..database.postgres_client import PostgresClient
+from .exports import ndjson_chunks, encode_chunks
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+MAX_BATCH_POINTS = 10000
+
+_analyzer: Optional[BusinessAnalyzer] = None
+
+
+def get_analyzer() -> BusinessAnalyzer:
+    """Shared analyzer - PostgresClient() checks out a test connection, so build it once"""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = BusinessAnalyzer(PostgresClient())
+    return _analyzer
+
+
+class LocationPoint(BaseModel):
+    lat: float
+    lon: float
+
+
+class BatchAnalyzeRequest(BaseModel):
+    points: Optional[List[LocationPoint]] = None
+    bbox: Optional[List[float]] = None  # min_lat, min_lon, max_lat, max_lon
+    spacing_meters: int = 500
+    radius: float = 0.5
+
+
+def _grid_size(bbox: List[float], spacing_meters: int) -> int:
+    """Number of points generate_grid_points would return (without building them)"""
+    min_lat, min_lon, max_lat, max_lon = bbox
+    lat_spacing = spacing_meters / 111000
+    lon_spacing = spacing_meters / (111000 * abs(cos(radians((min_lat + max_lat) / 2))))
+    return (int((max_lat - min_lat) / lat_spacing) + 1) * (int((max_lon - min_lon) / lon_spacing) + 1)
+
+
 @router.get("/analyze-location")
 async def analyze_location(
     lat: float = Query(..., description="Latitude"),
@@ -17,23 +57,71 @@ async def analyze_location(
 ):
     """
     Analyze business potential for a specific location
-    
+
     Returns:
     - score: 0-100
-    - rating: Excellent/Very Good/Good/Fair/Poor/Very Poor  
+    - rating: Excellent/Very Good/Good/Fair/Poor/Very Poor
     - recommendation: Text recommendation
     - business_insights: Best business types and challenges
     - score_breakdown: Detailed scoring components
     """
     try:
-        db = PostgresClient()
-        analyzer = BusinessAnalyzer(db)
-        
+        analyzer = get_analyzer()
+
         # Get analysis
-        analysis = analyzer.analyze_location(lat, lon, radius)
-        
+        analysis = await run_in_threadpool(analyzer.analyze_location, lat, lon, radius)
+
         return analysis
-        
+
     except Exception as e:
         logger.error(f"Error analyzing location: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/analyze-location/batch")
+async def analyze_locations_batch(request: BatchAnalyzeRequest):
+    """
+    Analyze many locations in one call, streamed back as NDJSON
+
+    Pass either `points` ([{lat, lon}, ...]) or `bbox` [min_lat, min_lon, max_lat, max_lon]
+    with `spacing_meters` to score a grid. Each line is {index, lat, lon, analysis}
+    in input order; a failure mid-stream ends with an {"error": ...} line.
+    """
+    if bool(request.points) == bool(request.bbox):
+        raise HTTPException(status_code=400, detail="Pass either points or bbox")
+
+    if request.bbox:
+        if len(request.bbox) != 4:
+            raise HTTPException(status_code=400, detail="bbox must be [min_lat, min_lon, max_lat, max_lon]")
+        min_lat, min_lon, max_lat, max_lon = request.bbox
+        if min_lat > max_lat or min_lon > max_lon or request.spacing_meters <= 0:
+            raise HTTPException(status_code=400, detail="Invalid bbox or spacing")
+        # Longitude spacing divides by cos(latitude), which is 0 at the poles
+        if min_lat <= -90 or max_lat >= 90 or min_lon < -180 or max_lon > 180:
+            raise HTTPException(status_code=400, detail="bbox latitudes must be within (-90, 90), longitudes within [-180, 180]")
+        if _grid_size(request.bbox, request.spacing_meters) > MAX_BATCH_POINTS:
+            raise HTTPException(status_code=400, detail=f"Grid exceeds {MAX_BATCH_POINTS} points, increase spacing_meters")
+        points = RoadSampler.generate_grid_points(tuple(request.bbox), request.spacing_meters)
+    else:
+        points = [(p.lat, p.lon) for p in request.points]
+        if any(not -90 <= lat <= 90 or not -180 <= lon <= 180 for lat, lon in points):
+            raise HTTPException(status_code=400, detail="Point coordinates out of range")
+
+    if len(points) > MAX_BATCH_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_POINTS} points per batch")
+
+    analyzer = get_analyzer()
+
+    async def rows() -> AsyncIterator[dict]:
+        try:
+            async for row in analyzer.iter_analyses(points, request.radius):
+                yield row
+        except Exception as e:
+            logger.error(f"Error in batch location analysis: {e}")
+            yield {"error": str(e)}
+
+    return StreamingResponse(
+        encode_chunks(ndjson_chunks(rows()), gzip=False),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Points": str(len(points))}
+    )
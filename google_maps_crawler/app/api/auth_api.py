@@ -3,10 +3,12 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
 import jwt
-import bcrypt
 import os
-from ..database.postgres_client import execute_query
+from .. import cache, passwords
+from ..config import AUTH_USER_CACHE_TTL
+from ..database import async_db
 
 router = APIRouter()
 
@@ -36,11 +38,11 @@ class User(BaseModel):
     created_at: datetime
 
 # Helper functions
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await passwords.verify_password(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+async def get_password_hash(password: str) -> str:
+    return await passwords.hash_password(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -52,6 +54,29 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def user_cache_tag(user_key) -> str:
+    return f"user:{user_key}"
+
+async def _load_active_user(user_id: Optional[int], username: str) -> Optional[dict]:
+    if user_id is not None:
+        return await async_db.fetch_one(
+            "SELECT id, username, email, full_name, is_active, is_superuser, created_at FROM users "
+            "WHERE id = %s AND username = %s AND is_active = true",
+            (user_id, username)
+        )
+    return await async_db.fetch_one(
+        "SELECT id, username, email, full_name, is_active, is_superuser, created_at FROM users "
+        "WHERE username = %s AND is_active = true",
+        (username,)
+    )
+
+async def invalidate_user(user_id: int, username: Optional[str] = None):
+    """Drop cached principals of a user (call when it is deactivated or changed)"""
+    tags = [user_cache_tag(user_id)]
+    if username:
+        tags.append(user_cache_tag(username))  # tokens issued without user_id
+    await cache.invalidate(*tags)
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,11 +92,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except jwt.PyJWTError:
         raise credentials_exception
     
-    # Get user from database
-    user = execute_query(
-        "SELECT id, username, email, full_name, is_active, created_at FROM users WHERE username = %s AND is_active = true",
-        (username,),
-        fetch_one=True
+    # Resolved principals are cached per user + token for a few seconds, so
+    # dashboard polling doesn't hit the users table on every request
+    user = await cache.response_cache.get_or_compute(
+        'auth.user',
+        {'user_id': user_id, 'username': username, 'token': hashlib.sha256(token.encode()).hexdigest()},
+        lambda: _load_active_user(user_id, username),
+        ttl=AUTH_USER_CACHE_TTL,
+        tags=(user_cache_tag(user_id or username),)
     )
     if user is None:
         raise credentials_exception
@@ -80,19 +108,38 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 # Routes
 @router.post("/login", response_model=Token)
 async def login(form_data: UserLogin):
+    try:
+        passwords.check_throttle(form_data.username)
+    except passwords.LoginThrottled as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    
     # Get user from database
-    user = execute_query(
+    user = await async_db.fetch_one(
         "SELECT id, username, password_hash, email, full_name, is_active, created_at FROM users WHERE username = %s",
-        (form_data.username,),
-        fetch_one=True
+        (form_data.username,)
     )
     
-    if not user or not verify_password(form_data.password, user['password_hash']):
+    try:
+        valid = bool(user) and await verify_password(form_data.password, user['password_hash'])
+    except passwords.HasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login temporarily unavailable, try again",
+            headers={"Retry-After": "1"},
+        )
+    
+    if not valid:
+        passwords.record_failure(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    passwords.record_success(form_data.username)
     
     if not user['is_active']:
         raise HTTPException(
@@ -108,7 +155,7 @@ async def login(form_data: UserLogin):
     )
     
     # Update last login
-    execute_query(
+    await async_db.execute(
         "UPDATE users SET last_login = %s WHERE id = %s",
         (datetime.utcnow(), user['id'])
     )
@@ -139,4 +186,20 @@ async def read_users_me(current_user: dict = Depends(get_current_user)):
 async def logout(current_user: dict = Depends(get_current_user)):
     # In a real application, you might want to blacklist the token here
     # For now, we'll just return a success message
-    return {"message": "Successfully logged out"}
\ No newline at end of file
+    return {"message": "Successfully logged out"}
+
+@router.post("/users/{user_id}/deactivate")
+async def deactivate_user(user_id: int, current_user: dict = Depends(get_current_user)):
+    """Disable a user account; its tokens stop working immediately"""
+    if not current_user.get('is_superuser'):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    
+    user = await async_db.fetch_one(
+        "UPDATE users SET is_active = false WHERE id = %s RETURNING id, username",
+        (user_id,)
+    )
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    await invalidate_user(user['id'], user['username'])
+    return {"message": "User deactivated", "user_id": user['id']}
@@ -2,13 +2,12 @@
 API endpoints for business data management
 """
 from fastapi import APIRouter, Query, HTTPException
-from fastapi.responses import StreamingResponse
 from typing import Optional
-import csv
-import json
-import io
+import asyncio
 from datetime import datetime
-from ..database.postgres_client import execute_query, get_connection
+from ..database import async_db
+from .exports import EXPORT_FORMATS, export_response
+from .pagination import COUNT_MODES, decode_cursor, encode_cursor, estimate_count, resolve_count_mode
 
 router = APIRouter(prefix="/api/businesses", tags=["businesses"])
 
@@ -16,37 +15,35 @@ router = APIRouter(prefix="/api/businesses", tags=["businesses"])
 async def get_businesses(
     page: int = Query(1, ge=1),
     limit: int = Query(50, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (keyset pagination)"),
+    count: Optional[str] = Query(None, regex=COUNT_MODES, description="exact | estimate | none (default: exact on the first page only)"),
     city: Optional[str] = None,
     road: Optional[str] = None,
     type: Optional[str] = None,
     rating: float = Query(0, ge=0, le=5),
     hasPhone: bool = False
 ):
-    """Get paginated list of businesses with filters"""
-    offset = (page - 1) * limit
-    
+    """
+    Get paginated list of businesses with filters
+    Pass next_cursor back as `cursor` for constant-time paging; `page` still works (OFFSET)
+    """
     # Build WHERE conditions
     conditions = []
     params = []
-    param_count = 0
     
     if city:
-        param_count += 1
         conditions.append(f"b.city ILIKE %s")
         params.append(f"%{city}%")
     
     if road:
-        param_count += 1
         conditions.append(f"r.name ILIKE %s")
         params.append(f"%{road}%")
     
     if type:
-        param_count += 1
         conditions.append(f"%s = ANY(b.types)")
         params.append(type)
     
     if rating > 0:
-        param_count += 1
         conditions.append(f"b.rating >= %s")
         params.append(rating)
     
@@ -55,7 +52,20 @@ async def get_businesses(
     
     where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
     
-    # Get businesses
+    # Keyset: continue after the last row of the previous page
+    page_conditions = list(conditions)
+    page_params = list(params)
+    offset = 0
+    if cursor:
+        after = decode_cursor(cursor, 'crawled_at', 'place_id')
+        page_conditions.append("(b.crawled_at, b.place_id) < (%s, %s)")
+        page_params.extend([after['crawled_at'], after['place_id']])
+    else:
+        offset = (page - 1) * limit
+    
+    page_where = "WHERE " + " AND ".join(page_conditions) if page_conditions else ""
+    
+    # Get businesses (one extra row tells us whether there is a next page)
     query = f"""
         SELECT 
             b.place_id,
@@ -73,13 +83,11 @@ async def get_businesses(
             b.city
         FROM businesses b
         LEFT JOIN osm_roads_main r ON b.road_osm_id = r.osm_id
-        {where_clause}
-        ORDER BY b.crawled_at DESC
+        {page_where}
+        ORDER BY b.crawled_at DESC, b.place_id DESC
         LIMIT %s OFFSET %s
     """
     
-    businesses = execute_query(query, params + [limit, offset])
-    
     # Get stats
     stats_query = f"""
         SELECT 
@@ -92,31 +100,59 @@ async def get_businesses(
         {where_clause}
     """
     
-    stats = execute_query(stats_query, params, fetch_one=True)
+    count_mode = resolve_count_mode(count, cursor)
+    lookups = [async_db.fetch(query, page_params + [limit + 1, offset])]
+    if count_mode == 'exact':
+        lookups.append(async_db.fetch_one(stats_query, params))
+    elif count_mode == 'estimate':
+        lookups.append(estimate_count(
+            f"SELECT 1 FROM businesses b LEFT JOIN osm_roads_main r ON b.road_osm_id = r.osm_id {where_clause}",
+            params
+        ))
+    
+    # Page and stats are independent - run them concurrently
+    businesses, *counted = await asyncio.gather(*lookups)
+    
+    next_cursor = None
+    if len(businesses) > limit:
+        businesses = businesses[:limit]
+        last = businesses[-1]
+        next_cursor = encode_cursor(crawled_at=last['crawled_at'], place_id=last['place_id'])
+    
+    stats = counted[0] if count_mode == 'exact' else None
+    if count_mode == 'exact':
+        total = stats['total'] if stats else 0
+    elif count_mode == 'estimate':
+        total = counted[0]
+    else:
+        total = None
     
     return {
         "businesses": businesses,
-        "total": stats['total'] if stats else 0,
-        "page": page,
+        "total": total,
+        "total_is_estimate": count_mode == 'estimate',
+        "page": page if not cursor else None,
         "limit": limit,
+        "next_cursor": next_cursor,
         "stats": {
-            "total": stats['total'] if stats else 0,
-            "withPhone": stats['with_phone'] if stats else 0,
-            "withWebsite": stats['with_website'] if stats else 0,
+            "total": total,
+            "withPhone": stats['with_phone'] if stats else None,
+            "withWebsite": stats['with_website'] if stats else None,
             "avgRating": float(stats['avg_rating']) if stats and stats['avg_rating'] else 0
-        }
+        } if count_mode == 'exact' else None
     }
 
 @router.get("/export")
 async def export_businesses(
-    format: str = Query("csv", regex="^(csv|json)$"),
+    format: str = Query("csv", regex=EXPORT_FORMATS),
+    gzip: bool = Query(False, description="Compress the download (.gz)"),
     city: Optional[str] = None,
     road: Optional[str] = None,
     type: Optional[str] = None,
     rating: float = Query(0, ge=0, le=5),
     hasPhone: bool = False
 ):
-    """Export businesses to CSV or JSON"""
+    """Export businesses to CSV, JSON or NDJSON (streamed from a server-side cursor)"""
     # Build WHERE conditions (same as above)
     conditions = []
     params = []
@@ -162,44 +198,24 @@ async def export_businesses(
         ORDER BY b.crawled_at DESC
     """
     
-    businesses = execute_query(query, params)
-    
-    if format == "csv":
-        # Create CSV
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=[
+    return export_response(
+        query, params, format,
+        filename_base=f"businesses_{datetime.now().strftime('%Y%m%d')}",
+        fieldnames=[
             'place_id', 'name', 'formatted_address', 'phone_number', 
             'website', 'rating', 'user_ratings_total', 'primary_type',
             'road_name', 'city', 'crawled_at'
-        ])
-        writer.writeheader()
-        writer.writerows(businesses)
-        
-        return StreamingResponse(
-            io.BytesIO(output.getvalue().encode()),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=businesses_{datetime.now().strftime('%Y%m%d')}.csv"
-            }
-        )
-    else:
-        # Return JSON
-        return StreamingResponse(
-            io.BytesIO(json.dumps(businesses, indent=2, default=str).encode()),
-            media_type="application/json",
-            headers={
-                "Content-Disposition": f"attachment; filename=businesses_{datetime.now().strftime('%Y%m%d')}.json"
-            }
-        )
+        ],
+        gzip=gzip
+    )
 
 @router.delete("/{place_id}")
 async def delete_business(place_id: str):
     """Delete a business by place_id"""
     try:
-        result = execute_query(
+        result = await async_db.fetch_one(
             "DELETE FROM businesses WHERE place_id = %s RETURNING place_id",
-            (place_id,),
-            fetch_one=True
+            (place_id,)
         )
         
         if not result:
@@ -213,7 +229,7 @@ async def delete_business(place_id: str):
 @router.get("/stats/by-city")
 async def get_stats_by_city():
     """Get business statistics grouped by city"""
-    stats = execute_query("""
+    stats = await async_db.fetch("""
         SELECT 
             city,
             COUNT(*) as total,
@@ -233,7 +249,7 @@ async def get_stats_by_city():
 @router.get("/stats/by-type")
 async def get_stats_by_type():
     """Get business statistics grouped by type"""
-    stats = execute_query("""
+    stats = await async_db.fetch("""
         SELECT 
             unnest(types) as business_type,
             COUNT(*) as count
@@ -0,0 +1,29 @@
+"""
+API endpoints for the response cache
+Import scripts call /invalidate when OSM data or the materialized views change
+"""
+from fastapi import APIRouter, HTTPException, Query
+from typing import List
+from ..cache import response_cache, TAGS
+
+router = APIRouter(prefix="/api/cache", tags=["cache"])
+
+@router.get("/stats")
+async def get_cache_stats():
+    """Hit/miss counters per endpoint"""
+    return response_cache.stats()
+
+@router.post("/invalidate")
+async def invalidate_cache(tags: List[str] = Query(list(TAGS), description="Tags to invalidate (osm, crawl)")):
+    """Drop cached responses depending on the given tags"""
+    unknown = [t for t in tags if t not in TAGS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown cache tags: {', '.join(unknown)}")
+    await response_cache.invalidate(*tags)
+    return {"invalidated": tags}
+
+@router.post("/clear")
+async def clear_cache():
+    """Remove every cached response"""
+    await response_cache.clear()
+    return {"cleared": True}
@@ -0,0 +1,100 @@
+"""
+API endpoints for the crawl job queue
+Jobs are processed by `python -m app.crawler.crawl_worker`, not by the API process
+"""
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from ..database import async_db
+from ..crawler import job_queue
+
+router = APIRouter(prefix="/api/crawl-queue", tags=["crawl-queue"])
+
+@router.get("/stats")
+async def get_queue_stats():
+    """Job counts by status and active workers"""
+    return await job_queue.queue_stats()
+
+@router.get("/jobs")
+async def list_jobs(
+    status: Optional[str] = None,
+    keyword: Optional[str] = None,
+    limit: int = 50
+):
+    """List queued jobs, highest priority first"""
+    conditions = []
+    params = []
+
+    if status:
+        conditions.append("q.status = %s")
+        params.append(status)
+    if keyword:
+        conditions.append("q.keyword = %s")
+        params.append(keyword)
+
+    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+    params.append(limit)
+
+    jobs = await async_db.fetch(
+        f"""
+        SELECT
+            q.id,
+            q.road_osm_id,
+            q.keyword,
+            q.priority,
+            q.status,
+            q.attempts,
+            q.max_attempts,
+            q.available_at,
+            q.locked_by,
+            q.locked_until,
+            q.session_id,
+            q.businesses_found,
+            q.last_error,
+            q.created_at,
+            q.completed_at,
+            cs.road_name,
+            cs.status as session_status
+        FROM crawl_queue q
+        LEFT JOIN crawl_sessions cs ON cs.id = q.session_id
+        {where_clause}
+        ORDER BY q.priority DESC, q.available_at
+        LIMIT %s
+        """,
+        params
+    )
+    return {"jobs": jobs, "count": len(jobs)}
+
+@router.post("/enqueue")
+async def enqueue_roads(
+    keyword: str = "all",
+    state_code: Optional[str] = None,
+    county_fips: Optional[str] = None,
+    min_score: int = 0,
+    limit: int = 1000
+):
+    """Queue the highest business-potential roads that haven't been crawled for this keyword"""
+    if limit <= 0 or limit > 100000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100000")
+
+    queued = await job_queue.enqueue_from_stats(
+        keyword=keyword,
+        state_code=state_code,
+        county_fips=county_fips,
+        min_score=min_score,
+        limit=limit
+    )
+    return {"queued": queued, "keyword": keyword}
+
+@router.post("/road/{road_id}")
+async def enqueue_road(road_id: int, keyword: str = "all", priority: int = 0):
+    """Queue a single road"""
+    job_id = await job_queue.enqueue(road_id, keyword, priority)
+    if job_id is None:
+        return {"queued": False, "message": "Road is already queued for this keyword"}
+    return {"queued": True, "job_id": job_id}
+
+@router.post("/retry-failed")
+async def retry_failed_jobs(keyword: Optional[str] = None):
+    """Give failed jobs a fresh set of attempts"""
+    requeued = await job_queue.retry_failed(keyword)
+    return {"requeued": requeued}
@@ -1,9 +1,11 @@
 """
 API endpoints for crawl sessions
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-from ..database.postgres_client import execute_query
+import asyncio
+from ..database import async_db
+from .exports import EXPORT_FORMATS, export_response
 
 router = APIRouter(prefix="/api/crawl-sessions", tags=["crawl-sessions"])
 
@@ -12,7 +14,7 @@ async def get_session_details(session_id: str):
     """Get crawl session details with all businesses"""
     
     # Get session info
-    session = execute_query(
+    session = await async_db.fetch_one(
         """
         SELECT 
             id,
@@ -23,6 +25,8 @@ async def get_session_details(session_id: str):
             keyword,
             status,
             businesses_found,
+            api_calls_made,
+            cached_pages,
             started_at,
             completed_at,
             error_message,
@@ -30,15 +34,14 @@ async def get_session_details(session_id: str):
         FROM crawl_sessions
         WHERE id = %s
         """,
-        (session_id,),
-        fetch_one=True
+        (session_id,)
     )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     # Get all businesses from this session (no pagination - show all 60)
-    businesses = execute_query(
+    businesses_query = async_db.fetch(
         """
         SELECT 
             place_id,
@@ -54,6 +57,7 @@ async def get_session_details(session_id: str):
             website,
             opening_hours,
             distance_to_road,
+            nearest_road_distance,
             crawled_at
         FROM businesses
         WHERE crawl_session_id = %s
@@ -63,7 +67,7 @@ async def get_session_details(session_id: str):
     )
     
     # Business stats for this session
-    stats = execute_query(
+    stats_query = async_db.fetch_one(
         """
         SELECT 
             COUNT(*) as total,
@@ -74,10 +78,11 @@ async def get_session_details(session_id: str):
         FROM businesses
         WHERE crawl_session_id = %s
         """,
-        (session_id,),
-        fetch_one=True
+        (session_id,)
     )
     
+    businesses, stats = await asyncio.gather(businesses_query, stats_query)
+    
     return {
         "session": session,
         "businesses": businesses,
@@ -105,7 +110,7 @@ async def get_recent_sessions(
     
     where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
     
-    sessions = execute_query(
+    sessions = await async_db.fetch(
         f"""
         SELECT 
             id,
@@ -116,6 +121,8 @@ async def get_recent_sessions(
             keyword,
             status,
             businesses_found,
+            api_calls_made,
+            cached_pages,
             started_at,
             completed_at,
             EXTRACT(EPOCH FROM (COALESCE(completed_at, CURRENT_TIMESTAMP) - started_at)) as duration_seconds
@@ -132,27 +139,25 @@ async def get_recent_sessions(
 @router.post("/{session_id}/export")
 async def export_session_data(
     session_id: str,
-    format: str = "csv"
+    format: str = Query("csv", regex=EXPORT_FORMATS),
+    gzip: bool = False
 ):
-    """Export businesses from a specific crawl session"""
-    import csv
-    import json
-    import io
-    from fastapi.responses import StreamingResponse
+    """Export businesses from a specific crawl session (streamed from a server-side cursor)"""
     from datetime import datetime
     
     # Verify session exists
-    session = execute_query(
+    session = await async_db.fetch_one(
         "SELECT * FROM crawl_sessions WHERE id = %s",
-        (session_id,),
-        fetch_one=True
+        (session_id,)
     )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    filename_base = f"{session['road_name']}_{session['city_name']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
     # Get businesses
-    businesses = execute_query(
+    return export_response(
         """
         SELECT 
             place_id,
@@ -170,33 +175,13 @@ async def export_session_data(
         WHERE crawl_session_id = %s
         ORDER BY rating DESC NULLS LAST
         """,
-        (session_id,)
-    )
-    
-    filename_base = f"{session['road_name']}_{session['city_name']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    
-    if format == "csv":
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=[
+        (session_id,),
+        format,
+        filename_base=filename_base,
+        fieldnames=[
             'place_id', 'name', 'formatted_address', 'phone_number',
             'website', 'rating', 'user_ratings_total', 'primary_type',
             'price_level', 'lat', 'lng'
-        ])
-        writer.writeheader()
-        writer.writerows(businesses)
-        
-        return StreamingResponse(
-            io.BytesIO(output.getvalue().encode()),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename_base}.csv"
-            }
-        )
-    else:
-        return StreamingResponse(
-            io.BytesIO(json.dumps(businesses, indent=2, default=str).encode()),
-            media_type="application/json",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename_base}.json"
-            }
-        )
\ No newline at end of file
+        ],
+        gzip=gzip
+    )
@@ -0,0 +1,111 @@
+"""
+Streaming export helpers
+Rows come from a server-side cursor and are encoded in small chunks, so an
+export's memory use doesn't grow with its row count.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+
+from ..database import async_db
+
+EXPORT_FORMATS = "^(csv|json|ndjson)$"
+
+# Flush to the client every CHUNK_ROWS rows (or sooner if the chunk gets big)
+CHUNK_ROWS = 500
+CHUNK_BYTES = 64 * 1024
+
+_MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+async def csv_chunks(rows: AsyncIterator[Dict], fieldnames: List[str]) -> AsyncIterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    async for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % CHUNK_ROWS == 0 or buf.tell() >= CHUNK_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+async def ndjson_chunks(rows: AsyncIterator[Dict]) -> AsyncIterator[str]:
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps(row, default=str))
+        if len(lines) >= CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+async def json_array_chunks(rows: AsyncIterator[Dict]) -> AsyncIterator[str]:
+    """A JSON array, written one element per line"""
+    parts = ['[']
+    separator = '\n'
+    async for row in rows:
+        parts.append(separator + json.dumps(row, default=str))
+        separator = ',\n'
+        if len(parts) >= CHUNK_ROWS:
+            yield ''.join(parts)
+            parts = []
+    parts.append('\n]\n')
+    yield ''.join(parts)
+
+
+async def encode_chunks(chunks: AsyncIterator[str], gzip: bool) -> AsyncIterator[bytes]:
+    if not gzip:
+        async for chunk in chunks:
+            if chunk:
+                yield chunk.encode()
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(
+    query: str,
+    params: Optional[Sequence],
+    format: str,
+    filename_base: str,
+    fieldnames: List[str],
+    gzip: bool = False
+) -> StreamingResponse:
+    """Stream a query's rows as a CSV / JSON / NDJSON download"""
+    rows = async_db.iterate(query, params)
+    if format == 'csv':
+        chunks = csv_chunks(rows, fieldnames)
+    elif format == 'ndjson':
+        chunks = ndjson_chunks(rows)
+    else:
+        chunks = json_array_chunks(rows)
+
+    filename = f"{filename_base}.{format}"
+    media_type = _MEDIA_TYPES[format]
+    if gzip:
+        filename += '.gz'
+        media_type = 'application/gzip'
+
+    return StreamingResponse(
+        encode_chunks(chunks, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -0,0 +1,57 @@
+"""
+Keyset pagination helpers
+Cursors are opaque to clients: urlsafe base64 of the last row's sort key.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+from fastapi import HTTPException
+
+from ..database import async_db
+
+# count modes for paginated endpoints
+COUNT_MODES = "^(exact|estimate|none)$"
+
+
+def encode_cursor(**values: Any) -> str:
+    """Pack the last row's sort key into a continuation token"""
+    payload = {
+        k: {'$dt': v.isoformat()} if isinstance(v, datetime) else v
+        for k, v in values.items()
+    }
+    raw = json.dumps(payload, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str, *keys: str) -> Dict[str, Any]:
+    """Unpack a continuation token, 400 if it's malformed or missing keys"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        values = {
+            k: datetime.fromisoformat(v['$dt']) if isinstance(v, dict) and '$dt' in v else v
+            for k, v in payload.items()
+        }
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if any(k not in values for k in keys):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def resolve_count_mode(count: Optional[str], cursor: Optional[str]) -> str:
+    """Exact total on the first page, no counting while paging unless asked"""
+    if count:
+        return count
+    return 'none' if cursor else 'exact'
+
+
+async def estimate_count(query: str, params: Optional[Sequence] = None) -> int:
+    """Planner row estimate for a query - constant time, accurate to the table statistics"""
+    plan = await async_db.fetch_val(f"EXPLAIN (FORMAT JSON) {query}", params)
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,72 @@
+"""
+API endpoints for Parquet exports
+Exports run in a worker thread and land in PARQUET_EXPORT_DIR; files can be downloaded individually
+"""
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+import os
+import threading
+from ..config import PARQUET_EXPORT_DIR
+from ..database import parquet_export
+
+router = APIRouter(prefix="/api/exports/parquet", tags=["exports"])
+
+# One export per dataset at a time - they share an output directory
+_running = {name: threading.Lock() for name in parquet_export.DATASETS}
+
+@router.get("")
+async def list_exports():
+    """Exported datasets and their files"""
+    datasets = {}
+    for name in parquet_export.DATASETS:
+        files = await run_in_threadpool(parquet_export.list_files, name)
+        datasets[name] = {
+            "files": len(files),
+            "bytes": sum(f['bytes'] for f in files),
+            "running": _running[name].locked(),
+            "partition_by": parquet_export.DATASETS[name]['partition_by']
+        }
+    return {"path": PARQUET_EXPORT_DIR, "datasets": datasets}
+
+@router.post("/{dataset}")
+async def run_export(
+    dataset: str,
+    state: Optional[List[str]] = Query(None, description="Only export these states (replaces just their partitions)")
+):
+    """Export a dataset to partitioned Parquet (businesses, osm_businesses, road_business_stats)"""
+    if dataset not in parquet_export.DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset}")
+    
+    lock = _running[dataset]
+    if not lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail=f"An export of {dataset} is already running")
+    
+    try:
+        return await run_in_threadpool(parquet_export.export_dataset, dataset, states=state)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    finally:
+        lock.release()
+
+@router.get("/{dataset}/files")
+async def list_dataset_files(dataset: str):
+    """Parquet files of an exported dataset"""
+    if dataset not in parquet_export.DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset}")
+    files = await run_in_threadpool(parquet_export.list_files, dataset)
+    return {"dataset": dataset, "files": files}
+
+@router.get("/{dataset}/files/{file_path:path}")
+async def download_file(dataset: str, file_path: str):
+    """Download one Parquet file"""
+    if dataset not in parquet_export.DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset}")
+    
+    root = os.path.realpath(os.path.join(PARQUET_EXPORT_DIR, dataset))
+    path = os.path.realpath(os.path.join(root, file_path))
+    if not path.startswith(root + os.sep) or not path.endswith('.parquet') or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return FileResponse(path, media_type="application/vnd.apache.parquet", filename=os.path.basename(path))
@@ -3,22 +3,31 @@ Roads API endpoints for frontend
 """
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional, List, Dict
+import asyncio
 import logging
-from ..database.postgres_client import postgres_client, execute_query
+from ..database import async_db
+from ..cache import cached, OSM, CRAWL
+from .pagination import COUNT_MODES, decode_cursor, encode_cursor, estimate_count, resolve_count_mode
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/roads", tags=["roads"])
 
 @router.get("/by-city")
+@cached("/roads/by-city", tags=(OSM, CRAWL))
 async def get_roads_by_city(
     city_name: str = Query(..., description="City name"),
     state_code: str = Query(..., description="State code (2 letters)"),
     limit: int = Query(100, description="Maximum results"),
     offset: int = Query(0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (keyset pagination)"),
+    count: Optional[str] = Query(None, regex=COUNT_MODES, description="exact | estimate | none (default: exact on the first page only)"),
     highway_type: Optional[str] = Query(None, description="Filter by highway type")
 ):
-    """Get roads for a specific target city"""
+    """
+    Get roads for a specific target city
+    Pass next_cursor back as `cursor` to page without OFFSET
+    """
     try:
         # Use materialized view for much faster performance
         query = """
@@ -58,6 +67,16 @@ async def get_roads_by_city(
             
         query += """
                 GROUP BY road_name, city_name
+            ),
+            ranked AS (
+                SELECT 
+                    ra.*,
+                    CASE 
+                        WHEN highway IN ('primary', 'secondary', 'tertiary') THEN 1
+                        WHEN highway IN ('residential', 'living_street') THEN 2
+                        ELSE 3
+                    END as highway_rank
+                FROM road_aggregates ra
             )
             SELECT 
                 ra.osm_id,
@@ -65,13 +84,14 @@ async def get_roads_by_city(
                 ra.highway,
                 ra.highway_types,
                 ra.ref,
-                %s as city_name,
-                %s as state_code,
+                %s::text as city_name,
+                %s::text as state_code,
                 ra.segment_count,
                 ra.business_potential_score,
+                ra.highway_rank,
                 COALESCE(poi.poi_count, 0) as poi_count,
                 cs.last_crawl_info
-            FROM road_aggregates ra
+            FROM ranked ra
             LEFT JOIN (
                 SELECT nearest_road_id, COUNT(*) as poi_count
                 FROM osm_businesses
@@ -89,18 +109,53 @@ async def get_roads_by_city(
                 WHERE road_osm_id = ra.osm_id
                 AND status = 'completed'
             ) cs ON true
-            ORDER BY 
-                CASE 
-                    WHEN highway IN ('primary', 'secondary', 'tertiary') THEN 1
-                    WHEN highway IN ('residential', 'living_street') THEN 2
-                    ELSE 3
-                END,
-                road_name
+        """
+        params.extend([city_name, state_code, state_code])
+        
+        # Keyset: road_name is unique within a city, so (rank, name) is a total order
+        if cursor:
+            after = decode_cursor(cursor, 'highway_rank', 'road_name')
+            query += " WHERE (ra.highway_rank, ra.road_name) > (%s, %s)"
+            params.extend([after['highway_rank'], after['road_name']])
+            offset = 0
+        
+        query += """
+            ORDER BY ra.highway_rank, ra.road_name
             LIMIT %s OFFSET %s
         """
-        params.extend([city_name, state_code, state_code, limit, offset])
+        # One extra row tells us whether there is a next page
+        params.extend([limit + 1, offset])
+        
+        # Get total count of unique road names from materialized view
+        count_where = """
+            WHERE city_name = %s AND state_code = %s
+                AND road_name IS NOT NULL
+        """
+        count_params = [city_name, state_code]
+        if highway_type:
+            count_where += " AND highway = %s"
+            count_params.append(highway_type)
+        
+        count_mode = resolve_count_mode(count, cursor)
+        lookups = [async_db.fetch(query, params)]
+        if count_mode == 'exact':
+            lookups.append(async_db.fetch_val(
+                f"SELECT COUNT(DISTINCT road_name) FROM city_roads_simple {count_where}", count_params
+            ))
+        elif count_mode == 'estimate':
+            lookups.append(estimate_count(
+                f"SELECT DISTINCT road_name FROM city_roads_simple {count_where}", count_params
+            ))
+        
+        # Page and count are independent - run them concurrently
+        results, *counted = await asyncio.gather(*lookups)
+        total = counted[0] if counted else None
         
-        results = execute_query(query, params)
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            next_cursor = encode_cursor(highway_rank=last['highway_rank'], road_name=last['road_name'])
         
         # Format results to match frontend expectations
         formatted_results = []
@@ -114,35 +169,25 @@ async def get_roads_by_city(
                 'total_segments': row['segment_count']
             })
         
-        # Get total count of unique road names from materialized view
-        count_query = """
-            SELECT COUNT(DISTINCT road_name) as total
-            FROM city_roads_simple
-            WHERE city_name = %s AND state_code = %s
-                AND road_name IS NOT NULL
-        """
-        count_params = [city_name, state_code]
-        if highway_type:
-            count_query += " AND highway = %s"
-            count_params.append(highway_type)
-            
-        count_result = execute_query(count_query, count_params, fetch_one=True)
-        total = count_result['total'] if count_result else 0
-        
         return {
             "roads": formatted_results,
             "total": total,
+            "total_is_estimate": count_mode == 'estimate',
             "limit": limit,
             "offset": offset,
+            "next_cursor": next_cursor,
             "city": city_name,
             "state": state_code
         }
         
+    except HTTPException:
+        raise  # bad cursor -> 400
     except Exception as e:
         logger.error(f"Error fetching roads by city: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/target-cities")
+@cached("/roads/target-cities", ttl=3600)
 async def get_target_cities(
     state_code: Optional[str] = Query(None, description="Filter by state"),
     with_roads_only: bool = Query(True, description="Only show cities with mapped roads")
@@ -185,7 +230,7 @@ async def get_target_cities(
             ORDER BY road_count DESC, tc.city_name
         """
         
-        results = execute_query(query, params)
+        results = await async_db.fetch(query, params)
         
         # Get summary stats
         total_cities = len(results)
@@ -203,6 +248,7 @@ async def get_target_cities(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/city-stats")
+@cached("/roads/city-stats", ttl=3600)
 async def get_city_stats(
     city_name: str = Query(..., description="City name"),
     state_code: str = Query(..., description="State code")
@@ -222,8 +268,6 @@ async def get_city_stats(
             ORDER BY count DESC
         """
         
-        road_stats = execute_query(query, [city_name, state_code])
-        
         # Get overall stats
         total_query = """
             SELECT 
@@ -236,7 +280,10 @@ async def get_city_stats(
             WHERE rcm.city_name = %s AND rcm.state_code = %s
         """
         
-        totals = execute_query(total_query, [city_name, state_code], fetch_one=True)
+        road_stats, totals = await asyncio.gather(
+            async_db.fetch(query, [city_name, state_code]),
+            async_db.fetch_one(total_query, [city_name, state_code])
+        )
         
         return {
             "city": city_name,
@@ -289,7 +336,7 @@ async def get_unprocessed_roads_for_city(
         """
         
         params = [keyword or 'restaurant', city_name, state_code, limit]
-        results = execute_query(query, params)
+        results = await async_db.fetch(query, params)
         
         # Format results to match frontend expectations
         formatted_results = []
@@ -386,7 +433,7 @@ async def search_roads_with_coordinates(
         
         params.extend([search_term, limit])
         
-        results = execute_query(query, params)
+        results = await async_db.fetch(query, params)
         
         # Format results
         formatted_results = []
@@ -1,32 +1,39 @@
 """
 Smart Crawl API - Integrates OSM POI data with Google Maps
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Dict, Optional
 import logging
 
+from ..crawler.discovery_planner import plan_discovery
+from ..crawler.google_maps import GoogleMapsClient, PlacesAPIError, get_client
+from ..database import async_db
+from ..crawler.osm_merge import execute_plan
+from ..crawler.rate_limiter import QuotaExceeded
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.post("/api/smart-crawl/road/{road_id}")
-async def smart_crawl_road(road_id: int, db):
+async def smart_crawl_road(road_id: int):
     """
     Smart crawl a road using POI data to optimize Google API calls
     """
     
     # 1. Get road info
-    road = await db.fetch_one("""
+    road = await async_db.fetch_one("""
         SELECT osm_id, name, state_code, county_fips,
                ST_AsGeoJSON(geometry) as geometry_json
         FROM osm_roads_main
-        WHERE osm_id = :road_id
-    """, {"road_id": road_id})
+        WHERE osm_id = %s
+        LIMIT 1
+    """, (road_id,))
     
     if not road:
         raise HTTPException(404, "Road not found")
     
     # 2. Get POIs along this road from OSM
-    pois = await db.fetch_all("""
+    pois = await async_db.fetch("""
         SELECT 
             osm_id, name, brand,
             business_type, business_subtype,
@@ -34,9 +41,9 @@ async def smart_crawl_road(road_id: int, db):
             lat, lon, business_score,
             housenumber, street, city, postcode
         FROM osm_businesses
-        WHERE nearest_road_id = :road_id
+        WHERE nearest_road_id = %s
         ORDER BY business_score DESC
-    """, {"road_id": road_id})
+    """, (road_id,))
     
     # 3. Analyze what we have vs what we need
     crawl_strategy = analyze_crawl_needs(pois)
@@ -175,48 +182,16 @@ def calculate_priority(poi: Dict) -> int:
     return priority
 
 def generate_discovery_points(road: Dict, existing_pois: List[Dict]) -> List[Dict]:
-    """Generate points to discover new businesses"""
-    import json
-    from shapely.geometry import LineString, Point
-    
-    # Parse road geometry
-    geom = json.loads(road['geometry_json'])
-    line = LineString(geom['coordinates'])
-    
-    # Generate points every 200m along road
-    points = []
-    distance = 0
-    
-    while distance < line.length:
-        point = line.interpolate(distance)
-        
-        # Check if point is far from existing POIs
-        min_distance = float('inf')
-        for poi in existing_pois:
-            poi_point = Point(poi['lon'], poi['lat'])
-            dist = point.distance(poi_point) * 111000  # Convert to meters
-            min_distance = min(min_distance, dist)
-            
-        # Only add if >100m from known POIs
-        if min_distance > 100:
-            points.append({
-                'lat': point.y,
-                'lon': point.x,
-                'radius': 200,  # Larger radius for discovery
-                'mode': 'discovery'
-            })
-            
-        distance += 0.002  # ~200m
-        
-    return points[:30]  # Limit discovery points
+    """Generate points to discover new businesses (every ~200m, >100m from known POIs)"""
+    return plan_discovery([road], existing_pois)[road['osm_id']]
 
 @router.get("/api/smart-crawl/suggestions/{state_code}")
-async def get_crawl_suggestions(state_code: str, db, limit: int = 20):
+async def get_crawl_suggestions(state_code: str, limit: int = 20):
     """
     Get road suggestions for crawling based on POI analysis
     """
     
-    suggestions = await db.fetch_all("""
+    suggestions = await async_db.fetch("""
         SELECT 
             road_id,
             road_name,
@@ -226,11 +201,11 @@ async def get_crawl_suggestions(state_code: str, db, limit: int = 20):
             missing_website,
             crawl_priority_score
         FROM road_business_density
-        WHERE state_code = :state_code
+        WHERE state_code = %s
         AND total_businesses >= 3
         ORDER BY crawl_priority_score DESC
-        LIMIT :limit
-    """, {"state_code": state_code, "limit": limit})
+        LIMIT %s
+    """, (state_code, limit))
     
     return {
         'state_code': state_code,
@@ -266,57 +241,27 @@ def get_recommendation(road_stats: Dict) -> str:
         return "Standard crawl recommended"
 
 @router.post("/api/smart-crawl/execute")
-async def execute_smart_crawl(request: Dict, db):
+async def execute_smart_crawl(request: Dict, gmaps: GoogleMapsClient = Depends(get_client)):
     """
     Execute crawl with Google Maps API using smart strategy
+    All points are searched concurrently (within the API rate limit), then
+    results are matched to OSM and merged with set-based statements.
+    Body: {"road_id": ..., "road_name": ..., "crawl_points": [...]} as returned by /road/{road_id}
     """
-    crawl_points = request['crawl_points']
-    results = []
-    
-    for point in crawl_points:
-        # Call Google Places API with optimized parameters
-        if point.get('target_name'):
-            # Targeted search for specific business
-            google_results = await search_specific_business(
-                point['lat'], point['lon'],
-                point['target_name'],
-                point.get('target_brand')
-            )
-        else:
-            # Discovery search
-            google_results = await search_nearby_businesses(
-                point['lat'], point['lon'],
-                point['radius']
-            )
-            
-        # Process results
-        for place in google_results:
-            # Check if already in OSM
-            osm_match = await find_osm_match(place, db)
-            
-            if osm_match:
-                # Update existing POI
-                await update_osm_business(osm_match['osm_id'], place, db)
-                results.append({
-                    'action': 'updated',
-                    'osm_id': osm_match['osm_id'],
-                    'name': place['name']
-                })
-            else:
-                # New business found
-                await insert_google_business(place, db)
-                results.append({
-                    'action': 'created',
-                    'name': place['name'],
-                    'address': place.get('formatted_address')
-                })
-                
+    crawl_points = request.get('crawl_points') or []
+    road = request.get('road') or {}
+    road_id = request.get('road_id') or road.get('id')
+    if not road_id:
+        raise HTTPException(400, "road_id is required")
+
+    try:
+        summary = await execute_plan(gmaps, crawl_points, int(road_id), request.get('road_name') or road.get('name'))
+    except QuotaExceeded as e:
+        raise HTTPException(429, str(e))
+    except PlacesAPIError as e:
+        raise HTTPException(502, str(e))
+    results = summary.pop('results')
     return {
-        'crawl_summary': {
-            'points_processed': len(crawl_points),
-            'businesses_found': len(results),
-            'updated': sum(1 for r in results if r['action'] == 'updated'),
-            'created': sum(1 for r in results if r['action'] == 'created')
-        },
+        'crawl_summary': summary,
         'results': results[:100]  # Limit response size
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,276 @@
+"""
+Response cache for read-heavy endpoints
+
+Entries are keyed on endpoint + normalized query params and tagged with what
+they depend on ('osm', 'crawl', ...). Invalidating a tag bumps its generation
+number, which is part of every key that depends on it, so stale entries are
+simply never read again and age out via TTL/LRU.
+
+Backends: in-process LRU (default) or Redis (CACHE_BACKEND=redis, REDIS_URL),
+which also shares invalidations between the API and crawl worker processes.
+"""
+import functools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from .config import CACHE_BACKEND, CACHE_DEFAULT_TTL, CACHE_MAX_ENTRIES, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# Tags used across the app
+OSM = 'osm'          # roads, city mappings, POIs, materialized views (imports)
+CRAWL = 'crawl'      # crawl_sessions, businesses (every finished crawl)
+TAGS = (OSM, CRAWL)
+
+_MISSING = object()
+
+# Sync callbacks(tags) for in-process caches that live outside the response cache
+_invalidation_listeners: List[Callable[[Tuple[str, ...]], None]] = []
+
+
+def on_invalidate(callback: Callable[[Tuple[str, ...]], None]):
+    """Register a callback run whenever tags are invalidated (or the cache is cleared)"""
+    _invalidation_listeners.append(callback)
+
+
+def _notify_listeners(tags: Tuple[str, ...]):
+    for callback in _invalidation_listeners:
+        try:
+            callback(tags)
+        except Exception as e:
+            logger.error(f"Cache invalidation listener failed: {e}")
+
+
+class MemoryBackend:
+    """Thread-safe LRU with per-entry expiry"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    async def generations(self, tags: Iterable[str]) -> List[int]:
+        with self._lock:
+            return [self._generations[tag] for tag in tags]
+
+    async def bump(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] += 1
+
+    async def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+    async def close(self):
+        pass
+
+
+class LRUDict:
+    """Bounded mapping for in-process lookup caches (no expiry, least recently used goes first)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """Redis-backed store; values are stored as JSON"""
+
+    name = 'redis'
+    prefix = 'gmc:cache:'
+
+    def __init__(self, url: str = REDIS_URL):
+        import redis.asyncio as redis_asyncio
+        self._redis = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Any:
+        raw = await self._redis.get(self.prefix + key)
+        return _MISSING if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self._redis.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    async def generations(self, tags: Iterable[str]) -> List[int]:
+        tags = list(tags)
+        if not tags:
+            return []
+        values = await self._redis.mget([f"{self.prefix}gen:{tag}" for tag in tags])
+        return [int(v) if v is not None else 0 for v in values]
+
+    async def bump(self, tags: Iterable[str]):
+        pipe = self._redis.pipeline()
+        for tag in tags:
+            pipe.incr(f"{self.prefix}gen:{tag}")
+        await pipe.execute()
+
+    async def clear(self):
+        async for key in self._redis.scan_iter(match=self.prefix + '*'):
+            if b':gen:' not in key:
+                await self._redis.delete(key)
+
+    def size(self) -> Optional[int]:
+        return None
+
+    async def close(self):
+        await self._redis.close()
+
+
+def _create_backend():
+    if CACHE_BACKEND == 'redis':
+        try:
+            return RedisBackend()
+        except ImportError:
+            logger.warning("CACHE_BACKEND=redis but the redis package is missing - using in-process cache")
+    return MemoryBackend()
+
+
+class ResponseCache:
+    """Endpoint cache with per-endpoint hit/miss counters"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or _create_backend()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0, 'errors': 0})
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any], generations: List[int]) -> str:
+        """endpoint|gen,gen|sorted params - None params are dropped so defaults share an entry"""
+        normalized = {k: v for k, v in params.items() if v is not None}
+        return f"{endpoint}|{','.join(map(str, generations))}|{json.dumps(normalized, sort_keys=True, default=str)}"
+
+    async def get_or_compute(self, endpoint: str, params: Dict[str, Any], compute: Callable,
+                             ttl: float = CACHE_DEFAULT_TTL, tags: Iterable[str] = ()):
+        counters = self._counters[endpoint]
+        tags = list(tags)
+        try:
+            key = self.make_key(endpoint, params, await self.backend.generations(tags))
+            value = await self.backend.get(key)
+        except Exception as e:
+            # Cache trouble must never take the endpoint down
+            logger.error(f"Cache read failed for {endpoint}: {e}")
+            counters['errors'] += 1
+            return await compute()
+
+        if value is not _MISSING:
+            counters['hits'] += 1
+            return value
+
+        counters['misses'] += 1
+        value = await compute()
+        if isinstance(value, dict) and 'error' in value:
+            # Handlers like /api/usage report failures in the body - don't pin them
+            return value
+        try:
+            await self.backend.set(key, jsonable_encoder(value), ttl)
+        except Exception as e:
+            logger.error(f"Cache write failed for {endpoint}: {e}")
+            counters['errors'] += 1
+        return value
+
+    async def invalidate(self, *tags: str):
+        """Drop every cached response that depends on any of `tags`"""
+        try:
+            await self.backend.bump(tags)
+            logger.info(f"Cache invalidated: {', '.join(tags)}")
+        except Exception as e:
+            logger.error(f"Cache invalidation failed for {tags}: {e}")
+        _notify_listeners(tuple(tags))
+
+    async def clear(self):
+        await self.backend.clear()
+        _notify_listeners(TAGS)
+
+    def stats(self) -> Dict:
+        endpoints = {}
+        for endpoint, c in self._counters.items():
+            lookups = c['hits'] + c['misses']
+            endpoints[endpoint] = {**c, 'hit_rate': round(c['hits'] / lookups, 3) if lookups else None}
+        return {
+            'backend': self.backend.name,
+            'entries': self.backend.size(),
+            'endpoints': endpoints
+        }
+
+    async def close(self):
+        await self.backend.close()
+
+
+response_cache = ResponseCache()
+
+
+def cached(endpoint: str, ttl: float = CACHE_DEFAULT_TTL, tags: Iterable[str] = (OSM,)):
+    """
+    Cache an async route handler's result
+    Handlers must only take query/path params (FastAPI passes them as kwargs)
+    """
+    tags = tuple(tags)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            return await response_cache.get_or_compute(
+                endpoint, kwargs, lambda: func(**kwargs), ttl=ttl, tags=tags
+            )
+        return wrapper
+    return decorator
+
+
+async def invalidate(*tags: str):
+    """Invalidation hook for crawls and imports"""
+    await response_cache.invalidate(*tags)
@@ -13,6 +13,11 @@ DB_NAME = os.getenv("DB_NAME", "roads_db")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "roadsdb2024secure")
 
+# Async pool (asyncpg) used by the API routes
+ASYNC_DB_POOL_MIN = int(os.getenv("ASYNC_DB_POOL_MIN", "2"))
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", "20"))
+ASYNC_DB_COMMAND_TIMEOUT = float(os.getenv("ASYNC_DB_COMMAND_TIMEOUT", "60"))
+
 # Legacy Supabase (keep for reference)
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
@@ -23,15 +28,60 @@ GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 # Redis
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# Response cache for read-heavy endpoints
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory | redis (shares invalidations with crawl workers)
+CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "30"))  # Seconds a resolved JWT user is reused
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "4"))  # Threads running bcrypt
+AUTH_HASH_MAX_PENDING = int(os.getenv("AUTH_HASH_MAX_PENDING", "32"))  # Queued password checks before logins get 503
+AUTH_LOGIN_MAX_FAILURES = int(os.getenv("AUTH_LOGIN_MAX_FAILURES", "5"))  # Failed logins per username per window
+AUTH_LOGIN_FAILURE_WINDOW = int(os.getenv("AUTH_LOGIN_FAILURE_WINDOW", "300"))  # Seconds
+
+# Location analysis cache (crawler/location_cache.py): points are snapped to geohash cells
+LOCATION_CACHE_PRECISION = int(os.getenv("LOCATION_CACHE_PRECISION", "7"))  # 7 = ~150m cells, 0 disables the cache
+LOCATION_CACHE_TTL = float(os.getenv("LOCATION_CACHE_TTL", "3600"))
+LOCATION_CACHE_MAX_ENTRIES = int(os.getenv("LOCATION_CACHE_MAX_ENTRIES", "10000"))
+LOCATION_CACHE_PERSIST = os.getenv("LOCATION_CACHE_PERSIST", "false").lower() == "true"  # Also keep results in location_score_cache
+
+# /roads/search serves from an in-memory index of city_roads_simple (crawler/road_search_index.py)
+ROAD_SEARCH_INDEX = os.getenv("ROAD_SEARCH_INDEX", "true").lower() == "true"
+
 # Crawler settings
 CRAWLER_BATCH_SIZE = int(os.getenv("CRAWLER_BATCH_SIZE", "50"))
 CRAWLER_DELAY_SECONDS = float(os.getenv("CRAWLER_DELAY_SECONDS", "1"))
 MAX_RESULTS_PER_LOCATION = int(os.getenv("MAX_RESULTS_PER_LOCATION", "60"))
 SEARCH_RADIUS_METERS = int(os.getenv("SEARCH_RADIUS_METERS", "50"))
+MAX_DISTANCE_TO_ROAD_M = float(os.getenv("MAX_DISTANCE_TO_ROAD_M", "0"))  # Drop crawled places farther from their road, 0 keeps all
+
+# Parquet exports (python -m app.database.parquet_export, /api/exports/parquet)
+PARQUET_EXPORT_DIR = os.getenv("PARQUET_EXPORT_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "exports", "parquet"))
+
+# Crawl queue (Postgres-backed, see database/schemas_crawl_queue.sql)
+CRAWL_QUEUE_VISIBILITY_TIMEOUT = int(os.getenv("CRAWL_QUEUE_VISIBILITY_TIMEOUT", "300"))  # Seconds before a silent job is re-claimed
+CRAWL_QUEUE_MAX_ATTEMPTS = int(os.getenv("CRAWL_QUEUE_MAX_ATTEMPTS", "5"))
+CRAWL_QUEUE_RETRY_BASE_SECONDS = float(os.getenv("CRAWL_QUEUE_RETRY_BASE_SECONDS", "30"))  # Doubles per attempt
+CRAWL_QUEUE_POLL_SECONDS = float(os.getenv("CRAWL_QUEUE_POLL_SECONDS", "5"))
+CRAWL_WORKER_CONCURRENCY = int(os.getenv("CRAWL_WORKER_CONCURRENCY", "5"))  # Roads in flight per worker process
+CRAWL_PLAN_PREFETCH = int(os.getenv("CRAWL_PLAN_PREFETCH", "500"))  # Upcoming roads whose details/stats are loaded per batch
+CRAWL_PLAN_MAX_ROADS = int(os.getenv("CRAWL_PLAN_MAX_ROADS", "20000"))  # LRU bound of a worker's road lookups
+CRAWL_USE_TIER_STATS = os.getenv("CRAWL_USE_TIER_STATS", "false").lower() == "true"  # Workers pick tiers / skip low-value roads from road_business_stats
 
 # Rate limiting
-GOOGLE_MAPS_REQUESTS_PER_SECOND = 10
-GOOGLE_MAPS_DAILY_LIMIT = 25000  # Free tier
+GOOGLE_MAPS_REQUESTS_PER_SECOND = float(os.getenv("GOOGLE_MAPS_REQUESTS_PER_SECOND", "10"))
+GOOGLE_MAPS_DAILY_LIMIT = int(os.getenv("GOOGLE_MAPS_DAILY_LIMIT", "25000"))  # Free tier
+GOOGLE_MAPS_API_SHARE = float(os.getenv("GOOGLE_MAPS_API_SHARE", "0.2"))  # Slice of the rate/daily limit for the API process; crawl workers split the rest
+GOOGLE_MAPS_MAX_CONCURRENCY = int(os.getenv("GOOGLE_MAPS_MAX_CONCURRENCY", "20"))  # In-flight requests
+GOOGLE_MAPS_PAGE_DELAY_SECONDS = float(os.getenv("GOOGLE_MAPS_PAGE_DELAY_SECONDS", "0"))  # Places API v1 page tokens are valid immediately
+
+# Text Search response cache (places_response_cache) - recrawls within the TTL make no API calls
+PLACES_CACHE_ENABLED = os.getenv("PLACES_CACHE_ENABLED", "true").lower() == "true"
+PLACES_CACHE_TTL_HOURS = {  # Per field-mask tier; Places terms allow at most 30 days
+    'basic': float(os.getenv("PLACES_CACHE_TTL_BASIC_HOURS", "720")),
+    'pro': float(os.getenv("PLACES_CACHE_TTL_PRO_HOURS", "168")),
+    'enterprise_minimal': float(os.getenv("PLACES_CACHE_TTL_ENTERPRISE_MINIMAL_HOURS", "168")),
+    'enterprise': float(os.getenv("PLACES_CACHE_TTL_ENTERPRISE_HOURS", "72")),  # Hours/phones change
+}
 
 # Business types to search
 BUSINESS_TYPES = [
@@ -2,11 +2,24 @@
 Business location analyzer using advanced scoring system
 """
 import logging
-from typing import Dict, Tuple, Optional
+from typing import AsyncIterator, Dict, List, Tuple, Optional
+from ..database import async_db
 from ..database.postgres_client import PostgresClient
+from .location_cache import geohash_center, location_cache
 
 logger = logging.getLogger(__name__)
 
+# Scores many points in one statement; WITH ORDINALITY keeps the input order
+BATCH_SCORE_QUERY = """
+    SELECT
+        p.idx - 1 as index,
+        p.lat,
+        p.lon,
+        calculate_business_score_advanced(p.lat, p.lon, %s) as analysis
+    FROM unnest(%s::float8[], %s::float8[]) WITH ORDINALITY AS p(lat, lon, idx)
+    ORDER BY p.idx
+"""
+
 class BusinessAnalyzer:
     def __init__(self, db_client: PostgresClient):
         self.db = db_client
@@ -23,6 +36,10 @@ class BusinessAnalyzer:
         - Potential challenges
         - Detailed area metrics
         """
+        analysis = location_cache.get_or_compute('analysis', lat, lon, radius_km, self._score_location)
+        return analysis if analysis else self._get_default_analysis()
+    
+    def _score_location(self, lat: float, lon: float, radius_km: float = 0.5) -> Optional[Dict]:
         try:
             query = """
                 SELECT calculate_business_score_advanced(%s, %s, %s) as analysis
@@ -38,16 +55,98 @@ class BusinessAnalyzer:
             if result and result['analysis']:
                 return result['analysis']
             
-            return self._get_default_analysis()
+            return None
             
         except Exception as e:
             logger.error(f"Error analyzing location ({lat}, {lon}): {e}")
-            return self._get_default_analysis()
+            return None
+    
+    async def iter_analyses(self, points: List[Tuple[float, float]], radius_km: float = 0.5) -> AsyncIterator[Dict]:
+        """
+        Analyze many (lat, lon) points, streamed back in input order
+        Each row is {index, lat, lon, analysis}. Like analyze_location, points
+        share the location cache's geohash cells: cached cells are answered
+        from it and the rest are scored (at their cell centers) in one query.
+        """
+        if not location_cache.enabled:
+            rows = async_db.iterate(BATCH_SCORE_QUERY, (
+                radius_km,
+                [lat for lat, lon in points],
+                [lon for lat, lon in points]
+            ), prefetch=100)
+            async for row in rows:
+                if not row['analysis']:
+                    row['analysis'] = self._get_default_analysis()
+                yield row
+            return
+
+        point_cells = [location_cache.cell(lat, lon) for lat, lon in points]
+        known = {}
+        missing = []  # in order of first use, so rows can be flushed as they stream in
+        seen = set()
+        for cell in point_cells:
+            if cell in seen:
+                continue
+            seen.add(cell)
+            result = location_cache.peek('analysis', cell, radius_km)
+            if result is not None:
+                known[cell] = result
+            else:
+                missing.append(cell)
+
+        version, stored = await location_cache.read_table_many('analysis', missing, radius_km)
+        known.update(stored)
+        missing = [cell for cell in missing if cell not in stored]
+
+        next_index = 0
+
+        def ready():
+            # Rows whose cell is known, up to the first one still being scored
+            nonlocal next_index
+            while next_index < len(points) and point_cells[next_index] in known:
+                lat, lon = points[next_index]
+                yield {
+                    'index': next_index, 'lat': lat, 'lon': lon,
+                    'analysis': known[point_cells[next_index]] or self._get_default_analysis()
+                }
+                next_index += 1
+
+        for row in ready():
+            yield row
+
+        if missing:
+            centers = [geohash_center(cell) for cell in missing]
+            computed = []
+            rows = async_db.iterate(BATCH_SCORE_QUERY, (
+                radius_km,
+                [lat for lat, lon in centers],
+                [lon for lat, lon in centers]
+            ), prefetch=100)
+            async for score in rows:
+                cell = missing[score['index']]
+                # Failures (NULL) are not cached, same as get_or_compute
+                known[cell] = score['analysis']
+                if score['analysis']:
+                    computed.append((cell, score['analysis']))
+                for row in ready():
+                    yield row
+            await location_cache.remember_many('analysis', radius_km, version, computed)
     
     def get_area_classification(self, lat: float, lon: float, radius_km: float = 0.5) -> Dict:
         """
         Get simple area classification
         """
+        classification = location_cache.get_or_compute('classification', lat, lon, radius_km, self._classify_area)
+        if classification:
+            return classification
+        
+        return {
+            'area_type': 'unknown',
+            'business_suitability': 'unknown',
+            'description': 'Unable to classify area'
+        }
+    
+    def _classify_area(self, lat: float, lon: float, radius_km: float = 0.5) -> Optional[Dict]:
         try:
             query = """
                 SELECT classify_area_type(%s, %s, %s) as classification
@@ -62,20 +161,12 @@ class BusinessAnalyzer:
             
             if result and result['classification']:
                 return result['classification']
-                
-            return {
-                'area_type': 'unknown',
-                'business_suitability': 'unknown',
-                'description': 'Unable to classify area'
-            }
+            
+            return None
             
         except Exception as e:
             logger.error(f"Error classifying area ({lat}, {lon}): {e}")
-            return {
-                'area_type': 'unknown',
-                'business_suitability': 'unknown',
-                'description': 'Error classifying area'
-            }
+            return None
     
     def format_analysis_summary(self, analysis: Dict) -> str:
         """
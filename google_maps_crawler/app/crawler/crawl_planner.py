@@ -0,0 +1,89 @@
+"""
+Crawl planning: per-road lookups for a whole batch of jobs at once
+
+Crawling a road needs its details + city (osm_roads_main / road_city_mapping)
+and its tier stats (road_business_stats). Looking those up road by road costs
+several round trips per road; CrawlPlan loads them for a batch of roads with
+one query each and keeps them in a bounded LRU for the rest of the job.
+"""
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional
+
+from ..cache import LRUDict
+from ..config import CRAWL_PLAN_MAX_ROADS
+from ..database import async_db
+from . import crawl_service
+from .tier_optimizer import TIER_STATS_QUERY, tier_for_stats, worth_crawling
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlPlan:
+    """Road details, city names and tier stats for the roads of a crawl job"""
+
+    def __init__(self, max_roads: int = CRAWL_PLAN_MAX_ROADS):
+        self._roads = LRUDict(max_roads)
+        self._stats = LRUDict(max_roads)
+        self.batches = 0
+
+    def __contains__(self, road_osm_id) -> bool:
+        return int(road_osm_id) in self._roads
+
+    async def load(self, road_osm_ids: Iterable[int]) -> int:
+        """Fetch the roads that aren't cached yet (one query per table), returns how many"""
+        ids = {int(osm_id) for osm_id in road_osm_ids}
+        missing = [osm_id for osm_id in ids if osm_id not in self._roads]
+        if not missing:
+            return 0
+
+        roads, stats_rows = await asyncio.gather(
+            crawl_service.get_roads(missing),
+            async_db.fetch(TIER_STATS_QUERY, (missing,))
+        )
+        self.batches += 1
+        stats = {row['osm_id']: row for row in stats_rows}
+        for osm_id in missing:
+            # Unknown roads are cached as None so they aren't looked up again
+            self._roads.set(osm_id, roads.get(osm_id))
+            self._stats.set(osm_id, stats.get(osm_id))
+
+        logger.debug(f"Crawl plan loaded {len(missing)} roads ({len(roads)} found)")
+        return len(missing)
+
+    async def road(self, road_osm_id: int) -> Optional[Dict]:
+        """Road details incl. city_name, same shape as crawl_service.get_road"""
+        road_osm_id = int(road_osm_id)
+        if road_osm_id not in self._roads:
+            await self.load([road_osm_id])
+        return self._roads.get(road_osm_id)
+
+    async def stats(self, road_osm_id: int) -> Optional[Dict]:
+        road_osm_id = int(road_osm_id)
+        if road_osm_id not in self._stats:
+            await self.load([road_osm_id])
+        return self._stats.get(road_osm_id)
+
+    async def city_name(self, road_osm_id: int) -> Optional[str]:
+        road = await self.road(road_osm_id)
+        return road['city_name'] if road else None
+
+    async def optimal_tier(self, road_osm_id: int) -> Dict:
+        """TierOptimizer.get_optimal_tier without the per-road query"""
+        return tier_for_stats(await self.stats(road_osm_id))
+
+    async def should_crawl(self, road_osm_id: int) -> bool:
+        """TierOptimizer.should_crawl_road without the per-road query"""
+        return worth_crawling(await self.stats(road_osm_id))
+
+    def clear(self):
+        """Drop everything, e.g. once the job is finished"""
+        self._roads.clear()
+        self._stats.clear()
+
+    def info(self) -> Dict:
+        return {
+            'roads': len(self._roads),
+            'max_roads': self._roads.max_entries,
+            'batches': self.batches
+        }
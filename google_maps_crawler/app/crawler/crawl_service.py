@@ -0,0 +1,208 @@
+"""
+Road crawl lifecycle shared by the API and the queue workers
+Look up a road, open a crawl session, search Places, save businesses, close the session
+"""
+import logging
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from .. import cache
+from ..config import MAX_DISTANCE_TO_ROAD_M
+from ..database import async_db, road_distance
+from ..database.bulk_upsert import upsert_businesses_async
+from ..models import Business
+from .google_maps import GoogleMapsClient
+from .road_names import address_on_road
+
+logger = logging.getLogger(__name__)
+
+ROAD_QUERY = """
+    SELECT
+        r.osm_id,
+        r.name,
+        r.highway,
+        r.ref,
+        r.county_fips,
+        r.state_code,
+        ST_X(ST_Centroid(r.geometry)) as center_lon,
+        ST_Y(ST_Centroid(r.geometry)) as center_lat,
+        rcm.city_name
+    FROM osm_roads_main r
+    LEFT JOIN road_city_mapping rcm ON r.id = rcm.road_id
+    WHERE r.osm_id = %s
+    LIMIT 1
+"""
+
+# Same columns for many roads at once (one city per road, like ROAD_QUERY's LIMIT 1)
+ROADS_QUERY = """
+    SELECT DISTINCT ON (r.osm_id)
+        r.osm_id,
+        r.name,
+        r.highway,
+        r.ref,
+        r.county_fips,
+        r.state_code,
+        ST_X(ST_Centroid(r.geometry)) as center_lon,
+        ST_Y(ST_Centroid(r.geometry)) as center_lat,
+        rcm.city_name
+    FROM osm_roads_main r
+    LEFT JOIN road_city_mapping rcm ON r.id = rcm.road_id
+    WHERE r.osm_id = ANY(%s)
+    ORDER BY r.osm_id, rcm.city_name NULLS LAST
+"""
+
+
+async def get_road(road_osm_id: int) -> Optional[Dict]:
+    """Get the road details needed to crawl it"""
+    return await async_db.fetch_one(ROAD_QUERY, (int(road_osm_id),))
+
+
+async def get_roads(road_osm_ids: List[int]) -> Dict[int, Dict]:
+    """Road details for many roads in one query, keyed by osm_id"""
+    rows = await async_db.fetch(ROADS_QUERY, ([int(osm_id) for osm_id in road_osm_ids],))
+    return {row['osm_id']: row for row in rows}
+
+
+async def start_session(road_data: Dict, keyword: str, session_id: Optional[str] = None) -> str:
+    """Create a crawl session in 'crawling' state"""
+    session_id = session_id or str(uuid.uuid4())
+    await async_db.execute(
+        """
+        INSERT INTO crawl_sessions (
+            id, road_osm_id, road_name, city_name, state_code, keyword, status
+        ) VALUES (%s, %s, %s, %s, %s, %s, 'crawling')
+        """,
+        (session_id, road_data['osm_id'], road_data['name'],
+         road_data.get('city_name'), road_data['state_code'], keyword)
+    )
+    return session_id
+
+
+async def complete_session(session_id: str, businesses_found: int,
+                           api_pages: int = 0, cached_pages: int = 0):
+    """Mark a crawl session as completed, with billed vs cached Text Search pages"""
+    await async_db.execute(
+        """
+        UPDATE crawl_sessions
+        SET status = 'completed',
+            businesses_found = %s,
+            api_calls_made = %s,
+            cached_pages = %s,
+            completed_at = CURRENT_TIMESTAMP
+        WHERE id = %s
+        """,
+        (businesses_found, api_pages, cached_pages, session_id)
+    )
+    await cache.invalidate(cache.CRAWL)
+
+
+async def fail_session(session_id: str, error: str):
+    """Mark a crawl session as failed"""
+    await async_db.execute(
+        """
+        UPDATE crawl_sessions
+        SET status = 'failed',
+            error_message = %s,
+            completed_at = CURRENT_TIMESTAMP
+        WHERE id = %s
+        """,
+        (error, session_id)
+    )
+
+
+async def crawl_road_now(gmaps: GoogleMapsClient, road_data: dict, keyword: str,
+                         session_id: str, tier: str = 'enterprise') -> Tuple[List[Business], Dict]:
+    """
+    Crawl businesses along a road using new Text Search API
+    tier picks the field mask (see GoogleMapsClient.field_masks / tier_optimizer)
+    Returns the saved businesses and {'api_pages': n, 'cached_pages': m}
+    """
+    road_id = road_data['osm_id']
+    road_name = road_data.get('name', '')
+    state_code = road_data.get('state_code', '')
+    center_lat = road_data.get('center_lat')
+    center_lon = road_data.get('center_lon')
+
+    logger.info(f"Crawling road {road_name} for keyword: {keyword} ({tier} tier)")
+
+    try:
+        # Get city name for better search (get_road / the crawl plan already joined it)
+        if 'city_name' in road_data:
+            city_name = road_data['city_name'] or ''
+        else:
+            city_result = await async_db.fetch_one(
+                """
+                SELECT DISTINCT city_name
+                FROM road_city_mapping
+                WHERE road_id = (SELECT id FROM osm_roads_main WHERE osm_id = %s LIMIT 1)
+                LIMIT 1
+                """,
+                (road_id,)
+            )
+            city_name = city_result['city_name'] if city_result else ''
+
+        # Search directly for businesses on this road (async client - doesn't block other requests)
+        results = await gmaps.search_businesses_on_road_async(
+            road_name=road_name,
+            city_name=city_name,
+            state_code=state_code,
+            center_lat=center_lat,
+            center_lng=center_lon,
+            tier=tier,
+            business_type=keyword if keyword and keyword != 'all' else None
+        )
+
+        search = {
+            'api_pages': getattr(results, 'api_pages', 0),
+            'cached_pages': getattr(results, 'cached_pages', 0)
+        }
+
+        # API already filtered by keyword
+        businesses = [gmaps.parse_business(place_data, road_id, road_name) for place_data in results or []]
+
+        # Measure the whole page in one query, then drop places blocks away from the road
+        await road_distance.measure(businesses)
+        businesses, dropped = road_distance.drop_far(businesses, MAX_DISTANCE_TO_ROAD_M)
+
+        # Save businesses to database with session_id - one COPY + merge for the whole page
+        if businesses:
+            counts = await upsert_businesses_async(businesses, session_id=session_id, city=city_name)
+            on_road = sum(1 for b in businesses if address_on_road(b.formatted_address, road_name))
+            logger.info(
+                f"Saved {len(businesses)} businesses for {road_name} "
+                f"({counts['inserted']} new, {counts['updated']} updated, {on_road} addressed on the road, "
+                f"{dropped} dropped as too far, {search['cached_pages']} cached pages)"
+            )
+        else:
+            logger.info(f"No businesses found for {road_name}")
+
+        return businesses, search
+
+    except Exception as e:
+        logger.error(f"Error crawling road {road_id}: {e}")
+        raise
+
+
+async def crawl_road(gmaps: GoogleMapsClient, road_data: Dict, keyword: str,
+                     session_id: Optional[str] = None, tier: str = 'enterprise') -> Dict:
+    """
+    Full crawl of one road: session bookkeeping around crawl_road_now
+    Re-raises crawl errors after marking the session failed
+    """
+    session_id = await start_session(road_data, keyword, session_id)
+    try:
+        businesses, search = await crawl_road_now(gmaps, road_data, keyword, session_id, tier)
+    except Exception as e:
+        await fail_session(session_id, str(e))
+        raise
+
+    await complete_session(session_id, len(businesses), search['api_pages'], search['cached_pages'])
+    return {
+        "session_id": session_id,
+        "status": "completed",
+        "businesses_found": len(businesses),
+        "road_name": road_data.get('name'),
+        "tier": tier,
+        "api_calls": search['api_pages'],
+        "cache_hit": search['cached_pages'] > 0
+    }
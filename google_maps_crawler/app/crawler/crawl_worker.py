@@ -0,0 +1,322 @@
+"""
+Standalone crawl worker
+Pulls jobs from crawl_queue, crawls them with the async Places client and
+reports each attempt as a crawl_sessions row.
+
+Usage (from google_maps_crawler/):
+    python -m app.crawler.crawl_worker --processes 4 --concurrency 5
+    python -m app.crawler.crawl_worker --enqueue --state CA --keyword restaurant --limit 5000
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Set
+
+from .. import cache
+from ..config import (
+    CRAWL_PLAN_PREFETCH, CRAWL_QUEUE_POLL_SECONDS, CRAWL_QUEUE_VISIBILITY_TIMEOUT, CRAWL_USE_TIER_STATS,
+    CRAWL_WORKER_CONCURRENCY, GOOGLE_MAPS_API_SHARE
+)
+from ..database import async_db, road_distance
+from . import crawl_service, job_queue, places_cache
+from .crawl_planner import CrawlPlan
+from .google_maps import GoogleMapsClient
+from .rate_limiter import QuotaExceeded
+
+logger = logging.getLogger(__name__)
+
+
+def _seconds_until_utc_midnight() -> float:
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+class CrawlWorker:
+    """One worker process: claims jobs and keeps up to `concurrency` roads in flight"""
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        concurrency: int = CRAWL_WORKER_CONCURRENCY,
+        visibility_timeout: int = CRAWL_QUEUE_VISIBILITY_TIMEOUT,
+        poll_seconds: float = CRAWL_QUEUE_POLL_SECONDS,
+        share: int = 1
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout
+        self.poll_seconds = poll_seconds
+        self.share = max(1, share)
+
+        # Each of `share` processes gets its slice of what the API process leaves
+        self.gmaps = GoogleMapsClient(share=(1 - GOOGLE_MAPS_API_SHARE) / self.share)
+
+        # Road details/city/tier stats, loaded in batches instead of per road
+        self.plan = CrawlPlan()
+
+        self._active: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._paused_until: Optional[datetime] = None
+        self.processed = 0
+        self.cache_hits = 0
+        self.skipped = 0
+        self.failed = 0
+        self._crawl_changed = False
+        self._notified_at = 0.0
+
+    def stop(self):
+        """Stop claiming new jobs; in-flight roads are allowed to finish"""
+        if not self._stopping.is_set():
+            logger.info(f"[{self.worker_id}] Shutting down after {len(self._active)} in-flight jobs")
+            self._stopping.set()
+
+    async def _seed_quota(self):
+        used_today = await async_db.fetch_val(
+            "SELECT COALESCE(SUM(request_count), 0) FROM api_calls WHERE created_at >= CURRENT_DATE"
+        )
+        self.gmaps.daily_quota.seed(int((used_today or 0) * self.gmaps.share))
+
+    async def _notify_api(self, force: bool = False):
+        """
+        Invalidate the API's 'crawl' responses over HTTP, at most once per poll
+        interval. Only needed with the in-process cache - Redis shares the
+        invalidation from complete_session.
+        """
+        if not self._crawl_changed or cache.response_cache.backend.name == 'redis':
+            return
+        if not force and time.monotonic() - self._notified_at < self.poll_seconds:
+            return
+        from ..database.postgres_client import notify_data_changed
+
+        self._crawl_changed = False
+        self._notified_at = time.monotonic()
+        await asyncio.get_running_loop().run_in_executor(None, notify_data_changed, (cache.CRAWL,))
+
+    async def _heartbeat(self, job_id: int):
+        """Keep the lease alive while the road is being crawled"""
+        interval = max(1.0, self.visibility_timeout / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await job_queue.heartbeat(job_id, self.worker_id, self.visibility_timeout):
+                    logger.warning(f"[{self.worker_id}] Lost lease on job {job_id}")
+                    return
+            except Exception as e:
+                logger.error(f"[{self.worker_id}] Heartbeat for job {job_id} failed: {e}")
+
+    async def _process(self, job: Dict):
+        job_id = job['id']
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            road_data = await self.plan.road(job['road_osm_id'])
+            if not road_data:
+                await job_queue.fail(job_id, self.worker_id, "Road not found", retry=False)
+                self.failed += 1
+                return
+
+            # Tier stats come from the same batch load as the road details.
+            # Roads without a road_business_stats row are crawled as before.
+            tier = 'enterprise'
+            if CRAWL_USE_TIER_STATS and await self.plan.stats(job['road_osm_id']):
+                if not await self.plan.should_crawl(job['road_osm_id']):
+                    await job_queue.skip(job_id, self.worker_id, "Low business potential")
+                    self.skipped += 1
+                    logger.info(f"[{self.worker_id}] Job {job_id} skipped: {road_data['name']} has low business potential")
+                    return
+                tier = (await self.plan.optimal_tier(job['road_osm_id']))['tier']
+
+            # Every attempt gets its own crawl session, the job points at the latest one
+            session_id = str(uuid.uuid4())
+            await job_queue.set_session(job_id, session_id)
+            result = await crawl_service.crawl_road(self.gmaps, road_data, job['keyword'], session_id, tier)
+
+            await job_queue.complete(job_id, self.worker_id, result['businesses_found'])
+            self.processed += 1
+            self._crawl_changed = True
+            self.cache_hits += result['cache_hit']
+            logger.info(
+                f"[{self.worker_id}] Job {job_id} done: {road_data['name']} "
+                f"({job['keyword']}, {tier}) -> {result['businesses_found']} businesses"
+                f"{' (cached)' if result['cache_hit'] else ''}"
+            )
+
+        except QuotaExceeded as e:
+            # Not the job's fault - park it (and this worker) until the quota resets
+            delay = _seconds_until_utc_midnight()
+            self._paused_until = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            await job_queue.release(job_id, self.worker_id, delay, str(e))
+            logger.warning(f"[{self.worker_id}] {e}; pausing for {delay / 3600:.1f}h")
+
+        except asyncio.CancelledError:
+            await asyncio.shield(job_queue.release(job_id, self.worker_id, 0, "Worker shut down"))
+            raise
+
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"[{self.worker_id}] Job {job_id} attempt {job['attempts']} failed: {e}")
+            await job_queue.fail(job_id, self.worker_id, str(e))
+
+        finally:
+            heartbeat.cancel()
+
+    async def _plan(self, jobs):
+        """Load the claimed roads plus the next ones in the queue, one query per lookup table"""
+        road_ids = [job['road_osm_id'] for job in jobs]
+        if all(road_id in self.plan for road_id in road_ids):
+            return
+        try:
+            upcoming = await job_queue.upcoming_roads(CRAWL_PLAN_PREFETCH) if CRAWL_PLAN_PREFETCH else []
+            await self.plan.load(road_ids + upcoming)
+        except Exception as e:
+            # _process falls back to loading its own road
+            logger.error(f"[{self.worker_id}] Failed to load crawl plan: {e}")
+
+    async def _wait(self, timeout: float):
+        """Sleep until a job finishes, shutdown is requested, or the timeout passes"""
+        stop_wait = asyncio.create_task(self._stopping.wait())
+        try:
+            await asyncio.wait(self._active | {stop_wait}, timeout=timeout,
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_wait.cancel()
+
+    async def run(self):
+        await async_db.init_pool()
+        await job_queue.ensure_schema()
+        await road_distance.ensure_schema()
+        await places_cache.ensure_schema()
+        try:
+            await self._seed_quota()
+        except Exception as e:
+            logger.error(f"[{self.worker_id}] Failed to load today's API usage: {e}")
+
+        logger.info(f"[{self.worker_id}] Started (concurrency={self.concurrency}, "
+                    f"qps={self.gmaps.rate_limiter.rate:.2f})")
+        try:
+            while not self._stopping.is_set():
+                await self._notify_api()
+                if self._paused_until and datetime.now(timezone.utc) < self._paused_until:
+                    await self._wait(self.poll_seconds)
+                    continue
+
+                free = self.concurrency - len(self._active)
+                jobs = await job_queue.claim(self.worker_id, free, self.visibility_timeout) if free > 0 else []
+                if jobs:
+                    await self._plan(jobs)
+                for job in jobs:
+                    task = asyncio.create_task(self._process(job))
+                    self._active.add(task)
+                    task.add_done_callback(self._active.discard)
+
+                if not jobs and not self._active:
+                    # Queue drained - the next job may come after a re-import
+                    self.plan.clear()
+                    await job_queue.reap_expired()
+                if not jobs or len(self._active) >= self.concurrency:
+                    await self._wait(self.poll_seconds)
+
+            if self._active:
+                await asyncio.wait(self._active)
+        finally:
+            for task in list(self._active):
+                task.cancel()
+            if self._active:
+                await asyncio.gather(*self._active, return_exceptions=True)
+            await self._notify_api(force=True)
+            await self.gmaps.aclose()
+            await async_db.close_pool()
+            logger.info(
+                f"[{self.worker_id}] Stopped: {self.processed} completed "
+                f"({self.cache_hits} from the Text Search cache), {self.skipped} skipped, {self.failed} failed"
+            )
+
+
+def _run_worker(concurrency: int, visibility_timeout: int, share: int):
+    """Process entry point: own event loop, own DB pool, own HTTP client"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(processName)s %(levelname)s %(message)s')
+
+    async def main():
+        worker = CrawlWorker(concurrency=concurrency, visibility_timeout=visibility_timeout, share=share)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(main())
+
+
+async def _enqueue(args):
+    await async_db.init_pool()
+    try:
+        await job_queue.ensure_schema()
+        queued = await job_queue.enqueue_from_stats(
+            keyword=args.keyword,
+            state_code=args.state,
+            county_fips=args.county,
+            min_score=args.min_score,
+            limit=args.limit,
+            created_by='crawl_worker'
+        )
+        logger.info(f"Queued {queued} roads for '{args.keyword}'")
+        logger.info(f"Queue: {await job_queue.queue_stats()}")
+    finally:
+        await async_db.close_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl roads from the Postgres crawl queue")
+    parser.add_argument('--processes', type=int, default=1, help="Worker processes (rate limit is split between them)")
+    parser.add_argument('--concurrency', type=int, default=CRAWL_WORKER_CONCURRENCY, help="Roads in flight per process")
+    parser.add_argument('--visibility-timeout', type=int, default=CRAWL_QUEUE_VISIBILITY_TIMEOUT,
+                        help="Seconds before a job from a dead worker is picked up again")
+    parser.add_argument('--enqueue', action='store_true', help="Queue roads from road_business_stats and exit")
+    parser.add_argument('--keyword', default='all')
+    parser.add_argument('--state', help="State code filter for --enqueue")
+    parser.add_argument('--county', help="County FIPS filter for --enqueue")
+    parser.add_argument('--min-score', type=int, default=0)
+    parser.add_argument('--limit', type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(processName)s %(levelname)s %(message)s')
+
+    if args.enqueue:
+        asyncio.run(_enqueue(args))
+        return
+
+    if args.processes <= 1:
+        _run_worker(args.concurrency, args.visibility_timeout, 1)
+        return
+
+    processes = [
+        multiprocessing.Process(
+            target=_run_worker,
+            args=(args.concurrency, args.visibility_timeout, args.processes),
+            name=f"crawl-worker-{i}"
+        )
+        for i in range(args.processes)
+    ]
+
+    def forward(signum, frame):
+        for p in processes:
+            if p.is_alive():
+                os.kill(p.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
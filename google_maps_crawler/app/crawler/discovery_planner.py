@@ -0,0 +1,234 @@
+"""
+Discovery point planning
+Picks search points every ~200m along roads, skipping the ones that already
+have a known OSM POI within 100m.
+
+Everything is vectorized: geometries are parsed and split with shapely 2.0
+array functions, sample points for all roads are interpolated with NumPy in
+one pass (distances in meters, not degrees * 111000), and POI coverage is one
+bulk STRtree query followed by an exact haversine check.
+
+Usage (from google_maps_crawler/):
+    python -m app.crawler.discovery_planner CA --limit 50000
+"""
+import argparse
+import json
+import logging
+import math
+import time
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE_LAT = 110574  # minimum over the globe; keeps the degree search box conservative
+
+DISCOVERY_SPACING_M = 200
+MIN_POI_GAP_M = 100
+MAX_POINTS_PER_ROAD = 30
+DISCOVERY_RADIUS_M = 200
+
+
+def _require_geo():
+    try:
+        import numpy  # noqa: F401
+        import shapely
+    except ImportError:
+        raise RuntimeError("Discovery planning needs numpy and shapely>=2.0 (pip install numpy shapely)")
+    if int(shapely.__version__.split('.')[0]) < 2:
+        raise RuntimeError(f"Discovery planning needs shapely>=2.0 (found {shapely.__version__})")
+
+
+def haversine_m(lon1, lat1, lon2, lat2):
+    """Great-circle distance in meters (works element-wise on NumPy arrays)"""
+    import numpy as np
+
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def sample_roads(roads: List[Dict], spacing: float = DISCOVERY_SPACING_M):
+    """
+    Points every `spacing` meters along every road part, starting at its first vertex
+    Returns (road_index, lon, lat) arrays, ordered by road and position along it
+    """
+    import numpy as np
+    import shapely
+
+    # GeoJSON -> geometries -> line parts -> vertices, all in bulk
+    geometry_json = np.array([
+        g if isinstance(g, str) or g is None else json.dumps(g)
+        for g in (road.get('geometry_json') for road in roads)
+    ], dtype=object)
+    parts, owners = shapely.get_parts(shapely.from_geojson(geometry_json, on_invalid='ignore'), return_index=True)
+    is_line = (shapely.get_type_id(parts) == 1) & (shapely.get_num_coordinates(parts) >= 2)
+    parts, owners = parts[is_line], owners[is_line]
+    if not len(parts):
+        empty = np.empty(0)
+        return empty.astype(int), empty, empty
+
+    coords = shapely.get_coordinates(parts)
+    sizes = shapely.get_num_coordinates(parts).astype(np.int64)
+    lon, lat = coords[:, 0], coords[:, 1]
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    ends = starts + sizes - 1  # index of each part's last vertex
+
+    # Segment lengths in meters (local equirectangular at each segment's latitude);
+    # the pseudo-segments joining one part to the next get length 0
+    mid_lat = np.radians((lat[:-1] + lat[1:]) / 2)
+    dx = np.radians(np.diff(lon)) * np.cos(mid_lat)
+    dy = np.radians(np.diff(lat))
+    seg = EARTH_RADIUS_M * np.hypot(dx, dy)
+    seg[ends[:-1]] = 0
+    cum = np.concatenate(([0.0], np.cumsum(seg)))
+
+    # Sample offsets 0, spacing, 2*spacing, ... < part length, for all parts at once
+    part_len = cum[ends] - cum[starts]
+    counts = np.ceil(part_len / spacing).astype(np.int64)
+    part_of_sample = np.repeat(np.arange(len(parts)), counts)
+    first_sample = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    k = np.arange(counts.sum()) - np.repeat(first_sample, counts)
+    dist = cum[starts][part_of_sample] + k * spacing
+
+    # Segment containing each sample, kept inside the sample's own part
+    seg_idx = np.searchsorted(cum, dist, side='right') - 1
+    seg_idx = np.clip(seg_idx, starts[part_of_sample], ends[part_of_sample] - 1)
+    seg_len = seg[seg_idx]
+    t = np.divide(dist - cum[seg_idx], seg_len, out=np.zeros_like(dist), where=seg_len > 0)
+
+    sample_lon = lon[seg_idx] + t * (lon[seg_idx + 1] - lon[seg_idx])
+    sample_lat = lat[seg_idx] + t * (lat[seg_idx + 1] - lat[seg_idx])
+    return owners[part_of_sample], sample_lon, sample_lat
+
+
+def covered_by_pois(sample_lon, sample_lat, pois: Iterable[Dict], min_gap: float = MIN_POI_GAP_M):
+    """Boolean mask: sample has a POI within min_gap meters"""
+    import numpy as np
+    import shapely
+
+    covered = np.zeros(len(sample_lon), dtype=bool)
+    poi_xy = np.array(
+        [(p['lon'], p['lat']) for p in pois if p.get('lon') is not None and p.get('lat') is not None],
+        dtype=float
+    ).reshape(-1, 2)
+    if not len(poi_xy) or not len(sample_lon):
+        return covered
+
+    # Degree radius that is >= min_gap in every direction at these latitudes,
+    # so the tree returns a superset that haversine then trims exactly
+    max_lat = min(float(np.abs(sample_lat).max()) + 0.01, 89.0)
+    radius_deg = min_gap / (METERS_PER_DEGREE_LAT * math.cos(math.radians(max_lat)))
+
+    tree = shapely.STRtree(shapely.points(poi_xy))
+    sample_idx, poi_idx = tree.query(
+        shapely.points(sample_lon, sample_lat), predicate='dwithin', distance=radius_deg
+    )
+    near = haversine_m(sample_lon[sample_idx], sample_lat[sample_idx],
+                       poi_xy[poi_idx, 0], poi_xy[poi_idx, 1]) <= min_gap
+    covered[sample_idx[near]] = True
+    return covered
+
+
+def plan_discovery(
+    roads: List[Dict],
+    pois: Iterable[Dict],
+    spacing: float = DISCOVERY_SPACING_M,
+    min_gap: float = MIN_POI_GAP_M,
+    max_points: int = MAX_POINTS_PER_ROAD
+) -> Dict[int, List[Dict]]:
+    """
+    Discovery points for many roads at once, keyed by road osm_id
+    Each road needs osm_id and geometry_json (ST_AsGeoJSON); POIs need lat/lon
+    """
+    _require_geo()
+    import numpy as np
+
+    plan: Dict[int, List[Dict]] = {road['osm_id']: [] for road in roads}
+    owner, lon, lat = sample_roads(roads, spacing)
+    keep = ~covered_by_pois(lon, lat, pois, min_gap)
+    owner, lon, lat = owner[keep], lon[keep], lat[keep]
+
+    # Position of each kept sample within its road, to cap points per road
+    if len(owner):
+        new_road = np.concatenate(([True], owner[1:] != owner[:-1]))
+        run_start = np.maximum.accumulate(np.where(new_road, np.arange(len(owner)), 0))
+        capped = (np.arange(len(owner)) - run_start) < max_points
+        owner, lon, lat = owner[capped], lon[capped], lat[capped]
+
+    for i, x, y in zip(owner.tolist(), lon.tolist(), lat.tolist()):
+        plan[roads[i]['osm_id']].append({
+            'lat': y,
+            'lon': x,
+            'radius': DISCOVERY_RADIUS_M,  # Larger radius for discovery
+            'mode': 'discovery'
+        })
+    return plan
+
+
+def load_state(state_code: str, limit: Optional[int] = None, batch_size: int = 50000):
+    """Named roads and OSM POIs of a state, read through server-side cursors"""
+    from ..database.postgres_client import get_connection
+
+    road_query = """
+        SELECT osm_id, ST_AsGeoJSON(geometry) as geometry_json
+        FROM osm_roads_main
+        WHERE state_code = %s AND name IS NOT NULL
+        ORDER BY osm_id
+    """ + ("LIMIT %s" if limit else "")
+    poi_query = """
+        SELECT COALESCE(lon, ST_X(geometry)) as lon, COALESCE(lat, ST_Y(geometry)) as lat
+        FROM osm_businesses
+        WHERE state_code = %s
+    """
+
+    def read(conn, name, query, params, to_row):
+        cursor = conn.cursor(name=name)
+        cursor.itersize = batch_size
+        cursor.execute(query, params)
+        rows = []
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            rows.extend(to_row(r) for r in batch)
+        cursor.close()
+        return rows
+
+    conn = get_connection()
+    try:
+        roads = read(conn, 'discovery_roads', road_query,
+                     (state_code, limit) if limit else (state_code,),
+                     lambda r: {'osm_id': r[0], 'geometry_json': r[1]})
+        pois = read(conn, 'discovery_pois', poi_query, (state_code,),
+                    lambda r: {'lon': r[0], 'lat': r[1]})
+    finally:
+        conn.rollback()
+        conn.close()
+    return roads, pois
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan discovery search points for a state's roads")
+    parser.add_argument('state_code')
+    parser.add_argument('--limit', type=int, help="Only the first N roads")
+    parser.add_argument('--spacing', type=float, default=DISCOVERY_SPACING_M)
+    parser.add_argument('--min-gap', type=float, default=MIN_POI_GAP_M)
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS_PER_ROAD)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    started = time.time()
+    roads, pois = load_state(args.state_code, args.limit)
+    loaded = time.time()
+    plan = plan_discovery(roads, pois, args.spacing, args.min_gap, args.max_points)
+    planned = time.time()
+
+    total = sum(len(points) for points in plan.values())
+    print(f"{args.state_code}: {len(roads):,} roads, {len(pois):,} POIs -> {total:,} discovery points "
+          f"(load {loaded - started:.1f}s, plan {planned - loaded:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,70 +2,40 @@
 Enhanced search functionality with road name normalization
 """
 from typing import List, Dict, Optional
-import re
+from .road_names import DIRECTIONS, road_variants, tokenize
 
 def generate_road_variants(search_term: str) -> List[str]:
     """
     Generate variants of a road name for better matching
     """
-    variants = [search_term]
-    
-    # Common abbreviations
-    abbreviations = {
-        'Street': ['St', 'St.'],
-        'Avenue': ['Ave', 'Ave.'],
-        'Boulevard': ['Blvd', 'Blvd.'],
-        'Drive': ['Dr', 'Dr.'],
-        'Road': ['Rd', 'Rd.'],
-        'Lane': ['Ln', 'Ln.'],
-        'Court': ['Ct', 'Ct.'],
-        'Place': ['Pl', 'Pl.'],
-        'Highway': ['Hwy', 'Hwy.'],
-        'Parkway': ['Pkwy', 'Pky'],
-        'North': ['N', 'N.'],
-        'South': ['S', 'S.'],
-        'East': ['E', 'E.'],
-        'West': ['W', 'W.']
-    }
-    
-    # Generate variants with abbreviations
-    for full_form, abbrevs in abbreviations.items():
-        if full_form.lower() in search_term.lower():
-            for abbrev in abbrevs:
-                variant = re.sub(full_form, abbrev, search_term, flags=re.IGNORECASE)
-                if variant not in variants:
-                    variants.append(variant)
-        
-        # Also check reverse (abbreviation to full form)
-        for abbrev in abbrevs:
-            if abbrev.lower() in search_term.lower():
-                variant = re.sub(r'\b' + re.escape(abbrev) + r'\b', full_form, search_term, flags=re.IGNORECASE)
-                if variant not in variants:
-                    variants.append(variant)
-    
-    # Special case: Avenue ↔ Street (common Google Maps difference)
-    if 'Avenue' in search_term or 'Ave' in search_term:
-        variants.append(re.sub(r'Avenue|Ave', 'Street', search_term, flags=re.IGNORECASE))
-        variants.append(re.sub(r'Avenue|Ave', 'St', search_term, flags=re.IGNORECASE))
-    
-    if 'Street' in search_term or 'St' in search_term:
-        variants.append(re.sub(r'Street|St\b', 'Avenue', search_term, flags=re.IGNORECASE))
-        variants.append(re.sub(r'Street|St\b', 'Ave', search_term, flags=re.IGNORECASE))
-    
-    # Add directional variants
-    if not any(dir in search_term for dir in ['North', 'South', 'East', 'West', 'N ', 'S ', 'E ', 'W ']):
-        # Add common directional prefixes
-        for direction in ['N', 'S', 'E', 'W', 'North', 'South', 'East', 'West']:
-            variants.append(f"{direction} {search_term}")
-    
-    return list(set(variants))  # Remove duplicates
+    return road_variants(search_term)
+
+def search_variants(search_term: str) -> List[str]:
+    """
+    Normalized names to look up in osm_roads_main.road_name_normalized:
+    the term itself, Avenue <-> Street (common Google Maps difference) and,
+    if it has no direction, the N/S/E/W prefixed forms
+    """
+    tokens = tokenize(search_term)
+    if not tokens:
+        return []
+    variants = [tokens]
+    
+    swapped = [{'ave': 'st', 'st': 'ave'}.get(t, t) for t in tokens]
+    if swapped != tokens:
+        variants.append(swapped)
+    
+    if not DIRECTIONS.intersection(tokens):
+        variants.extend([direction] + tokens for direction in ('n', 's', 'e', 'w'))
+    
+    return list(dict.fromkeys(' '.join(v) for v in variants))
 
 def build_search_query(search_term: str, state_code: Optional[str] = None, 
                       county_fips: Optional[str] = None, limit: int = 50) -> tuple:
     """
     Build an enhanced search query with normalization
     """
-    variants = generate_road_variants(search_term)
+    variants = search_variants(search_term)
     
     # Build the WHERE clause
     where_conditions = ["r.name IS NOT NULL"]
@@ -92,11 +62,9 @@ def build_search_query(search_term: str, state_code: Optional[str] = None,
     name_conditions.append("LOWER(r.name) = LOWER(%s)")
     params.append(search_term)
     
-    # Variant matches
-    if len(variants) > 1:
-        placeholders = ', '.join(['%s'] * len(variants))
-        name_conditions.append(f"r.name = ANY(ARRAY[{placeholders}])")
-        params.extend(variants)
+    # Variant matches - one lookup on the stored normalized name
+    name_conditions.append("r.road_name_normalized = ANY(%s)")
+    params.append(variants)
     
     # Partial match
     name_conditions.append("r.name ILIKE %s")
@@ -121,7 +89,7 @@ def build_search_query(search_term: str, state_code: Optional[str] = None,
                 CASE 
                     WHEN r.name = %s THEN 1
                     WHEN LOWER(r.name) = LOWER(%s) THEN 2
-                    WHEN r.name = ANY(ARRAY[{placeholders if len(variants) > 1 else "'dummy'"}]) THEN 3
+                    WHEN r.road_name_normalized = ANY(%s) THEN 3
                     WHEN r.name ILIKE %s THEN 4
                     ELSE 5
                 END as match_score
@@ -149,11 +117,8 @@ def build_search_query(search_term: str, state_code: Optional[str] = None,
         LIMIT %s
     """
     
-    # Add match score params
-    params.extend([search_term, search_term])
-    if len(variants) > 1:
-        params.extend(variants)
-    params.extend([f"%{search_term}%", limit])
+    # Match score params come first (the CASE precedes the WHERE clause)
+    params = [search_term, search_term, variants, f"%{search_term}%"] + params + [limit]
     
     return query, params
 
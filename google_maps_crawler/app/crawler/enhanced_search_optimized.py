@@ -2,56 +2,40 @@
 Optimized enhanced search using materialized view
 """
 from typing import List, Dict, Optional
-import re
+from .road_names import road_variants
+from .enhanced_search import search_variants
 
 def generate_road_variants(search_term: str) -> List[str]:
     """
     Generate variants of a road name for better matching
     """
-    variants = [search_term]
-    
-    # Common abbreviations
-    abbreviations = {
-        'Street': ['St', 'St.'],
-        'Avenue': ['Ave', 'Ave.'],
-        'Boulevard': ['Blvd', 'Blvd.'],
-        'Drive': ['Dr', 'Dr.'],
-        'Road': ['Rd', 'Rd.'],
-        'Lane': ['Ln', 'Ln.'],
-        'Court': ['Ct', 'Ct.'],
-        'Place': ['Pl', 'Pl.'],
-        'Highway': ['Hwy', 'Hwy.'],
-        'Parkway': ['Pkwy', 'Pky'],
-        'North': ['N', 'N.'],
-        'South': ['S', 'S.'],
-        'East': ['E', 'E.'],
-        'West': ['W', 'W.']
-    }
-    
-    # Generate variants with abbreviations
-    for full_form, abbrevs in abbreviations.items():
-        if full_form.lower() in search_term.lower():
-            for abbrev in abbrevs:
-                variant = re.sub(full_form, abbrev, search_term, flags=re.IGNORECASE)
-                if variant not in variants:
-                    variants.append(variant)
-        
-        # Also check reverse (abbreviation to full form)
-        for abbrev in abbrevs:
-            if abbrev.lower() in search_term.lower():
-                variant = re.sub(r'\b' + re.escape(abbrev) + r'\b', full_form, search_term, flags=re.IGNORECASE)
-                if variant not in variants:
-                    variants.append(variant)
-    
-    return list(set(variants))[:10]  # Limit to 10 variants max
+    return road_variants(search_term)
+
+# Set once osm_roads_main.road_name_normalized exists
+# (python -m app.database.road_name_normalized); checked again until it does
+_normalized_names = False
+
+def has_normalized_names() -> bool:
+    """
+    Whether osm_roads_main.road_name_normalized has been added
+    """
+    global _normalized_names
+    if not _normalized_names:
+        from ..database.postgres_client import execute_query
+        _normalized_names = bool(execute_query("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'osm_roads_main' AND column_name = 'road_name_normalized'
+        """, fetch_one=True))
+    return _normalized_names
 
 def build_search_query_optimized(search_term: str, state_code: Optional[str] = None, 
-                                county_fips: Optional[str] = None, limit: int = 50) -> tuple:
+                                county_fips: Optional[str] = None, limit: int = 50,
+                                use_normalized: bool = True) -> tuple:
     """
     Build an optimized search query using materialized view
+    Without use_normalized the name variants are matched with ILIKE instead of
+    osm_roads_main.road_name_normalized
     """
-    variants = generate_road_variants(search_term)
-    
     # Build WHERE conditions
     where_conditions = []
     params = []
@@ -66,9 +50,16 @@ def build_search_query_optimized(search_term: str, state_code: Optional[str] = N
         where_conditions.append("county_fips = %s")
         params.append(county_fips)
     
-    # Use simple ILIKE for search - let Postgres use the GIN index
-    where_conditions.append("road_name ILIKE %s")
-    params.append(f"%{search_term}%")
+    # Normalized variants (St/Street, N/North, ...) by equality on the stored
+    # osm_roads_main.road_name_normalized, partial names through the GIN index
+    if use_normalized:
+        variants = search_variants(search_term)
+        variant_match = "osm_id IN (SELECT osm_id FROM osm_roads_main WHERE road_name_normalized = ANY(%s))"
+    else:
+        variants = generate_road_variants(search_term)
+        variant_match = "road_name ILIKE ANY(%s)"
+    where_conditions.append(f"({variant_match} OR road_name ILIKE %s)")
+    params.extend([variants, f"%{search_term}%"])
     
     # Build the query using materialized view
     where_clause = " AND ".join(where_conditions) if where_conditions else "1=1"
@@ -87,8 +78,9 @@ def build_search_query_optimized(search_term: str, state_code: Optional[str] = N
                 CASE 
                     WHEN road_name = %s THEN 1
                     WHEN LOWER(road_name) = LOWER(%s) THEN 2
-                    WHEN road_name ILIKE %s THEN 3
-                    ELSE 4
+                    WHEN {variant_match} THEN 3
+                    WHEN road_name ILIKE %s THEN 4
+                    ELSE 5
                 END as match_score
             FROM city_roads_simple
             WHERE {where_clause}
@@ -109,7 +101,7 @@ def build_search_query_optimized(search_term: str, state_code: Optional[str] = N
     """
     
     # Add scoring params at the beginning
-    params = [search_term, search_term, f"{search_term}%"] + params + [limit]
+    params = [search_term, search_term, variants, f"{search_term}%"] + params + [limit]
     
     return query, params
 
@@ -120,7 +112,8 @@ def search_roads_enhanced(conn, search_term: str, state_code: Optional[str] = No
     """
     from ..database.postgres_client import execute_query
     
-    query, params = build_search_query_optimized(search_term, state_code, county_fips, limit)
+    query, params = build_search_query_optimized(search_term, state_code, county_fips, limit,
+                                                 use_normalized=has_normalized_names())
     
     results = execute_query(query, params)
     
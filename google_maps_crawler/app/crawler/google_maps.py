@@ -2,19 +2,50 @@
 Google Maps Places API (New) wrapper
 Migrated to use the new Places API v1 for better performance and cost optimization
 """
+import asyncio
 import requests
-from typing import List, Dict, Optional, Tuple
+import httpx
+from typing import List, Dict, Optional, Tuple, Iterable
 import logging
-from tenacity import retry, stop_after_attempt, wait_exponential
-from ..config import GOOGLE_MAPS_API_KEY, MAX_RESULTS_PER_LOCATION
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from ..config import (
+    GOOGLE_MAPS_API_KEY, MAX_RESULTS_PER_LOCATION,
+    GOOGLE_MAPS_REQUESTS_PER_SECOND, GOOGLE_MAPS_DAILY_LIMIT, GOOGLE_MAPS_API_SHARE,
+    GOOGLE_MAPS_MAX_CONCURRENCY, GOOGLE_MAPS_PAGE_DELAY_SECONDS
+)
 from ..models import Business
+from . import places_cache
+from .rate_limiter import TokenBucket, DailyQuota, QuotaExceeded
 from datetime import datetime
 import time
 
 logger = logging.getLogger(__name__)
 
+class PlacesAPIError(Exception):
+    """Places API request that can't succeed as sent (bad key, 4xx, retries exhausted)"""
+
+class RetryableAPIError(PlacesAPIError):
+    """Transient Places API failure (429 / 5xx) worth retrying"""
+
+class TextSearchResults(list):
+    """Places of one text search, plus how many pages were billed vs served from the cache"""
+
+    def __init__(self, places: Iterable[Dict] = (), api_pages: int = 0, cached_pages: int = 0):
+        super().__init__(places)
+        self.api_pages = api_pages
+        self.cached_pages = cached_pages
+
+    @property
+    def from_cache(self) -> bool:
+        return self.cached_pages > 0
+
+    @classmethod
+    def from_cached_pages(cls, pages: List[Dict]) -> 'TextSearchResults':
+        places = [place for page in pages for place in page.get('places', [])]
+        return cls(places[:MAX_RESULTS_PER_LOCATION], cached_pages=len(pages))
+
 class GoogleMapsClient:
-    def __init__(self):
+    def __init__(self, share: float = 1.0):
         self.api_key = GOOGLE_MAPS_API_KEY
         logger.info(f"Loaded API key from config: {self.api_key}")
         if not self.api_key or self.api_key == 'your_google_maps_api_key_here':
@@ -28,6 +59,17 @@ class GoogleMapsClient:
         self.text_search_url = f"{self.base_url}/places:searchText"
         self.place_details_url = f"{self.base_url}/places"
         
+        # Shared rate limits across sync and async callers; `share` is this
+        # process's slice of the configured rate and daily limit
+        self.share = share
+        self.rate_limiter = TokenBucket(GOOGLE_MAPS_REQUESTS_PER_SECOND * share)
+        self.daily_quota = DailyQuota(int(GOOGLE_MAPS_DAILY_LIMIT * share))
+        self.max_concurrency = GOOGLE_MAPS_MAX_CONCURRENCY
+        
+        # Keep-alive HTTP sessions (async client is created lazily inside the event loop)
+        self.session = requests.Session()
+        self._async_client: Optional[httpx.AsyncClient] = None
+        
         # Field masks for different tiers - MUST include nextPageToken for pagination
         self.field_masks = {
             'basic': 'places.id,places.displayName,places.formattedAddress,places.location,places.types,nextPageToken',
@@ -43,6 +85,74 @@ class GoogleMapsClient:
             'enterprise_minimal': 'places.id,places.displayName,places.formattedAddress,places.location,places.types,places.nationalPhoneNumber,nextPageToken'
         }
     
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Shared async HTTP client with a keep-alive connection pool"""
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+        return self._async_client
+    
+    async def aclose(self):
+        """Close HTTP connections (call on app shutdown)"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.session.close()
+    
+    def _text_search_request(
+        self,
+        query: str,
+        location_bias: Optional[Dict],
+        tier: str
+    ) -> Tuple[Dict, Dict]:
+        """Build headers and body for a Text Search request"""
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Goog-Api-Key': self.api_key,
+            'X-Goog-FieldMask': self.field_masks.get(tier, self.field_masks['enterprise'])
+        }
+        
+        # Build request body
+        body = {
+            'textQuery': query,
+            'pageSize': 20,  # Max per page
+            'maxResultCount': 60,  # Maximum total results across all pages
+            'languageCode': 'en'
+        }
+        
+        # Add location bias if provided
+        if location_bias:
+            body['locationBias'] = location_bias
+        
+        return headers, body
+    
+    def _track_api_call(self, page_count: int, result_count: int, query: str):
+        """Record API usage in api_calls"""
+        try:
+            from ..database.postgres_client import execute_query
+            execute_query("""
+                INSERT INTO api_calls (api_type, endpoint, request_count, response_count, keyword)
+                VALUES ('text_search', 'places:searchText', %s, %s, %s)
+            """, (page_count, result_count, query[:255]))
+        except Exception as e:
+            logger.error(f"Failed to track API call: {e}")
+    
+    async def _track_api_call_async(self, page_count: int, result_count: int, query: str):
+        """Record API usage in api_calls without blocking the event loop"""
+        try:
+            from ..database import async_db
+            await async_db.execute("""
+                INSERT INTO api_calls (api_type, endpoint, request_count, response_count, keyword)
+                VALUES ('text_search', 'places:searchText', %s, %s, %s)
+            """, (page_count, result_count, query[:255]))
+        except Exception as e:
+            logger.error(f"Failed to track API call: {e}")
+    
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     def search_text(
         self, 
@@ -53,61 +163,54 @@ class GoogleMapsClient:
         """
         Search for places using text query (New API)
         More efficient than nearby search for road-based searches
+        Repeats of a request within its tier's TTL are served from places_response_cache
         """
+        headers, body = self._text_search_request(query, location_bias, tier)
+        cache_key = places_cache.request_key(body, headers['X-Goog-FieldMask'])
+        cached = places_cache.get(cache_key, tier)
+        if cached is not None:
+            results = TextSearchResults.from_cached_pages(cached)
+            logger.info(f"Text search '{query}': {len(results)} results from {len(cached)} cached pages")
+            return results
+        
         if not self.api_key:
             logger.warning("Google Maps API key not configured")
-            return []
+            return TextSearchResults()
             
+        results = []
+        pages = []
+        next_page_token = None
+        page_count = 0
+        
         try:
-            headers = {
-                'Content-Type': 'application/json',
-                'X-Goog-Api-Key': self.api_key,
-                'X-Goog-FieldMask': self.field_masks.get(tier, self.field_masks['enterprise'])
-            }
-            
-            # Build request body
-            body = {
-                'textQuery': query,
-                'pageSize': 20,  # Max per page
-                'maxResultCount': 60,  # Maximum total results across all pages
-                'languageCode': 'en'
-            }
-            
-            # Add location bias if provided
-            if location_bias:
-                body['locationBias'] = location_bias
-            
-            results = []
-            next_page_token = None
-            page_count = 0
-            
             # Get all pages (up to 60 results total - 3 pages of 20 each)
             while len(results) < MAX_RESULTS_PER_LOCATION and page_count < 3:
                 if next_page_token:
                     # For pagination, keep all params same except add pageToken
                     body['pageToken'] = next_page_token
-                    time.sleep(2)  # Required delay for pagination
+                    if GOOGLE_MAPS_PAGE_DELAY_SECONDS:
+                        time.sleep(GOOGLE_MAPS_PAGE_DELAY_SECONDS)
+                
+                self.daily_quota.consume()
+                self.rate_limiter.acquire()
                 
                 logger.info(f"Requesting page {page_count + 1} for query: {query}")
-                response = requests.post(
+                response = self.session.post(
                     self.text_search_url,
                     headers=headers,
-                    json=body
+                    json=body,
+                    timeout=30
                 )
                 
                 if response.status_code == 200:
                     data = response.json()
+                    pages.append(data)
                     places = data.get('places', [])
                     results.extend(places)
                     logger.info(f"Page {page_count + 1}: Found {len(places)} places, total so far: {len(results)}")
                     
                     # Check for nextPageToken
                     next_page_token = data.get('nextPageToken')
-                    if next_page_token:
-                        logger.info(f"Next page token available: {next_page_token[:20]}...")
-                    else:
-                        logger.info("No nextPageToken in response")
-                    
                     page_count += 1
                     
                     if not next_page_token or not places:
@@ -117,43 +220,117 @@ class GoogleMapsClient:
                     logger.error(f"Text search failed: {response.status_code} - {response.text}")
                     if response.status_code == 403:
                         logger.error("API key may be invalid or Places API not enabled")
+                    # Partial answers are not cached
+                    pages = []
                     break
             
             logger.info(f"Text search completed. Total results: {len(results)} from {page_count} pages")
             
-            # Track API usage
-            try:
-                from ..database.postgres_client import execute_query
-                execute_query("""
-                    INSERT INTO api_calls (api_type, endpoint, request_count, response_count, keyword)
-                    VALUES ('text_search', 'places:searchText', %s, %s, %s)
-                """, (page_count, len(results), query[:255]))
-            except Exception as e:
-                logger.error(f"Failed to track API call: {e}")
+            places_cache.put(cache_key, tier, query, pages)
             
-            return results[:MAX_RESULTS_PER_LOCATION]
+            return TextSearchResults(results[:MAX_RESULTS_PER_LOCATION], api_pages=page_count)
             
+        except QuotaExceeded as e:
+            logger.warning(str(e))
+            return TextSearchResults()
         except Exception as e:
             logger.error(f"Error in text search: {e}")
-            return []
+            return TextSearchResults()
+        finally:
+            # Track API usage - pages billed before a failure still count
+            if page_count:
+                self._track_api_call(page_count, len(results), query)
     
-    def search_businesses_on_road(
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        retry=retry_if_exception_type((RetryableAPIError, httpx.TransportError)),
+        reraise=True
+    )
+    async def _post_text_search_page(self, headers: Dict, body: Dict) -> httpx.Response:
+        """POST one Text Search page, honoring QPS and daily limits"""
+        self.daily_quota.consume()
+        await self.rate_limiter.acquire_async()
+        
+        response = await self._get_async_client().post(self.text_search_url, headers=headers, json=body)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableAPIError(f"{response.status_code} - {response.text[:200]}")
+        return response
+    
+    async def search_text_async(
         self,
+        query: str,
+        location_bias: Optional[Dict] = None,
+        tier: str = 'enterprise'
+    ) -> List[Dict]:
+        """
+        Async version of search_text
+        Uses the shared keep-alive client; many queries can run concurrently
+        while the token bucket keeps the overall rate at the configured QPS
+        Unlike search_text, failures raise instead of returning an empty list:
+        QuotaExceeded when the daily limit is hit, PlacesAPIError (or
+        httpx.TransportError) when the API can't answer - so crawls don't
+        record a failed search as a road with no businesses.
+        """
+        headers, body = self._text_search_request(query, location_bias, tier)
+        cache_key = places_cache.request_key(body, headers['X-Goog-FieldMask'])
+        cached = await places_cache.get_async(cache_key, tier)
+        if cached is not None:
+            results = TextSearchResults.from_cached_pages(cached)
+            logger.info(f"Text search '{query}': {len(results)} results from {len(cached)} cached pages")
+            return results
+        
+        if not self.api_key:
+            raise PlacesAPIError("Google Maps API key not configured")
+        
+        results = []
+        pages = []
+        page_count = 0
+        
+        try:
+            # Pages of one query depend on the previous nextPageToken, so they stay sequential
+            while len(results) < MAX_RESULTS_PER_LOCATION and page_count < 3:
+                response = await self._post_text_search_page(headers, body)
+                
+                if response.status_code != 200:
+                    if response.status_code == 403:
+                        logger.error("API key may be invalid or Places API not enabled")
+                    raise PlacesAPIError(f"Text search failed: {response.status_code} - {response.text[:200]}")
+                
+                data = response.json()
+                pages.append(data)
+                places = data.get('places', [])
+                results.extend(places)
+                page_count += 1
+                
+                next_page_token = data.get('nextPageToken')
+                if not next_page_token or not places:
+                    break
+                
+                body = {**body, 'pageToken': next_page_token}
+                if GOOGLE_MAPS_PAGE_DELAY_SECONDS:
+                    await asyncio.sleep(GOOGLE_MAPS_PAGE_DELAY_SECONDS)
+        finally:
+            # Pages billed before a failure still count
+            if page_count:
+                await self._track_api_call_async(page_count, len(results), query)
+        
+        logger.info(f"Text search '{query}': {len(results)} results from {page_count} pages")
+        # Only complete answers get here - partial ones (errors, quota) are never cached
+        await places_cache.put_async(cache_key, tier, query, pages)
+        
+        return TextSearchResults(results[:MAX_RESULTS_PER_LOCATION], api_pages=page_count)
+    
+    @staticmethod
+    def _road_search_params(
         road_name: str,
         city_name: str,
         state_code: str,
         center_lat: Optional[float] = None,
         center_lng: Optional[float] = None,
-        tier: str = 'enterprise',
         business_type: Optional[str] = None
-    ) -> List[Dict]:
-        """
-        Specialized method to search businesses on a specific road
-        Optimization strategies:
-        1. Use 'enterprise' to get ALL fields in one request (same cost)
-        2. Use 'enterprise_minimal' for initial discovery
-        3. Filter by business_type to reduce irrelevant results
-        """
+    ) -> Tuple[str, Optional[Dict]]:
+        """Build the text query and location bias for a road search"""
         # Build optimized query
         if business_type:
             query = f"{business_type} on {road_name}, {city_name}, {state_code}"
@@ -173,8 +350,55 @@ class GoogleMapsClient:
                 }
             }
         
+        return query, location_bias
+    
+    def search_businesses_on_road(
+        self,
+        road_name: str,
+        city_name: str,
+        state_code: str,
+        center_lat: Optional[float] = None,
+        center_lng: Optional[float] = None,
+        tier: str = 'enterprise',
+        business_type: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Specialized method to search businesses on a specific road
+        Optimization strategies:
+        1. Use 'enterprise' to get ALL fields in one request (same cost)
+        2. Use 'enterprise_minimal' for initial discovery
+        3. Filter by business_type to reduce irrelevant results
+        """
+        query, location_bias = self._road_search_params(
+            road_name, city_name, state_code, center_lat, center_lng, business_type
+        )
         return self.search_text(query, location_bias, tier)
     
+    async def search_businesses_on_road_async(
+        self,
+        road_name: str,
+        city_name: str,
+        state_code: str,
+        center_lat: Optional[float] = None,
+        center_lng: Optional[float] = None,
+        tier: str = 'enterprise',
+        business_type: Optional[str] = None
+    ) -> List[Dict]:
+        """Async version of search_businesses_on_road"""
+        query, location_bias = self._road_search_params(
+            road_name, city_name, state_code, center_lat, center_lng, business_type
+        )
+        return await self.search_text_async(query, location_bias, tier)
+    
+    def get_usage(self) -> Dict:
+        """Rate limit and daily quota status"""
+        return {
+            'requests_per_second': self.rate_limiter.rate,
+            'max_concurrency': self.max_concurrency,
+            'daily_quota': self.daily_quota.stats(),
+            'text_search_cache': places_cache.info()
+        }
+    
     def get_place_details(self, place_id: str, tier: str = 'enterprise') -> Optional[Dict]:
         """
         Get place details using new API
@@ -193,9 +417,12 @@ class GoogleMapsClient:
                 'X-Goog-FieldMask': self.field_masks.get(tier, self.field_masks['enterprise'])
             }
             
-            response = requests.get(
+            self.daily_quota.consume()
+            self.rate_limiter.acquire()
+            response = self.session.get(
                 f"{self.place_details_url}/{place_id}",
-                headers=headers
+                headers=headers,
+                timeout=30
             )
             
             if response.status_code == 200:
@@ -273,7 +500,6 @@ class GoogleMapsClient:
             opening_hours=opening_hours,
             road_osm_id=road_osm_id,
             road_name=road_name,
-            distance_to_road=0,  # TODO: Calculate actual distance
             crawled_at=datetime.utcnow()
         )
     
@@ -319,4 +545,19 @@ class GoogleMapsClient:
             return None
         except Exception as e:
             logger.error(f"Error geocoding address: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+_client: Optional[GoogleMapsClient] = None
+
+
+def get_client() -> GoogleMapsClient:
+    """
+    Process-wide client, so every route shares one rate limiter, quota and HTTP pool
+    The API process only gets GOOGLE_MAPS_API_SHARE of the limits; crawl workers
+    split the rest
+    """
+    global _client
+    if _client is None:
+        _client = GoogleMapsClient(share=GOOGLE_MAPS_API_SHARE)
+    return _client
@@ -0,0 +1,341 @@
+"""
+Postgres-backed crawl job queue
+Jobs live in crawl_queue (see database/schemas_crawl_queue.sql) so they survive
+API restarts, and workers claim them with FOR UPDATE SKIP LOCKED.
+
+Lifecycle: pending -> running (leased until locked_until) -> completed
+A failed attempt goes back to pending with exponential backoff until
+max_attempts, then stays failed. A running job whose lease expires
+(worker died) is claimable again.
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config import (
+    CRAWL_QUEUE_MAX_ATTEMPTS, CRAWL_QUEUE_RETRY_BASE_SECONDS, CRAWL_QUEUE_VISIBILITY_TIMEOUT
+)
+from ..database import async_db
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_FILE = os.path.join(os.path.dirname(__file__), '..', 'database', 'schemas_crawl_queue.sql')
+
+CLAIM_SQL = """
+    WITH next_jobs AS (
+        SELECT id
+        FROM crawl_queue
+        WHERE (status = 'pending' AND available_at <= CURRENT_TIMESTAMP)
+           OR (status = 'running' AND locked_until < CURRENT_TIMESTAMP AND attempts < max_attempts)
+        ORDER BY priority DESC, available_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE crawl_queue q
+    SET status = 'running',
+        attempts = q.attempts + 1,
+        locked_by = %s,
+        locked_until = CURRENT_TIMESTAMP + make_interval(secs => %s),
+        updated_at = CURRENT_TIMESTAMP
+    FROM next_jobs
+    WHERE q.id = next_jobs.id
+    RETURNING q.id, q.road_osm_id, q.keyword, q.priority, q.attempts, q.max_attempts, q.session_id
+"""
+
+
+async def ensure_schema():
+    """Create the queue table if it doesn't exist"""
+    with open(_SCHEMA_FILE) as f:
+        schema_sql = f.read()
+    async with async_db.connection() as conn:
+        await conn.execute(schema_sql)
+
+
+async def enqueue(road_osm_id: int, keyword: str = 'all', priority: int = 0,
+                  created_by: str = 'system') -> Optional[int]:
+    """
+    Queue one road for crawling
+    Returns the job id, or None if the road/keyword is already queued
+    """
+    return await async_db.fetch_val(
+        """
+        INSERT INTO crawl_queue (road_osm_id, keyword, priority, max_attempts, created_by)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (road_osm_id, keyword) WHERE status IN ('pending', 'running') DO NOTHING
+        RETURNING id
+        """,
+        (int(road_osm_id), keyword, priority, CRAWL_QUEUE_MAX_ATTEMPTS, created_by)
+    )
+
+
+async def enqueue_many(jobs: Iterable[Tuple[int, str, int]], created_by: str = 'system') -> int:
+    """Queue (road_osm_id, keyword, priority) tuples, returns how many were new"""
+    jobs = list(jobs)
+    if not jobs:
+        return 0
+    return await async_db.execute(
+        """
+        INSERT INTO crawl_queue (road_osm_id, keyword, priority, max_attempts, created_by)
+        SELECT road_osm_id, keyword, priority, %s, %s
+        FROM unnest(%s::bigint[], %s::text[], %s::int[]) AS j(road_osm_id, keyword, priority)
+        ON CONFLICT (road_osm_id, keyword) WHERE status IN ('pending', 'running') DO NOTHING
+        """,
+        (CRAWL_QUEUE_MAX_ATTEMPTS, created_by,
+         [int(j[0]) for j in jobs], [j[1] for j in jobs], [int(j[2]) for j in jobs])
+    )
+
+
+async def enqueue_from_stats(
+    keyword: str = 'all',
+    state_code: Optional[str] = None,
+    county_fips: Optional[str] = None,
+    min_score: int = 0,
+    limit: int = 1000,
+    created_by: str = 'system'
+) -> int:
+    """
+    Queue the highest-potential roads from road_business_stats
+    Roads already crawled for this keyword, or already queued, are skipped
+    """
+    conditions = ["rbs.business_potential_score >= %s"]
+    params = [min_score]
+
+    if state_code:
+        conditions.append("rbs.state_code = %s")
+        params.append(state_code)
+    if county_fips:
+        conditions.append("rbs.county_fips = %s")
+        params.append(county_fips)
+
+    where_clause = " AND ".join(conditions)
+
+    return await async_db.execute(
+        f"""
+        INSERT INTO crawl_queue (road_osm_id, keyword, priority, max_attempts, created_by)
+        SELECT rbs.osm_id, %s::text, rbs.business_potential_score * 1000 + LEAST(rbs.poi_count, 999), %s, %s
+        FROM road_business_stats rbs
+        WHERE {where_clause}
+        AND NOT EXISTS (
+            SELECT 1 FROM crawl_sessions cs
+            WHERE cs.road_osm_id = rbs.osm_id
+            AND cs.keyword = %s
+            AND cs.status = 'completed'
+        )
+        ORDER BY rbs.business_potential_score DESC, rbs.poi_count DESC
+        LIMIT %s
+        ON CONFLICT (road_osm_id, keyword) WHERE status IN ('pending', 'running') DO NOTHING
+        """,
+        [keyword, CRAWL_QUEUE_MAX_ATTEMPTS, created_by] + params + [keyword, limit]
+    )
+
+
+async def claim(worker_id: str, batch_size: int = 1,
+                visibility_timeout: int = CRAWL_QUEUE_VISIBILITY_TIMEOUT) -> List[Dict]:
+    """Lease up to batch_size jobs for this worker"""
+    return await async_db.fetch(CLAIM_SQL, (batch_size, worker_id, visibility_timeout))
+
+
+async def upcoming_roads(limit: int) -> List[int]:
+    """Roads of the next pending jobs, in the order they will be claimed"""
+    rows = await async_db.fetch(
+        """
+        SELECT road_osm_id
+        FROM crawl_queue
+        WHERE status = 'pending'
+        ORDER BY priority DESC, available_at
+        LIMIT %s
+        """,
+        (limit,)
+    )
+    return [row['road_osm_id'] for row in rows]
+
+
+async def heartbeat(job_id: int, worker_id: str,
+                    visibility_timeout: int = CRAWL_QUEUE_VISIBILITY_TIMEOUT) -> bool:
+    """Extend a job's lease; False means the lease was lost to another worker"""
+    updated = await async_db.execute(
+        """
+        UPDATE crawl_queue
+        SET locked_until = CURRENT_TIMESTAMP + make_interval(secs => %s),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s AND locked_by = %s AND status = 'running'
+        """,
+        (visibility_timeout, job_id, worker_id)
+    )
+    return updated > 0
+
+
+async def set_session(job_id: int, session_id: str):
+    """Link the job to the crawl session reporting its progress"""
+    await async_db.execute(
+        "UPDATE crawl_queue SET session_id = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
+        (session_id, job_id)
+    )
+
+
+async def complete(job_id: int, worker_id: str, businesses_found: int = 0):
+    """Mark a job done"""
+    await async_db.execute(
+        """
+        UPDATE crawl_queue
+        SET status = 'completed',
+            businesses_found = %s,
+            last_error = NULL,
+            locked_by = NULL,
+            locked_until = NULL,
+            completed_at = CURRENT_TIMESTAMP,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s AND locked_by = %s
+        """,
+        (businesses_found, job_id, worker_id)
+    )
+
+
+async def skip(job_id: int, worker_id: str, reason: str):
+    """Close a job without crawling it (road not worth the API calls)"""
+    await async_db.execute(
+        """
+        UPDATE crawl_queue
+        SET status = 'skipped',
+            last_error = %s,
+            locked_by = NULL,
+            locked_until = NULL,
+            completed_at = CURRENT_TIMESTAMP,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s AND locked_by = %s
+        """,
+        (reason, job_id, worker_id)
+    )
+
+
+async def fail(job_id: int, worker_id: str, error: str, retry: bool = True):
+    """
+    Record a failed attempt
+    Retries after CRAWL_QUEUE_RETRY_BASE_SECONDS * 2^(attempts-1), or gives up at
+    max_attempts (or right away when retry=False, e.g. the road no longer exists)
+    """
+    await async_db.execute(
+        """
+        UPDATE crawl_queue
+        SET status = CASE WHEN %s OR attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+            available_at = CURRENT_TIMESTAMP
+                + make_interval(secs => %s * power(2, GREATEST(attempts - 1, 0))),
+            last_error = %s,
+            locked_by = NULL,
+            locked_until = NULL,
+            completed_at = CASE WHEN %s OR attempts >= max_attempts THEN CURRENT_TIMESTAMP END,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s AND locked_by = %s
+        """,
+        (not retry, CRAWL_QUEUE_RETRY_BASE_SECONDS, error[:2000], not retry, job_id, worker_id)
+    )
+
+
+async def release(job_id: int, worker_id: str, delay_seconds: float = 0, reason: Optional[str] = None):
+    """
+    Hand a job back without counting the attempt
+    Used for shutdown and quota exhaustion, which aren't the job's fault
+    """
+    await async_db.execute(
+        """
+        UPDATE crawl_queue
+        SET status = 'pending',
+            attempts = GREATEST(attempts - 1, 0),
+            available_at = CURRENT_TIMESTAMP + make_interval(secs => %s),
+            last_error = COALESCE(%s, last_error),
+            locked_by = NULL,
+            locked_until = NULL,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s AND locked_by = %s
+        """,
+        (delay_seconds, reason, job_id, worker_id)
+    )
+
+
+async def reap_expired() -> int:
+    """
+    Fail jobs whose lease expired on their last attempt
+    (claim() already re-leases expired jobs that have attempts left)
+    """
+    return await async_db.execute(
+        """
+        UPDATE crawl_queue
+        SET status = 'failed',
+            last_error = COALESCE(last_error, 'Worker lease expired'),
+            locked_by = NULL,
+            locked_until = NULL,
+            completed_at = CURRENT_TIMESTAMP,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE status = 'running'
+        AND locked_until < CURRENT_TIMESTAMP
+        AND attempts >= max_attempts
+        """
+    )
+
+
+async def retry_failed(keyword: Optional[str] = None) -> int:
+    """Put failed jobs back in the queue with a fresh attempt budget"""
+    conditions = ["status = 'failed'"]
+    params = []
+    if keyword:
+        conditions.append("keyword = %s")
+        params.append(keyword)
+
+    # Latest failure per road/keyword only, and not if it's already queued again
+    return await async_db.execute(
+        f"""
+        UPDATE crawl_queue
+        SET status = 'pending',
+            attempts = 0,
+            available_at = CURRENT_TIMESTAMP,
+            completed_at = NULL,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id IN (
+            SELECT DISTINCT ON (road_osm_id, keyword) id
+            FROM crawl_queue
+            WHERE {' AND '.join(conditions)}
+            ORDER BY road_osm_id, keyword, id DESC
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM crawl_queue live
+            WHERE live.road_osm_id = crawl_queue.road_osm_id
+            AND live.keyword = crawl_queue.keyword
+            AND live.status IN ('pending', 'running')
+        )
+        """,
+        params
+    )
+
+
+async def queue_stats() -> Dict:
+    """Job counts by status plus active worker leases"""
+    by_status, workers = await asyncio.gather(async_db.fetch(
+        """
+        SELECT
+            status,
+            COUNT(*) as count,
+            SUM(businesses_found) as businesses_found,
+            MIN(available_at) FILTER (WHERE status = 'pending') as next_available_at
+        FROM crawl_queue
+        GROUP BY status
+        """
+    ), async_db.fetch(
+        """
+        SELECT locked_by as worker_id, COUNT(*) as running_jobs, MAX(locked_until) as lease_until
+        FROM crawl_queue
+        WHERE status = 'running' AND locked_until >= CURRENT_TIMESTAMP
+        GROUP BY locked_by
+        ORDER BY locked_by
+        """
+    ))
+    counts = {row['status']: row['count'] for row in by_status}
+    return {
+        'pending': counts.get('pending', 0),
+        'running': counts.get('running', 0),
+        'completed': counts.get('completed', 0),
+        'failed': counts.get('failed', 0),
+        'skipped': counts.get('skipped', 0),
+        'by_status': by_status,
+        'workers': workers
+    }
@@ -0,0 +1,263 @@
+"""
+Cache for location analyses and area classifications
+
+Users click around the same neighborhoods, and the scoring functions are heavy
+PostGIS queries. Points are snapped to geohash cells (LOCATION_CACHE_PRECISION,
+7 = ~150m) and the analysis is computed once per (cell center, radius):
+
+1. in-process LRU with TTL - repeat lookups never leave the process
+2. optional location_score_cache table (LOCATION_CACHE_PERSIST=true), shared by
+   every process and surviving restarts; rows are tied to the osm_businesses
+   data version, which a statement trigger bumps on every import/update
+
+The in-process tier is dropped when the API gets an 'osm' invalidation
+(import scripts call notify_data_changed), otherwise entries expire by TTL.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .. import cache
+from ..cache import LRUDict
+from ..config import (
+    LOCATION_CACHE_PRECISION, LOCATION_CACHE_TTL,
+    LOCATION_CACHE_MAX_ENTRIES, LOCATION_CACHE_PERSIST
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'schemas_location_cache.sql')
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_encode(lat: float, lon: float, precision: int = LOCATION_CACHE_PRECISION) -> str:
+    """Standard base32 geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # even bits encode longitude
+    while len(chars) < precision:
+        value, rng = (lon, lon_range) if even else (lat, lat_range)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def geohash_center(cell: str) -> Tuple[float, float]:
+    """(lat, lon) of a geohash cell's center"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in cell:
+        bits = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (bits >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+class LocationCache:
+    """Two-tier (memory, optional table) cache of per-cell scoring results"""
+
+    def __init__(self, precision: int = LOCATION_CACHE_PRECISION, ttl: float = LOCATION_CACHE_TTL,
+                 max_entries: int = LOCATION_CACHE_MAX_ENTRIES, persist: bool = LOCATION_CACHE_PERSIST):
+        self.precision = precision
+        self.ttl = ttl
+        self.persist = persist
+        self._entries = LRUDict(max_entries)
+        self._counters_lock = threading.Lock()
+        self.counters = {'hits': 0, 'table_hits': 0, 'misses': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.precision > 0
+
+    def _count(self, name: str):
+        with self._counters_lock:
+            self.counters[name] += 1
+
+    def get_or_compute(self, kind: str, lat: float, lon: float, radius_km: float,
+                       compute: Callable[[float, float, float], Optional[Dict]]) -> Optional[Dict]:
+        """
+        Result for the cell containing (lat, lon), computed at the cell center
+        compute(lat, lon, radius_km) returning None (failure) is not cached
+        """
+        if not self.enabled:
+            return compute(lat, lon, radius_km)
+
+        cell = geohash_encode(lat, lon, self.precision)
+        key = (kind, cell, float(radius_km))
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._count('hits')
+            return entry[1]
+
+        version = None
+        if self.persist:
+            try:
+                version, result = self._read_table(kind, cell, radius_km)
+            except Exception as e:
+                logger.error(f"Location cache table read failed: {e}")
+                result = None
+            if result is not None:
+                self._count('table_hits')
+                self._entries.set(key, (time.monotonic() + self.ttl, result))
+                return result
+
+        self._count('misses')
+        center_lat, center_lon = geohash_center(cell)
+        result = compute(center_lat, center_lon, radius_km)
+        if result is None:
+            return None
+
+        self._entries.set(key, (time.monotonic() + self.ttl, result))
+        if version is not None:
+            try:
+                self._write_table(kind, cell, radius_km, version, result)
+            except Exception as e:
+                logger.error(f"Location cache table write failed: {e}")
+        return result
+
+    def _read_table(self, kind: str, cell: str, radius_km: float) -> Tuple[int, Optional[Dict]]:
+        """Current data version (read before computing) and the row valid for it"""
+        from scripts.database_config import execute_query
+
+        row = execute_query("""
+            SELECT v.version, c.result
+            FROM (SELECT osm_businesses_version() as version) v
+            LEFT JOIN location_score_cache c
+                ON c.kind = %s AND c.cell = %s AND c.radius_km = %s AND c.data_version = v.version
+        """, (kind, cell, radius_km), fetch_one=True)
+        return row['version'], row['result']
+
+    def _write_table(self, kind: str, cell: str, radius_km: float, version: int, result: Dict):
+        from scripts.database_config import execute_query
+
+        execute_query("""
+            INSERT INTO location_score_cache (kind, cell, radius_km, data_version, result, computed_at)
+            VALUES (%s, %s, %s, %s, %s::jsonb, CURRENT_TIMESTAMP)
+            ON CONFLICT (kind, cell, radius_km) DO UPDATE SET
+                data_version = EXCLUDED.data_version,
+                result = EXCLUDED.result,
+                computed_at = EXCLUDED.computed_at
+        """, (kind, cell, radius_km, version, json.dumps(result, default=str)))
+
+    # Batch path (BusinessAnalyzer.iter_analyses): look up many cells at once,
+    # compute the missing ones in one query, then remember them
+
+    def cell(self, lat: float, lon: float) -> str:
+        return geohash_encode(lat, lon, self.precision)
+
+    def peek(self, kind: str, cell: str, radius_km: float) -> Optional[Dict]:
+        """In-process entry of a cell, or None (counts a hit)"""
+        entry = self._entries.get((kind, cell, float(radius_km)))
+        if entry is not None and entry[0] > time.monotonic():
+            self._count('hits')
+            return entry[1]
+        return None
+
+    async def read_table_many(self, kind: str, cells: List[str],
+                              radius_km: float) -> Tuple[Optional[int], Dict[str, Dict]]:
+        """Current data version and the persisted rows valid for it, keyed by cell"""
+        if not self.persist or not cells:
+            return None, {}
+        from ..database import async_db
+
+        rows = await async_db.fetch("""
+            SELECT v.version, c.cell, c.result
+            FROM (SELECT osm_businesses_version() as version) v
+            LEFT JOIN location_score_cache c
+                ON c.kind = %s AND c.cell = ANY(%s) AND c.radius_km = %s AND c.data_version = v.version
+        """, (kind, cells, radius_km))
+        found = {row['cell']: row['result'] for row in rows if row['cell'] is not None}
+        for cell, result in found.items():
+            self._count('table_hits')
+            self._entries.set((kind, cell, float(radius_km)), (time.monotonic() + self.ttl, result))
+        return rows[0]['version'], found
+
+    async def remember_many(self, kind: str, radius_km: float, version: Optional[int],
+                            results: Iterable[Tuple[str, Dict]]):
+        """Store freshly computed cells (and persist them when version is known)"""
+        results = list(results)
+        expires = time.monotonic() + self.ttl
+        for cell, result in results:
+            self._count('misses')
+            self._entries.set((kind, cell, float(radius_km)), (expires, result))
+        if version is None or not results:
+            return
+        from ..database import async_db
+
+        try:
+            await async_db.execute("""
+                INSERT INTO location_score_cache (kind, cell, radius_km, data_version, result, computed_at)
+                SELECT %s, r.cell, %s, %s, r.result::jsonb, CURRENT_TIMESTAMP
+                FROM unnest(%s::text[], %s::text[]) AS r(cell, result)
+                ON CONFLICT (kind, cell, radius_km) DO UPDATE SET
+                    data_version = EXCLUDED.data_version,
+                    result = EXCLUDED.result,
+                    computed_at = EXCLUDED.computed_at
+            """, (kind, radius_km, version,
+                  [cell for cell, _ in results],
+                  [json.dumps(result, default=str) for _, result in results]))
+        except Exception as e:
+            logger.error(f"Location cache table write failed: {e}")
+
+    def clear(self):
+        self._entries.clear()
+
+    def info(self) -> Dict:
+        return {
+            'precision': self.precision,
+            'entries': len(self._entries),
+            'persist': self.persist,
+            **self.counters
+        }
+
+
+location_cache = LocationCache()
+
+
+def _on_invalidate(tags):
+    if cache.OSM in tags:
+        location_cache.clear()
+
+
+cache.on_invalidate(_on_invalidate)
+
+
+async def ensure_schema():
+    """
+    Create the persisted tier + version trigger and drop rows of old data versions
+    Nothing to do with LOCATION_CACHE_PERSIST off - imports then don't pay for the trigger
+    """
+    if not location_cache.persist:
+        return
+    from ..database import async_db
+
+    with open(_SCHEMA_FILE) as f:
+        schema_sql = f.read()
+    async with async_db.connection() as conn:
+        await conn.execute(schema_sql)
+        await conn.execute("DELETE FROM location_score_cache WHERE data_version < osm_businesses_version()")
@@ -0,0 +1,224 @@
+"""
+Batched match-and-merge of Google results into OSM data
+
+A smart-crawl plan is executed in three steps instead of point by point:
+1. every crawl point is searched concurrently (shared token bucket = same QPS)
+2. all returned places are matched to osm_businesses in one query
+   (within MATCH_RADIUS_M, best pg_trgm name similarity wins)
+3. matched POIs are enriched with one UPDATE (and their roads' aggregates
+   refreshed), the rest go to `businesses` through the COPY + merge upsert
+"""
+import asyncio
+import logging
+import math
+from typing import Dict, List, Optional
+
+import httpx
+
+from .. import cache
+from ..config import MAX_DISTANCE_TO_ROAD_M
+from ..database import async_db, road_distance, road_poi_aggregate
+from ..database.bulk_upsert import upsert_businesses_async
+from .google_maps import GoogleMapsClient, PlacesAPIError
+
+logger = logging.getLogger(__name__)
+
+MATCH_RADIUS_M = 75
+MIN_NAME_SIMILARITY = 0.35
+METERS_PER_DEGREE_LAT = 110574
+
+# One row per place: the closest-named OSM POI nearby. The degree ST_DWithin
+# uses the geometry GIST index, the geography one is the exact meter check.
+# DISTINCT ON keeps one place per POI so the UPDATE never hits a row twice.
+MATCH_SQL = """
+    WITH places AS (
+        SELECT place_id, name, ST_SetSRID(ST_MakePoint(lng, lat), 4326) as geom, radius_deg
+        FROM unnest(%s::text[], %s::text[], %s::float8[], %s::float8[], %s::float8[])
+            AS p(place_id, name, lat, lng, radius_deg)
+    ),
+    candidates AS (
+        SELECT p.place_id, m.osm_id, m.osm_type, m.name_similarity, m.distance_m
+        FROM places p
+        CROSS JOIN LATERAL (
+            SELECT
+                b.osm_id,
+                b.osm_type,
+                similarity(lower(b.name), lower(p.name)) as name_similarity,
+                ST_Distance(b.geometry::geography, p.geom::geography) as distance_m
+            FROM osm_businesses b
+            WHERE ST_DWithin(b.geometry, p.geom, p.radius_deg)
+              AND ST_DWithin(b.geometry::geography, p.geom::geography, %s)
+              AND b.name IS NOT NULL
+              AND similarity(lower(b.name), lower(p.name)) >= %s
+            ORDER BY name_similarity DESC, distance_m
+            LIMIT 1
+        ) m
+    )
+    SELECT DISTINCT ON (osm_id, osm_type) place_id, osm_id, osm_type, name_similarity, distance_m
+    FROM candidates
+    ORDER BY osm_id, osm_type, name_similarity DESC, distance_m
+"""
+
+# OSM stays the source of truth - Google only fills what OSM is missing
+ENRICH_SQL = """
+    UPDATE osm_businesses b SET
+        phone = COALESCE(b.phone, u.phone),
+        website = COALESCE(b.website, u.website),
+        opening_hours = COALESCE(b.opening_hours, u.opening_hours),
+        updated_at = NOW()
+    FROM unnest(%s::bigint[], %s::text[], %s::text[], %s::text[], %s::text[])
+        AS u(osm_id, osm_type, phone, website, opening_hours)
+    WHERE b.osm_id = u.osm_id AND b.osm_type = u.osm_type
+    RETURNING b.nearest_road_id
+"""
+
+
+def point_search(point: Dict) -> Dict:
+    """search_text_async kwargs for one crawl point"""
+    if point.get('target_name'):
+        query = point['target_name']
+        if point.get('target_brand') and point['target_brand'] not in query:
+            query = f"{point['target_brand']} {query}"
+    elif point.get('verify_name'):
+        query = point['verify_name']
+    else:
+        query = "businesses"
+
+    return {
+        'query': query,
+        'location_bias': {
+            'circle': {
+                'center': {'latitude': point['lat'], 'longitude': point['lon']},
+                'radius': point.get('radius', 200)
+            }
+        }
+    }
+
+
+async def search_points(gmaps: GoogleMapsClient, crawl_points: List[Dict]) -> List[Optional[List[Dict]]]:
+    """
+    Search every crawl point concurrently; results come back in point order
+    A point whose search failed is None. QuotaExceeded stops the whole plan.
+    """
+    semaphore = asyncio.Semaphore(gmaps.max_concurrency)
+
+    async def run(point: Dict) -> Optional[List[Dict]]:
+        async with semaphore:
+            try:
+                return await gmaps.search_text_async(**point_search(point))
+            except (PlacesAPIError, httpx.TransportError) as e:
+                logger.error(f"Smart crawl point ({point.get('lat')}, {point.get('lon')}) failed: {e}")
+                return None
+
+    return await asyncio.gather(*(run(point) for point in crawl_points))
+
+
+def _hours_text(place: Dict) -> Optional[str]:
+    hours = place.get('regularOpeningHours') or place.get('currentOpeningHours') or {}
+    weekdays = hours.get('weekdayDescriptions')
+    return '; '.join(weekdays) if weekdays else None
+
+
+async def match_places(places: List[Dict], radius_m: float = MATCH_RADIUS_M,
+                       min_similarity: float = MIN_NAME_SIMILARITY) -> Dict[str, Dict]:
+    """Match parsed places to osm_businesses in one query, keyed by place_id"""
+    if not places:
+        return {}
+    radius_deg = [
+        radius_m / (METERS_PER_DEGREE_LAT * math.cos(math.radians(min(abs(p['lat']) + 0.01, 89.0))))
+        for p in places
+    ]
+    rows = await async_db.fetch(MATCH_SQL, (
+        [p['place_id'] for p in places],
+        [p['name'] for p in places],
+        [p['lat'] for p in places],
+        [p['lng'] for p in places],
+        radius_deg,
+        radius_m,
+        min_similarity
+    ))
+    return {row['place_id']: row for row in rows}
+
+
+async def enrich_osm(matches: Dict[str, Dict], places_by_id: Dict[str, Dict]) -> int:
+    """
+    Fill missing phone/website/hours on matched OSM POIs with one UPDATE,
+    then recompute the touched roads' road_poi_aggregate rows
+    """
+    if not matches:
+        return 0
+    rows = list(matches.values())
+    places = [places_by_id[row['place_id']] for row in rows]
+    updated = await async_db.fetch(ENRICH_SQL, (
+        [row['osm_id'] for row in rows],
+        [row['osm_type'] for row in rows],
+        [p['phone'] for p in places],
+        [p['website'] for p in places],
+        [p['opening_hours'] for p in places]
+    ))
+    await road_poi_aggregate.refresh_roads_async(row['nearest_road_id'] for row in updated)
+    await cache.invalidate(cache.OSM)
+    return len(updated)
+
+
+async def execute_plan(gmaps: GoogleMapsClient, crawl_points: List[Dict],
+                       road_osm_id: int, road_name: Optional[str] = None) -> Dict:
+    """
+    Run a smart-crawl plan: search all points, match everything, merge in bulk
+    Places without an OSM match are saved to `businesses` on road_osm_id
+    """
+    raw_results = await search_points(gmaps, crawl_points)
+    failed_points = sum(1 for results in raw_results if results is None)
+    if crawl_points and failed_points == len(crawl_points):
+        raise PlacesAPIError(f"All {failed_points} crawl point searches failed")
+
+    # A place can come back for several neighbouring points - keep one
+    businesses = {}
+    places_by_id = {}
+    for point, results in zip(crawl_points, raw_results):
+        for place_data in results or []:
+            business = gmaps.parse_business(place_data, point.get('road_osm_id') or road_osm_id, road_name)
+            if not business.place_id or business.place_id in businesses:
+                continue
+            businesses[business.place_id] = business
+            places_by_id[business.place_id] = {
+                'place_id': business.place_id,
+                'name': business.name,
+                'lat': business.lat,
+                'lng': business.lng,
+                'phone': business.phone_number,
+                'website': business.website,
+                'opening_hours': _hours_text(place_data)
+            }
+
+    matches = await match_places(list(places_by_id.values()))
+    await enrich_osm(matches, places_by_id)
+
+    new_businesses = [b for place_id, b in businesses.items() if place_id not in matches]
+    await road_distance.measure(new_businesses)
+    new_businesses, dropped = road_distance.drop_far(new_businesses, MAX_DISTANCE_TO_ROAD_M)
+    counts = await upsert_businesses_async(new_businesses)
+    created = {b.place_id for b in new_businesses}
+
+    results = [
+        {'action': 'updated', 'osm_id': matches[place_id]['osm_id'], 'name': b.name}
+        if place_id in matches else
+        {'action': 'created', 'name': b.name, 'address': b.formatted_address}
+        for place_id, b in businesses.items()
+        if place_id in matches or place_id in created
+    ]
+    cache_hits = sum(1 for results in raw_results if getattr(results, 'from_cache', False))
+    logger.info(
+        f"Smart crawl of {len(crawl_points)} points: {len(businesses)} places, "
+        f"{len(matches)} matched to OSM, {counts['inserted']} new businesses, {dropped} dropped as too far, "
+        f"{cache_hits} points served from the cache, {failed_points} points failed"
+    )
+    return {
+        'points_processed': len(crawl_points),
+        'failed_points': failed_points,
+        'cache_hits': cache_hits,
+        'businesses_found': len(businesses),
+        'updated': len(matches),
+        'created': len(new_businesses),
+        'results': results
+    }
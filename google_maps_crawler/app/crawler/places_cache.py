@@ -0,0 +1,176 @@
+"""
+Persistent cache of Places API Text Search responses
+
+Recrawling a road or keyword sends byte-for-byte the same request as last
+time, and every page of it is billed again. Responses are kept in
+places_response_cache, keyed by a hash of the normalized request body and the
+field mask (page tokens excluded - page n of a request is stored as page n):
+
+- the text query is lowercased and whitespace-collapsed
+- location bias coordinates are rounded to 6 decimals (~0.1m)
+- field mask entries are sorted
+
+Only complete fetches (every page answered 200) are stored, all pages in one
+transaction, with the raw JSON of each page. Entries expire per tier
+(PLACES_CACHE_TTL_HOURS) - richer tiers carry hours/phones that go stale sooner.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+from ..config import PLACES_CACHE_ENABLED, PLACES_CACHE_TTL_HOURS
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'schemas_places_cache.sql')
+
+READ_SQL = """
+    SELECT page, response
+    FROM places_response_cache
+    WHERE request_key = %s AND fetched_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+    ORDER BY page
+"""
+
+DELETE_SQL = "DELETE FROM places_response_cache WHERE request_key = %s"
+
+# Responses go in as text so psycopg2 and asyncpg take the same statement
+WRITE_SQL = """
+    INSERT INTO places_response_cache (request_key, page, tier, query, response)
+    SELECT %s, p.page, %s, %s, p.response::jsonb
+    FROM unnest(%s::text[]) WITH ORDINALITY AS p(response, page)
+"""
+
+_counters_lock = threading.Lock()
+counters = {'hits': 0, 'misses': 0, 'pages_saved': 0}
+
+
+def _count(name: str, amount: int = 1):
+    with _counters_lock:
+        counters[name] += amount
+
+
+def _round_floats(value):
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, dict):
+        return {k: _round_floats(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_round_floats(v) for v in value]
+    return value
+
+
+def request_key(body: Dict, field_mask: str) -> str:
+    """sha256 of the normalized first-page request"""
+    normalized = {k: v for k, v in body.items() if k != 'pageToken'}
+    normalized['textQuery'] = ' '.join(str(body.get('textQuery', '')).lower().split())
+    payload = {
+        'body': _round_floats(normalized),
+        'fieldMask': ','.join(sorted(f.strip() for f in field_mask.split(',') if f.strip()))
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def ttl_seconds(tier: str) -> float:
+    return PLACES_CACHE_TTL_HOURS.get(tier, PLACES_CACHE_TTL_HOURS['enterprise']) * 3600
+
+
+def _pages(rows: List) -> Optional[List[Dict]]:
+    if not rows:
+        return None
+    return [row['response'] if isinstance(row['response'], dict) else json.loads(row['response'])
+            for row in rows]
+
+
+def get(key: str, tier: str) -> Optional[List[Dict]]:
+    """Cached raw pages of a request, or None (sync, for the requests-based client)"""
+    if not PLACES_CACHE_ENABLED:
+        return None
+    from scripts.database_config import execute_query
+
+    try:
+        pages = _pages(execute_query(READ_SQL, (key, ttl_seconds(tier))))
+    except Exception as e:
+        logger.error(f"Places cache read failed: {e}")
+        return None
+    _count('hits' if pages else 'misses')
+    return pages
+
+
+async def get_async(key: str, tier: str) -> Optional[List[Dict]]:
+    """Cached raw pages of a request, or None"""
+    if not PLACES_CACHE_ENABLED:
+        return None
+    from ..database import async_db
+
+    try:
+        pages = _pages(await async_db.fetch(READ_SQL, (key, ttl_seconds(tier))))
+    except Exception as e:
+        logger.error(f"Places cache read failed: {e}")
+        return None
+    _count('hits' if pages else 'misses')
+    return pages
+
+
+def put(key: str, tier: str, query: str, pages: List[Dict]):
+    """Replace a request's cached pages (sync)"""
+    if not PLACES_CACHE_ENABLED or not pages:
+        return
+    from scripts.database_config import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(DELETE_SQL, (key,))
+        cur.execute(WRITE_SQL, (key, tier, query[:500], [json.dumps(p) for p in pages]))
+        conn.commit()
+        _count('pages_saved', len(pages))
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Places cache write failed: {e}")
+    finally:
+        conn.close()
+
+
+async def put_async(key: str, tier: str, query: str, pages: List[Dict]):
+    """Replace a request's cached pages"""
+    if not PLACES_CACHE_ENABLED or not pages:
+        return
+    from ..database import async_db
+
+    try:
+        async with async_db.connection() as conn:
+            async with conn.transaction():
+                await conn.execute(async_db.convert_placeholders(DELETE_SQL), key)
+                await conn.execute(
+                    async_db.convert_placeholders(WRITE_SQL),
+                    key, tier, query[:500], [json.dumps(p) for p in pages]
+                )
+        _count('pages_saved', len(pages))
+    except Exception as e:
+        logger.error(f"Places cache write failed: {e}")
+
+
+def info() -> Dict:
+    return {
+        'enabled': PLACES_CACHE_ENABLED,
+        'ttl_hours': dict(PLACES_CACHE_TTL_HOURS),
+        **counters
+    }
+
+
+async def ensure_schema():
+    """Create places_response_cache and drop entries older than the longest TTL"""
+    from ..database import async_db
+
+    with open(_SCHEMA_FILE) as f:
+        schema_sql = f.read()
+    async with async_db.connection() as conn:
+        await conn.execute(schema_sql)
+        await conn.execute(
+            "DELETE FROM places_response_cache WHERE fetched_at < CURRENT_TIMESTAMP - make_interval(secs => $1)",
+            float(max(PLACES_CACHE_TTL_HOURS.values()) * 3600)
+        )
@@ -0,0 +1,105 @@
+"""
+Rate limiting for Google Maps API calls
+Token bucket for requests/second plus a per-day request quota
+"""
+import asyncio
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaExceeded(Exception):
+    """Daily API request limit reached"""
+
+
+class TokenBucket:
+    """
+    Token bucket limiter usable from both sync and async code.
+    Callers reserve a token under a lock, then sleep outside it until the
+    reservation comes due, so concurrent callers are spaced at `rate`/s.
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token, returning how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait (without blocking the event loop) until a token is available"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class DailyQuota:
+    """Counts requests per UTC day and refuses to go past the limit"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._day = self._today()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    def _roll(self):
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+
+    def seed(self, used: int):
+        """Set today's usage (e.g. from the api_calls table on startup)"""
+        with self._lock:
+            self._roll()
+            self._used = max(self._used, int(used or 0))
+
+    def consume(self, count: int = 1):
+        with self._lock:
+            self._roll()
+            if self.limit and self._used + count > self.limit:
+                raise QuotaExceeded(f"Daily Google Maps limit reached ({self._used}/{self.limit})")
+            self._used += count
+
+    @property
+    def remaining(self) -> int:
+        with self._lock:
+            self._roll()
+            return max(0, self.limit - self._used) if self.limit else -1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._roll()
+            return {
+                'date': self._day.isoformat(),
+                'used': self._used,
+                'limit': self.limit,
+                'remaining': max(0, self.limit - self._used) if self.limit else None
+            }
@@ -0,0 +1,89 @@
+"""
+Road name normalization
+Canonical form: lowercase tokens, punctuation dropped, street types and
+directions abbreviated ("N. Main Street" -> "n main st"), so OSM and Google
+spellings of the same road compare equal.
+
+The same normalization exists in SQL as normalize_road_name() (generated from
+ROAD_ABBREVIATIONS by app.database.road_name_normalized) and is stored in
+osm_roads_main.road_name_normalized, so a variant match is one equality lookup.
+"""
+import functools
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Full form (and alternate abbreviations) -> canonical token
+ROAD_ABBREVIATIONS: Dict[str, str] = {
+    'street': 'st', 'str': 'st',
+    'avenue': 'ave', 'av': 'ave', 'avn': 'ave',
+    'boulevard': 'blvd', 'blv': 'blvd',
+    'drive': 'dr', 'drv': 'dr',
+    'road': 'rd',
+    'lane': 'ln',
+    'court': 'ct',
+    'place': 'pl',
+    'highway': 'hwy', 'hiway': 'hwy',
+    'parkway': 'pkwy', 'pky': 'pkwy', 'pkway': 'pkwy',
+    'circle': 'cir',
+    'terrace': 'ter',
+    'trail': 'trl',
+    'square': 'sq',
+    'expressway': 'expy',
+    'freeway': 'fwy',
+    'turnpike': 'tpke',
+    'route': 'rte',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+}
+
+DIRECTIONS = frozenset({'n', 's', 'e', 'w', 'ne', 'nw', 'se', 'sw'})
+
+# Canonical token -> spelled-out word (the first full form listed above)
+FULL_FORMS: Dict[str, str] = {}
+for _word, _canonical in ROAD_ABBREVIATIONS.items():
+    FULL_FORMS.setdefault(_canonical, _word)
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+_APOSTROPHES = re.compile(r"['’]")
+
+
+@functools.lru_cache(maxsize=65536)
+def _tokens(name: str) -> Tuple[str, ...]:
+    text = _NON_WORD.sub(' ', _APOSTROPHES.sub('', name.lower()))
+    return tuple(ROAD_ABBREVIATIONS.get(token, token) for token in text.split())
+
+
+def tokenize(name: Optional[str]) -> List[str]:
+    """Canonical tokens of a road name"""
+    return list(_tokens(name)) if name else []
+
+
+def normalize(name: Optional[str]) -> str:
+    """Canonical form of a road name, e.g. "N. Main Street" -> "n main st" """
+    return ' '.join(_tokens(name)) if name else ''
+
+
+def _display(tokens: List[str]) -> str:
+    return ' '.join(token.upper() if token in DIRECTIONS else token.capitalize() for token in tokens)
+
+
+@functools.lru_cache(maxsize=4096)
+def _variants(name: str) -> Tuple[str, ...]:
+    tokens = list(_tokens(name))
+    variants = [name, _display(tokens), _display([FULL_FORMS.get(t, t) for t in tokens])]
+    return tuple(dict.fromkeys(v for v in variants if v))
+
+
+def road_variants(name: Optional[str]) -> List[str]:
+    """
+    Spellings of a road name: as given, abbreviated and spelled out
+    ("N Main Street" -> ["N Main Street", "N Main St", "North Main Street"])
+    Works on whole tokens, so "St" inside "Stone" is left alone
+    """
+    return list(_variants(name)) if name else []
+
+
+def address_on_road(address: Optional[str], road_name: Optional[str]) -> bool:
+    """True if a (Google) formatted address names the road, in any spelling"""
+    road = normalize(road_name)
+    return bool(road) and f" {road} " in f" {normalize(address)} "
@@ -2,6 +2,7 @@
 Sample points along roads for crawling
 """
 from typing import List, Tuple
+from math import cos, radians
 import logging
 from geopy.distance import distance
 from shapely.geometry import LineString, Point
@@ -0,0 +1,362 @@
+"""
+In-memory road name search index for /roads/search
+
+Distinct (road_name, city, state) rows of city_roads_simple are loaded once
+and grouped by normalized name (road_names.normalize, so "N Main Street" and
+"N. Main St" are one name). Name ids follow alphabetical order of the
+normalized names, which makes every lookup a bisect or a merge of sorted
+posting lists instead of an ILIKE scan per keystroke.
+
+Results are ranked in tiers, alphabetically within each tier:
+0. exact normalized name
+1. name prefix ("main s" -> "main st")
+2. prefix at a word boundary inside the name ("main" -> "n main st")
+3. typo-tolerant token match, when nothing above matched ("mian st" -> "main st")
+
+The index is rebuilt in the background at startup and after an 'osm'
+invalidation, if city_roads_simple actually changed.
+"""
+import asyncio
+import heapq
+import logging
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .. import cache
+from ..config import ROAD_SEARCH_INDEX
+from ..database import async_db
+from .road_names import ROAD_ABBREVIATIONS, normalize, tokenize
+
+logger = logging.getLogger(__name__)
+
+LOAD_QUERY = """
+    SELECT DISTINCT ON (road_name, city_name, state_code)
+        osm_id, road_name, highway, ref, city_name, state_code, county_fips
+    FROM city_roads_simple
+    ORDER BY road_name, city_name, state_code, osm_id
+"""
+
+# Changes whenever city_roads_simple is refreshed (tuple counters for the
+# per-partition refresh, relfilenode if it is rebuilt)
+SIGNATURE_QUERY = """
+    SELECT
+        c.relfilenode,
+        COALESCE(s.n_tup_ins, 0) + COALESCE(s.n_tup_upd, 0) + COALESCE(s.n_tup_del, 0) as changes
+    FROM pg_class c
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE c.oid = 'city_roads_simple'::regclass
+"""
+
+MAX_SCAN_NAMES = 20000      # names looked at per query (bounds filtered searches)
+FUZZY_CANDIDATE_CAP = 5000  # names scored in the typo tier
+MAX_TYPO_CANDIDATES = 500   # vocabulary tokens edit-distance checked per query token
+REFRESH_DELAY_SECONDS = 2   # let table statistics catch up after a refresh
+
+
+def _max_typos(token: str) -> int:
+    return 0 if len(token) < 3 else 1 if len(token) <= 5 else 2
+
+
+def _bigrams(token: str) -> set:
+    # Bigrams rather than trigrams: short tokens with a transposition ("mian")
+    # still share some with the right one ("main")
+    padded = f"${token}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Levenshtein distance with transpositions, max_distance + 1 once it's exceeded"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if before is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current[j] = value
+        if min(current) > max_distance:
+            return max_distance + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class RoadSearchIndex:
+    """Immutable index over (osm_id, road_name, highway, ref, city_name, state_code, county_fips) rows"""
+
+    def __init__(self, rows: Iterable[Tuple]):
+        strings: Dict[str, str] = {}
+        places: Dict[Tuple, int] = {}
+        highways: Dict[Optional[str], int] = {}
+        groups: Dict[str, List[Tuple]] = defaultdict(list)
+
+        def intern(value):
+            return strings.setdefault(value, value) if value is not None else None
+
+        normalized: Dict[str, str] = {}  # the same names repeat across cities
+        for osm_id, road_name, highway, ref, city_name, state_code, county_fips in rows:
+            norm = normalized.get(road_name)
+            if norm is None:
+                norm = normalized[road_name] = normalize(road_name)
+            if not norm:
+                continue
+            place = (intern(city_name), intern(state_code), intern(county_fips))
+            groups[norm].append((
+                osm_id,
+                intern(road_name),
+                highways.setdefault(highway, len(highways)),
+                intern(ref),
+                places.setdefault(place, len(places))
+            ))
+
+        # Name id == position in alphabetical order
+        self.names: List[str] = sorted(groups)
+        self._places = list(places)
+        self._highways = list(highways)
+        self._osm_ids = array('q')
+        self._road_names: List[str] = []
+        self._highway_ids = array('H' if len(highways) < 65536 else 'I')
+        self._refs: List[Optional[str]] = []
+        self._place_ids = array('I')
+        self._entry_start = array('I', [0])
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for name_id, norm in enumerate(self.names):
+            for osm_id, road_name, highway_id, ref, place_id in groups.pop(norm):
+                self._osm_ids.append(osm_id)
+                self._road_names.append(road_name)
+                self._highway_ids.append(highway_id)
+                self._refs.append(ref)
+                self._place_ids.append(place_id)
+            self._entry_start.append(len(self._osm_ids))
+            for token in dict.fromkeys(norm.split()):
+                postings[token].append(name_id)
+
+        self.tokens: List[str] = sorted(postings)
+        self._postings = {token: array('I', ids) for token, ids in postings.items()}
+
+        bigram_tokens: Dict[str, List[int]] = defaultdict(list)
+        for token_id, token in enumerate(self.tokens):
+            for bigram in _bigrams(token):
+                bigram_tokens[bigram].append(token_id)
+        self._bigram_tokens = {b: array('I', ids) for b, ids in bigram_tokens.items()}
+
+    def __len__(self) -> int:
+        return len(self._osm_ids)
+
+    def info(self) -> Dict:
+        return {'entries': len(self._osm_ids), 'names': len(self.names), 'tokens': len(self.tokens)}
+
+    # Lookups
+
+    def search(self, query: str, state_code: Optional[str] = None,
+               county_fips: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Ranked matches, same shape as enhanced_search_optimized.search_roads_enhanced"""
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+
+        results = []
+        seen = set()
+        for name_id in self._candidates(tokens, results):
+            if name_id in seen:
+                continue
+            seen.add(name_id)
+            if len(seen) > MAX_SCAN_NAMES:
+                break
+            for i in range(self._entry_start[name_id], self._entry_start[name_id + 1]):
+                city_name, entry_state, entry_county = self._places[self._place_ids[i]]
+                if state_code and entry_state != state_code:
+                    continue
+                if county_fips and entry_county != county_fips:
+                    continue
+                results.append({
+                    'osm_id': self._osm_ids[i],
+                    'name': self._road_names[i],
+                    'highway': self._highways[self._highway_ids[i]],
+                    'ref': self._refs[i],
+                    'city_name': city_name or '',
+                    'state_code': entry_state,
+                    'county_fips': entry_county or '',
+                    'county_name': '',
+                    'state_name': entry_state,
+                    'segment_count': 1,
+                    'total_length_km': 0
+                })
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def _candidates(self, tokens: List[str], results: List[Dict]) -> Iterator[int]:
+        """Name ids in rank order (may repeat); typo matches only if nothing else matched"""
+        head, last = tokens[:-1], tokens[-1]
+        # A partly typed street type still matches its abbreviation ("main stre" -> "main st")
+        lasts = {last} | {abbr for full, abbr in ROAD_ABBREVIATIONS.items() if len(last) >= 2 and full.startswith(last)}
+        queries = sorted(' '.join(head + [t]) for t in lasts)
+
+        for q in queries:
+            i = bisect_left(self.names, q)
+            if i < len(self.names) and self.names[i] == q:
+                yield i
+
+        yield from heapq.merge(*(
+            range(bisect_left(self.names, q), bisect_left(self.names, q + '~')) for q in queries
+        ))
+
+        yield from self._word_prefix_matches(head, lasts, queries)
+        if not results:
+            yield from self._fuzzy_matches(tokens)
+
+    def _prefixed_tokens(self, prefix: str) -> List[str]:
+        start = bisect_left(self.tokens, prefix)
+        return self.tokens[start:bisect_left(self.tokens, prefix + '~', start)]
+
+    def _word_prefix_matches(self, head: List[str], lasts: set, queries: List[str]) -> Iterator[int]:
+        if not head:
+            yield from heapq.merge(*(
+                self._postings[token] for last in lasts for token in self._prefixed_tokens(last)
+            ))
+            return
+
+        if any(token not in self._postings for token in head):
+            return
+        # Walk the shortest posting list: a head token's, or the names holding the last prefix
+        driver = min((self._postings[token] for token in head), key=len)
+        last_lists = [self._postings[token] for last in lasts for token in self._prefixed_tokens(last)]
+        if sum(len(ids) for ids in last_lists) < len(driver):
+            driver = heapq.merge(*last_lists)
+        needles = [' ' + q for q in queries]
+        for name_id in driver:
+            name = ' ' + self.names[name_id]
+            if any(needle in name for needle in needles):
+                yield name_id
+
+    def _near_tokens(self, token: str) -> Dict[str, int]:
+        """Vocabulary tokens within the typo budget of `token`, with their distance"""
+        max_typos = _max_typos(token)
+        near = {token: 0} if token in self._postings else {}
+        if not max_typos:
+            return near
+
+        shared = defaultdict(int)
+        bigrams = _bigrams(token)
+        for bigram in bigrams:
+            for token_id in self._bigram_tokens.get(bigram, ()):
+                shared[token_id] += 1
+
+        # An edit breaks at most 3 bigrams (transposition); only the closest candidates are checked
+        min_shared = max(1, len(bigrams) - 3 * max_typos)
+        candidates = [
+            token_id for token_id, count in shared.items()
+            if count >= min_shared and abs(len(self.tokens[token_id]) - len(token)) <= max_typos
+        ]
+        candidates.sort(key=lambda token_id: -shared[token_id])
+        for token_id in candidates[:MAX_TYPO_CANDIDATES]:
+            candidate = self.tokens[token_id]
+            if candidate not in near:
+                distance = edit_distance(token, candidate, max_typos)
+                if distance <= max_typos:
+                    near[candidate] = distance
+        return near
+
+    def _fuzzy_matches(self, tokens: List[str]) -> Iterator[int]:
+        options = [self._near_tokens(token) for token in tokens]
+        if not all(options):
+            return
+
+        # Candidates come from the query token with the fewest matching names
+        driver = min(options, key=lambda near: sum(len(self._postings[t]) for t in near))
+        candidates = set()
+        for token in driver:
+            candidates.update(self._postings[token][:FUZZY_CANDIDATE_CAP])
+            if len(candidates) >= FUZZY_CANDIDATE_CAP:
+                break
+
+        scored = []
+        for name_id in candidates:
+            name_tokens = self.names[name_id].split()
+            cost = 0
+            for near in options:
+                best = min((near[t] for t in name_tokens if t in near), default=None)
+                if best is None:
+                    break
+                cost += best
+            else:
+                # Fewer unmatched words first ("main st" before "e main st")
+                scored.append((cost, len(name_tokens) - len(options), name_id))
+        for _, _, name_id in sorted(scored):
+            yield name_id
+
+
+# Process-wide index, swapped atomically after each rebuild
+
+_index: Optional[RoadSearchIndex] = None
+_signature = None
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_pending = False
+
+
+def get_index() -> Optional[RoadSearchIndex]:
+    """The current index, or None until the first build finished"""
+    return _index
+
+
+async def build_index() -> RoadSearchIndex:
+    rows = []
+    async for row in async_db.iterate(LOAD_QUERY, prefetch=10000):
+        rows.append((row['osm_id'], row['road_name'], row['highway'], row['ref'],
+                     row['city_name'], row['state_code'], row['county_fips']))
+    return await asyncio.to_thread(RoadSearchIndex, rows)
+
+
+async def _refresh(force: bool = False):
+    global _index, _signature, _refresh_pending
+    while True:
+        _refresh_pending = False
+        try:
+            signature = tuple((await async_db.fetch_one(SIGNATURE_QUERY) or {}).values())
+            if force or _index is None or signature != _signature:
+                started = time.time()
+                index = await build_index()
+                _index, _signature = index, signature
+                logger.info(f"Road search index built: {index.info()} in {time.time() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Road search index refresh failed: {e}")
+        force = False
+        if not _refresh_pending:
+            break
+        await asyncio.sleep(REFRESH_DELAY_SECONDS)
+
+
+def schedule_refresh(force: bool = False, delay: float = 0):
+    """Rebuild in the background (coalesces requests made while a rebuild runs)"""
+    global _refresh_task, _refresh_pending
+    if not ROAD_SEARCH_INDEX:
+        return
+    if _refresh_task is not None and not _refresh_task.done():
+        _refresh_pending = True
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Not inside the API's event loop (e.g. a script invalidating)
+
+    async def run():
+        if delay:
+            await asyncio.sleep(delay)
+        await _refresh(force)
+
+    _refresh_task = loop.create_task(run())
+
+
+def _on_invalidate(tags):
+    if cache.OSM in tags:
+        schedule_refresh(delay=REFRESH_DELAY_SECONDS)
+
+
+cache.on_invalidate(_on_invalidate)
@@ -2,87 +2,115 @@
 Tier optimization strategies for Google Maps API
 Helps decide which tier to use based on business potential
 """
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 import logging
 
+from ..cache import LRUDict
+from ..config import CRAWL_PLAN_MAX_ROADS
+
 logger = logging.getLogger(__name__)
 
+# Tier stats for many roads in one round trip
+TIER_STATS_QUERY = """
+    SELECT
+        osm_id,
+        poi_count,
+        business_potential_score
+    FROM road_business_stats
+    WHERE osm_id = ANY(%s)
+"""
+
+
+def tier_for_stats(stats: Optional[Dict]) -> Dict[str, any]:
+    """Tier decision for one road's road_business_stats row (None = no POI data)"""
+    if not stats:
+        # No POI data - use minimal tier
+        return {
+            'tier': 'enterprise_minimal',
+            'strategy': 'discovery',
+            'reason': 'No POI data available'
+        }
+
+    poi_count = stats.get('poi_count') or 0
+    score = stats.get('business_potential_score') or 0
+
+    # Decision logic
+    if score >= 8 or poi_count >= 20:
+        # High potential - get all data
+        return {
+            'tier': 'enterprise',
+            'strategy': 'comprehensive',
+            'reason': f'High potential (score: {score}, POIs: {poi_count})'
+        }
+    elif score >= 5 or poi_count >= 10:
+        # Medium potential - get standard data
+        return {
+            'tier': 'pro',
+            'strategy': 'standard',
+            'reason': f'Medium potential (score: {score}, POIs: {poi_count})'
+        }
+    else:
+        # Low potential - minimal data
+        return {
+            'tier': 'enterprise_minimal',
+            'strategy': 'discovery',
+            'reason': f'Low potential (score: {score}, POIs: {poi_count})'
+        }
+
+
+def worth_crawling(stats: Optional[Dict]) -> bool:
+    """Skip roads with no POI data or very low potential"""
+    if not stats:
+        return False
+    return (stats.get('poi_count') or 0) > 0 or (stats.get('business_potential_score') or 0) >= 3
+
+
 class TierOptimizer:
     """
     Optimize API tier selection based on road characteristics
     Goal: Maximize data while minimizing costs
+
+    Call preload() with a job's roads first; lookups are then served from a
+    bounded in-memory cache instead of one query per road.
     """
-    
-    def __init__(self, db_client):
+
+    def __init__(self, db_client, max_roads: int = CRAWL_PLAN_MAX_ROADS):
         self.db = db_client
-        
+        self._stats = LRUDict(max_roads)
+
+    def preload(self, road_osm_ids: Iterable[int]) -> int:
+        """Load tier stats for many roads in one query, returns how many were fetched"""
+        missing = list({int(osm_id) for osm_id in road_osm_ids if int(osm_id) not in self._stats})
+        if not missing:
+            return 0
+        rows = self.db.execute_query(TIER_STATS_QUERY, (missing,)) or []
+        found = {row['osm_id']: row for row in rows}
+        for osm_id in missing:
+            # Cache misses too, so roads without stats aren't queried again
+            self._stats.set(osm_id, found.get(osm_id))
+        return len(missing)
+
+    def _get_stats(self, road_osm_id: int) -> Optional[Dict]:
+        road_osm_id = int(road_osm_id)
+        if road_osm_id not in self._stats:
+            self.preload([road_osm_id])
+        return self._stats.get(road_osm_id)
+
     def get_optimal_tier(self, road_osm_id: int) -> Dict[str, any]:
         """
         Determine optimal tier based on road's business potential
-        
+
         Returns:
             Dict with 'tier' and 'strategy' keys
         """
-        # Get road business stats from OSM POI data
-        stats = self.db.execute_query("""
-            SELECT 
-                poi_count,
-                poi_density,
-                business_potential_score
-            FROM road_business_stats
-            WHERE road_osm_id = %s
-        """, (road_osm_id,), fetch_one=True)
-        
-        if not stats:
-            # No POI data - use minimal tier
-            return {
-                'tier': 'enterprise_minimal',
-                'strategy': 'discovery',
-                'reason': 'No POI data available'
-            }
-        
-        poi_count = stats.get('poi_count', 0)
-        score = stats.get('business_potential_score', 0)
-        
-        # Decision logic
-        if score >= 8 or poi_count >= 20:
-            # High potential - get all data
-            return {
-                'tier': 'enterprise',
-                'strategy': 'comprehensive',
-                'reason': f'High potential (score: {score}, POIs: {poi_count})'
-            }
-        elif score >= 5 or poi_count >= 10:
-            # Medium potential - get standard data
-            return {
-                'tier': 'pro',
-                'strategy': 'standard',
-                'reason': f'Medium potential (score: {score}, POIs: {poi_count})'
-            }
-        else:
-            # Low potential - minimal data
-            return {
-                'tier': 'enterprise_minimal',
-                'strategy': 'discovery',
-                'reason': f'Low potential (score: {score}, POIs: {poi_count})'
-            }
-    
+        return tier_for_stats(self._get_stats(road_osm_id))
+
     def should_crawl_road(self, road_osm_id: int) -> bool:
         """
         Determine if road is worth crawling based on POI data
         """
-        stats = self.db.execute_query("""
-            SELECT poi_count, business_potential_score
-            FROM road_business_stats
-            WHERE road_osm_id = %s
-        """, (road_osm_id,), fetch_one=True)
-        
-        if not stats:
-            return False
-            
-        # Skip roads with very low potential
-        return stats.get('poi_count', 0) > 0 or stats.get('business_potential_score', 0) >= 3
-    
+        return worth_crawling(self._get_stats(road_osm_id))
+
     def get_priority_roads(self, city_name: str, limit: int = 100) -> list:
         """
         Get roads prioritized by business potential
@@ -101,4 +129,4 @@ class TierOptimizer:
             AND rbs.poi_count > 0
             ORDER BY rbs.business_potential_score DESC, rbs.poi_count DESC
             LIMIT %s
-        """, (city_name, limit))
\ No newline at end of file
+        """, (city_name, limit))
@@ -0,0 +1,174 @@
+"""
+Async PostgreSQL access (asyncpg) for FastAPI routes
+
+Queries use the same psycopg-style %s placeholders as execute_query, so SQL
+can move between the sync and async layers unchanged. Rows come back as
+plain dicts, matching RealDictCursor.
+"""
+import asyncio
+import json
+import logging
+import re
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence
+
+import asyncpg
+
+from ..config import (
+    DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD,
+    ASYNC_DB_POOL_MIN, ASYNC_DB_POOL_MAX, ASYNC_DB_COMMAND_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+# %s -> $n, %% -> %
+_PLACEHOLDER_RE = re.compile(r"%%|%s")
+_converted_queries: Dict[str, str] = {}
+
+
+def convert_placeholders(query: str) -> str:
+    """Convert psycopg-style %s placeholders to asyncpg's $1, $2, ..."""
+    converted = _converted_queries.get(query)
+    if converted is None:
+        counter = 0
+
+        def replace(match):
+            nonlocal counter
+            if match.group(0) == '%%':
+                return '%'
+            counter += 1
+            return f"${counter}"
+
+        converted = _PLACEHOLDER_RE.sub(replace, query)
+        if len(_converted_queries) < 1024:
+            _converted_queries[query] = converted
+    return converted
+
+
+def _encode_json(value):
+    # Callers already pass json.dumps(...) strings for %s::jsonb params
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Decode json/jsonb to Python objects like psycopg2 does"""
+    for type_name in ('json', 'jsonb'):
+        await conn.set_type_codec(
+            type_name,
+            encoder=_encode_json,
+            decoder=json.loads,
+            schema='pg_catalog'
+        )
+
+
+async def init_pool() -> asyncpg.Pool:
+    """Create the async connection pool (called from app startup)"""
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                host=DB_HOST,
+                port=int(DB_PORT),
+                database=DB_NAME,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                min_size=ASYNC_DB_POOL_MIN,
+                max_size=ASYNC_DB_POOL_MAX,
+                command_timeout=ASYNC_DB_COMMAND_TIMEOUT,
+                init=_init_connection
+            )
+            logger.info(f"Async database pool created (min={ASYNC_DB_POOL_MIN}, max={ASYNC_DB_POOL_MAX})")
+    return _pool
+
+
+async def close_pool():
+    """Close the async connection pool (called from app shutdown)"""
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+            logger.info("Async database pool closed")
+
+
+async def get_pool() -> asyncpg.Pool:
+    """Get the pool, creating it lazily if startup didn't"""
+    if _pool is None:
+        return await init_pool()
+    return _pool
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get async pool statistics"""
+    if _pool is None:
+        return {'status': 'not_initialized'}
+    return {
+        'min_size': _pool.get_min_size(),
+        'max_size': _pool.get_max_size(),
+        'size': _pool.get_size(),
+        'idle': _pool.get_idle_size(),
+        'in_use': _pool.get_size() - _pool.get_idle_size()
+    }
+
+
+@asynccontextmanager
+async def connection():
+    """Hold one pooled connection for multi-statement work (transactions, COPY)"""
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        yield conn
+
+
+def _args(params: Optional[Sequence]) -> Sequence:
+    return tuple(params) if params else ()
+
+
+async def fetch(query: str, params: Optional[Sequence] = None) -> List[Dict]:
+    """Run a query and return all rows as dicts"""
+    pool = await get_pool()
+    rows = await pool.fetch(convert_placeholders(query), *_args(params))
+    return [dict(row) for row in rows]
+
+
+async def fetch_one(query: str, params: Optional[Sequence] = None) -> Optional[Dict]:
+    """Run a query and return the first row as a dict (or None)"""
+    pool = await get_pool()
+    row = await pool.fetchrow(convert_placeholders(query), *_args(params))
+    return dict(row) if row is not None else None
+
+
+async def fetch_val(query: str, params: Optional[Sequence] = None, column: int = 0) -> Any:
+    """Run a query and return a single value"""
+    pool = await get_pool()
+    return await pool.fetchval(convert_placeholders(query), *_args(params), column=column)
+
+
+async def iterate(query: str, params: Optional[Sequence] = None, prefetch: int = 1000) -> AsyncIterator[Dict]:
+    """
+    Stream rows through a server-side cursor, `prefetch` rows per round trip
+    Holds one pooled connection (in a read transaction) until the iterator is exhausted or closed
+    """
+    async with connection() as conn:
+        async with conn.transaction(readonly=True):
+            async for row in conn.cursor(convert_placeholders(query), *_args(params), prefetch=prefetch):
+                yield dict(row)
+
+
+async def execute(query: str, params: Optional[Sequence] = None) -> int:
+    """Run a statement and return the affected row count"""
+    pool = await get_pool()
+    status = await pool.execute(convert_placeholders(query), *_args(params))
+    # Status looks like "UPDATE 3" / "INSERT 0 1"
+    try:
+        return int(status.rsplit(' ', 1)[-1])
+    except (ValueError, IndexError):
+        return 0
+
+
+async def executemany(query: str, params_list: Iterable[Sequence]):
+    """Run a statement once per parameter set in a single round trip batch"""
+    pool = await get_pool()
+    await pool.executemany(convert_placeholders(query), [_args(p) for p in params_list])
@@ -0,0 +1,165 @@
+"""
+Bulk upsert of crawled businesses
+COPY the whole result set into a temp staging table, then merge it into
+`businesses` with one set-based INSERT ... ON CONFLICT.
+"""
+import csv
+import io
+import json
+import logging
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from ..models import Business
+
+logger = logging.getLogger(__name__)
+
+BUSINESS_COLUMNS = [
+    'place_id', 'name', 'formatted_address', 'lat', 'lng',
+    'types', 'rating', 'user_ratings_total', 'price_level',
+    'phone_number', 'website', 'opening_hours',
+    'road_osm_id', 'road_name', 'distance_to_road',
+    'nearest_road_osm_id', 'nearest_road_distance',
+    'crawled_at', 'crawl_session_id', 'city'
+]
+
+# opening_hours is staged as text so both COPY paths can send pre-serialized JSON
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE businesses_staging
+    (LIKE businesses INCLUDING DEFAULTS)
+    ON COMMIT DROP;
+    ALTER TABLE businesses_staging ALTER COLUMN opening_hours TYPE TEXT;
+"""
+
+_STAGING_SELECT = ', '.join(
+    'opening_hours::jsonb' if col == 'opening_hours' else col for col in BUSINESS_COLUMNS
+)
+
+# DISTINCT ON: a place can show up twice in one crawl, and ON CONFLICT
+# cannot touch the same row twice in one statement.
+# xmax = 0 only for freshly inserted rows.
+MERGE_SQL = f"""
+    INSERT INTO businesses ({', '.join(BUSINESS_COLUMNS)})
+    SELECT DISTINCT ON (place_id) {_STAGING_SELECT}
+    FROM businesses_staging
+    ORDER BY place_id, crawled_at DESC
+    ON CONFLICT (place_id) DO UPDATE SET
+        name = EXCLUDED.name,
+        formatted_address = COALESCE(EXCLUDED.formatted_address, businesses.formatted_address),
+        lat = EXCLUDED.lat,
+        lng = EXCLUDED.lng,
+        types = COALESCE(EXCLUDED.types, businesses.types),
+        rating = COALESCE(EXCLUDED.rating, businesses.rating),
+        user_ratings_total = COALESCE(EXCLUDED.user_ratings_total, businesses.user_ratings_total),
+        price_level = COALESCE(EXCLUDED.price_level, businesses.price_level),
+        phone_number = COALESCE(EXCLUDED.phone_number, businesses.phone_number),
+        website = COALESCE(EXCLUDED.website, businesses.website),
+        opening_hours = COALESCE(EXCLUDED.opening_hours, businesses.opening_hours),
+        road_osm_id = EXCLUDED.road_osm_id,
+        road_name = COALESCE(EXCLUDED.road_name, businesses.road_name),
+        distance_to_road = EXCLUDED.distance_to_road,
+        nearest_road_osm_id = EXCLUDED.nearest_road_osm_id,
+        nearest_road_distance = EXCLUDED.nearest_road_distance,
+        city = COALESCE(EXCLUDED.city, businesses.city),
+        crawl_session_id = COALESCE(EXCLUDED.crawl_session_id, businesses.crawl_session_id),
+        crawled_at = EXCLUDED.crawled_at
+    RETURNING (xmax = 0) AS inserted
+"""
+
+_CSV_NULL = '\\N'
+
+
+def business_rows(businesses: Iterable[Business], session_id: Optional[str] = None,
+                  city: Optional[str] = None) -> List[tuple]:
+    """Flatten Business models into tuples ordered like BUSINESS_COLUMNS"""
+    rows = []
+    for b in businesses:
+        rows.append((
+            b.place_id, b.name, b.formatted_address, b.lat, b.lng,
+            list(b.types) if b.types else [],
+            Decimal(str(b.rating)) if b.rating is not None else None,
+            b.user_ratings_total, b.price_level,
+            b.phone_number, b.website,
+            json.dumps(b.opening_hours) if b.opening_hours else None,
+            b.road_osm_id, b.road_name, b.distance_to_road,
+            b.nearest_road_osm_id, b.nearest_road_distance,
+            b.crawled_at, session_id, city
+        ))
+    return rows
+
+
+def _pg_array(values: List[str]) -> str:
+    """Text[] literal for COPY csv input"""
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"') for v in values)
+    return '{' + ','.join(f'"{v}"' for v in escaped) + '}'
+
+
+def _csv_buffer(rows: List[tuple]) -> io.StringIO:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([
+            _CSV_NULL if value is None
+            else _pg_array(value) if isinstance(value, list)
+            else value.isoformat() if hasattr(value, 'isoformat')
+            else value
+            for value in row
+        ])
+    buf.seek(0)
+    return buf
+
+
+def _counts(flags: List[bool]) -> Dict[str, int]:
+    inserted = sum(1 for f in flags if f)
+    return {'inserted': inserted, 'updated': len(flags) - inserted}
+
+
+def upsert_businesses(businesses: List[Business], session_id: Optional[str] = None,
+                      city: Optional[str] = None) -> Dict[str, int]:
+    """
+    Upsert a crawl's businesses in one transaction on one pooled connection
+    Returns {'inserted': n, 'updated': m}
+    """
+    if not businesses:
+        return {'inserted': 0, 'updated': 0}
+
+    from .postgres_client import get_connection
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(CREATE_STAGING_SQL)
+        cur.copy_expert(
+            f"COPY businesses_staging ({', '.join(BUSINESS_COLUMNS)}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '{_CSV_NULL}')",
+            _csv_buffer(business_rows(businesses, session_id, city))
+        )
+        cur.execute(MERGE_SQL)
+        counts = _counts([row[0] for row in cur.fetchall()])
+        conn.commit()
+        return counts
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+async def upsert_businesses_async(businesses: List[Business], session_id: Optional[str] = None,
+                                  city: Optional[str] = None) -> Dict[str, int]:
+    """Async (asyncpg binary COPY) version of upsert_businesses"""
+    if not businesses:
+        return {'inserted': 0, 'updated': 0}
+
+    from . import async_db
+
+    async with async_db.connection() as conn:
+        async with conn.transaction():
+            await conn.execute(CREATE_STAGING_SQL)
+            await conn.copy_records_to_table(
+                'businesses_staging',
+                records=business_rows(businesses, session_id, city),
+                columns=BUSINESS_COLUMNS
+            )
+            rows = await conn.fetch(MERGE_SQL)
+    return _counts([row['inserted'] for row in rows])
@@ -0,0 +1,177 @@
+"""
+Nearest named road for OSM POIs (osm_businesses.nearest_road_id,
+nearest_road_name, distance_to_road_m)
+Every POI-per-road endpoint reads these. Assignment is incremental: only POIs
+inserted, or moved, since they were last assigned are pending. Several
+connections take disjoint batches of a state at once, and road_poi_aggregate
+is refreshed for the roads whose POIs changed.
+The SQL lives in schemas_nearest_road.sql so psql-driven import scripts can
+call assign_nearest_roads() directly. It alters and adds a trigger to
+osm_businesses, so it is installed by this CLI and the import script rather
+than on API startup.
+
+Usage (from google_maps_crawler/):
+    python -m app.database.nearest_road                      # every pending POI
+    python -m app.database.nearest_road --state AL --workers 8
+    python -m app.database.nearest_road --state AL --recompute
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Set
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'schemas_nearest_road.sql')
+
+BATCH_SIZE = 5000
+AGGREGATE_CHUNK = 5000
+
+# KNN over named segments only, and cheap lookup of pending POIs
+INDEX_SQL = [
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_osm_roads_main_named_geom
+    ON osm_roads_main USING GIST (geometry) WHERE name IS NOT NULL
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_osm_businesses_road_pending
+    ON osm_businesses (state_code, osm_id) WHERE nearest_road_checked_at IS NULL
+    """,
+]
+
+
+def create_indexes(conn):
+    # CONCURRENTLY can't run inside a transaction block
+    conn.autocommit = True
+    try:
+        cur = conn.cursor()
+        for sql in INDEX_SQL:
+            cur.execute(sql)
+    finally:
+        conn.autocommit = False
+
+
+def pending_states(conn) -> List[str]:
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT DISTINCT state_code FROM osm_businesses
+        WHERE nearest_road_checked_at IS NULL AND state_code IS NOT NULL
+        ORDER BY state_code
+    """)
+    return [row[0] for row in cur.fetchall()]
+
+
+class _Progress:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pois = 0
+        self.changed_roads: Set[int] = set()
+        self.started = time.time()
+
+    def add(self, pois: int, changed_roads: Iterable[int]):
+        with self.lock:
+            self.pois += pois
+            self.changed_roads.update(changed_roads)
+            total = self.pois
+        rate = total / max(time.time() - self.started, 0.001)
+        logger.info(f"{total:,} POIs assigned ({rate:,.0f}/s)")
+
+
+def _assign_worker(state_codes: List[str], batch_size: int, progress: _Progress):
+    """Take batches until no state has pending POIs left (one transaction per batch)"""
+    from .postgres_client import get_connection
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        for state_code in state_codes:
+            while True:
+                try:
+                    cur.execute("SELECT pois, changed_roads FROM assign_nearest_roads(%s, %s)", (state_code, batch_size))
+                    pois, changed_roads = cur.fetchone()
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                if not pois:
+                    break
+                progress.add(pois, changed_roads)
+    finally:
+        conn.close()
+
+
+def assign(state_codes: List[str], workers: int = 4, batch_size: int = BATCH_SIZE) -> _Progress:
+    """Assign every pending POI of the given states across parallel connections"""
+    progress = _Progress()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_assign_worker, state_codes, batch_size, progress) for _ in range(workers)]
+        for future in futures:
+            future.result()
+    return progress
+
+
+def refresh_aggregates(conn, road_osm_ids: Iterable[int]) -> int:
+    """Recompute road_poi_aggregate for roads whose POIs changed"""
+    road_osm_ids = sorted(road_osm_ids)
+    cur = conn.cursor()
+    refreshed = 0
+    for start in range(0, len(road_osm_ids), AGGREGATE_CHUNK):
+        cur.execute(
+            "SELECT refresh_road_poi_aggregate_roads(%s::bigint[])",
+            (road_osm_ids[start:start + AGGREGATE_CHUNK],)
+        )
+        refreshed += cur.fetchone()[0]
+        conn.commit()
+    return refreshed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign the nearest named road to pending OSM POIs")
+    parser.add_argument('--state', action='append', dest='states', help="State code (repeatable, default: all pending)")
+    parser.add_argument('--workers', type=int, default=4, help="Parallel database connections")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--recompute', action='store_true', help="Reassign every POI of the given states")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .postgres_client import get_connection
+    from scripts.database_config import notify_data_changed
+
+    conn = get_connection()
+    try:
+        with open(_SCHEMA_FILE) as f:
+            conn.cursor().execute(f.read())
+        conn.commit()
+        create_indexes(conn)
+
+        if args.recompute:
+            if not args.states:
+                parser.error("--recompute needs --state")
+            cur = conn.cursor()
+            cur.execute(
+                "UPDATE osm_businesses SET nearest_road_checked_at = NULL WHERE state_code = ANY(%s)",
+                (args.states,)
+            )
+            conn.commit()
+
+        states = args.states or pending_states(conn)
+        started = time.time()
+        progress = assign(states, args.workers, args.batch_size)
+        print(f"Assigned {progress.pois:,} POIs in {len(states)} states ({time.time() - started:.1f}s)")
+
+        if progress.changed_roads:
+            refreshed = refresh_aggregates(conn, progress.changed_roads)
+            print(f"Refreshed aggregates of {len(progress.changed_roads):,} roads ({refreshed:,} with POIs)")
+    finally:
+        conn.close()
+
+    if progress.pois:
+        notify_data_changed()
+
+
+if __name__ == "__main__":
+    main()
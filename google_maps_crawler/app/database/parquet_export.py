@@ -0,0 +1,317 @@
+"""
+Partitioned Parquet export of businesses, OSM POIs and road stats
+
+Rows are read through a psycopg2 named (server-side) cursor, converted to
+Arrow record batches and written as a hive-partitioned dataset
+(state_code=CA/city=San Diego/part-0.parquet), so memory stays at one batch
+no matter how large the table is.
+
+Usage (from google_maps_crawler/):
+    python -m app.database.parquet_export businesses osm_businesses --state CA --state AL
+    python -m app.database.parquet_export road_business_stats --out /data/exports
+
+    import pyarrow.dataset as ds
+    ds.dataset('exports/parquet/businesses', partitioning='hive').to_table(filter=...)
+"""
+import argparse
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from ..config import PARQUET_EXPORT_DIR
+from .postgres_client import get_connection
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50000
+
+# name -> (SQL expression, arrow type name). Types are fixed up front so a
+# batch that happens to be all-NULL in some column still matches the schema.
+DATASETS: Dict[str, Dict] = {
+    'businesses': {
+        'from': """
+            FROM businesses b
+            LEFT JOIN LATERAL (
+                SELECT state_code FROM osm_roads_main WHERE osm_id = b.road_osm_id LIMIT 1
+            ) r ON true
+        """,
+        'state_column': 'r.state_code',
+        'order_by': 'b.place_id',
+        'partition_by': ['state_code', 'city'],
+        'columns': [
+            ('place_id', 'b.place_id', 'string'),
+            ('name', 'b.name', 'string'),
+            ('formatted_address', 'b.formatted_address', 'string'),
+            ('lat', 'b.lat', 'float64'),
+            ('lng', 'b.lng', 'float64'),
+            ('types', 'b.types', 'list<string>'),
+            ('rating', 'b.rating::float8', 'float64'),
+            ('user_ratings_total', 'b.user_ratings_total', 'int32'),
+            ('price_level', 'b.price_level', 'int32'),
+            ('phone_number', 'b.phone_number', 'string'),
+            ('website', 'b.website', 'string'),
+            ('opening_hours', 'b.opening_hours::text', 'string'),
+            ('road_osm_id', 'b.road_osm_id', 'int64'),
+            ('road_name', 'b.road_name', 'string'),
+            ('distance_to_road', 'b.distance_to_road', 'float64'),
+            ('crawled_at', 'b.crawled_at', 'timestamp'),
+            ('crawl_session_id', 'b.crawl_session_id::text', 'string'),
+            ('state_code', 'r.state_code', 'string'),
+            ('city', 'b.city', 'string'),
+        ]
+    },
+    'osm_businesses': {
+        'from': "FROM osm_businesses p",
+        'state_column': 'p.state_code',
+        'order_by': 'p.state_code, p.city',
+        'partition_by': ['state_code', 'city'],
+        'columns': [
+            ('osm_id', 'p.osm_id', 'int64'),
+            ('osm_type', 'p.osm_type', 'string'),
+            ('name', 'p.name', 'string'),
+            ('brand', 'p.brand', 'string'),
+            ('business_type', 'p.business_type', 'string'),
+            ('business_subtype', 'p.business_subtype', 'string'),
+            ('cuisine', 'p.cuisine', 'string'),
+            ('phone', 'p.phone', 'string'),
+            ('website', 'p.website', 'string'),
+            ('opening_hours', 'p.opening_hours', 'string'),
+            ('postcode', 'p.postcode', 'string'),
+            ('county_fips', 'p.county_fips', 'string'),
+            ('lat', 'COALESCE(p.lat, ST_Y(p.geometry))', 'float64'),
+            ('lon', 'COALESCE(p.lon, ST_X(p.geometry))', 'float64'),
+            ('nearest_road_id', 'p.nearest_road_id', 'int64'),
+            ('nearest_road_name', 'p.nearest_road_name', 'string'),
+            ('distance_to_road_m', 'p.distance_to_road_m', 'float64'),
+            ('business_score', 'p.business_score', 'int32'),
+            ('state_code', 'p.state_code', 'string'),
+            ('city', 'p.city', 'string'),
+        ]
+    },
+    'road_business_stats': {
+        'from': "FROM road_business_stats s",
+        'state_column': 's.state_code',
+        'order_by': 's.state_code, s.county_fips',
+        'partition_by': ['state_code'],
+        'columns': [
+            ('osm_id', 's.osm_id', 'int64'),
+            ('name', 's.name', 'string'),
+            ('highway', 's.highway', 'string'),
+            ('county_fips', 's.county_fips', 'string'),
+            ('poi_count', 's.poi_count', 'int64'),
+            ('business_type_variety', 's.business_type_variety', 'int64'),
+            ('brand_count', 's.brand_count', 'int64'),
+            ('shops', 's.shops', 'int64'),
+            ('food_places', 's.food_places', 'int64'),
+            ('essential_services', 's.essential_services', 'int64'),
+            ('has_phone', 's.has_phone', 'int64'),
+            ('has_hours', 's.has_hours', 'int64'),
+            ('business_potential_score', 's.business_potential_score', 'int32'),
+            ('business_categories', 's.business_categories', 'string'),
+            ('top_brands', 's.top_brands', 'string'),
+            ('state_code', 's.state_code', 'string'),
+        ]
+    }
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+
+def _arrow_schema(columns: List[tuple]):
+    import pyarrow as pa
+
+    types = {
+        'string': pa.string(),
+        'int32': pa.int32(),
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'timestamp': pa.timestamp('us'),
+        'list<string>': pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[type_name]) for name, _, type_name in columns])
+
+
+def build_query(dataset: str, states: Optional[Sequence[str]] = None) -> tuple:
+    """SELECT for a dataset, optionally limited to some states"""
+    spec = DATASETS[dataset]
+    select = ',\n            '.join(f"{expr} as {name}" for name, expr, _ in spec['columns'])
+    params = []
+    where_clause = ""
+    if states:
+        where_clause = f"WHERE {spec['state_column']} = ANY(%s)"
+        params.append(list(states))
+    query = f"""
+        SELECT
+            {select}
+        {spec['from']}
+        {where_clause}
+        ORDER BY {spec['order_by']}
+    """
+    return query, params
+
+
+def _record_batches(cursor, schema, batch_size: int) -> Iterator:
+    """Turn server-side cursor pages into Arrow record batches"""
+    import pyarrow as pa
+
+    names = schema.names
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(columns[i], type=schema.field(i).type) for i in range(len(names))],
+            schema=schema
+        )
+
+
+def export_dataset(
+    dataset: str,
+    out_dir: str = PARQUET_EXPORT_DIR,
+    states: Optional[Sequence[str]] = None,
+    partition_by: Optional[List[str]] = None,
+    compression: str = 'zstd',
+    batch_size: int = BATCH_SIZE
+) -> Dict:
+    """
+    Export one dataset to <out_dir>/<dataset>/ as hive-partitioned Parquet
+    The new files are written to a temp dir and swapped in, so readers never see a half export
+    """
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}' (choose from {', '.join(DATASETS)})")
+
+    spec = DATASETS[dataset]
+    partition_by = partition_by or spec['partition_by']
+    if states and partition_by[0] != 'state_code':
+        # Partial exports swap whole state_code=XX directories
+        raise ValueError("--state exports must partition by state_code first")
+    schema = _arrow_schema(spec['columns'])
+    query, params = build_query(dataset, states)
+
+    target = os.path.join(out_dir, dataset)
+    staging = os.path.join(out_dir, f".{dataset}.{uuid.uuid4().hex[:8]}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    started = time.time()
+    rows = 0
+    conn = get_connection()
+    try:
+        # Named cursor = server-side; rows arrive batch_size at a time
+        cursor = conn.cursor(name=f"parquet_export_{dataset}")
+        cursor.itersize = batch_size
+        cursor.execute(query, params)
+
+        def counted(batches):
+            nonlocal rows
+            for batch in batches:
+                rows += batch.num_rows
+                yield batch
+
+        ds.write_dataset(
+            counted(_record_batches(cursor, schema, batch_size)),
+            staging,
+            schema=schema,
+            format='parquet',
+            partitioning=partition_by,
+            partitioning_flavor='hive',
+            file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+            max_rows_per_group=batch_size,
+            max_partitions=100000,
+            existing_data_behavior='overwrite_or_ignore'
+        )
+        cursor.close()
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    finally:
+        conn.rollback()
+        conn.close()
+
+    if states and os.path.isdir(target):
+        # Partial export: replace only the exported states' partitions
+        for state in states:
+            shutil.rmtree(os.path.join(target, f"state_code={state}"), ignore_errors=True)
+        if os.path.isdir(staging):
+            for name in os.listdir(staging):
+                dest = os.path.join(target, name)
+                shutil.rmtree(dest, ignore_errors=True)
+                os.replace(os.path.join(staging, name), dest)
+            shutil.rmtree(staging, ignore_errors=True)
+    else:
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        if os.path.isdir(staging):
+            os.replace(staging, target)
+        else:
+            os.makedirs(target, exist_ok=True)
+
+    files = list_files(dataset, out_dir)
+    result = {
+        'dataset': dataset,
+        'path': target,
+        'rows': rows,
+        'files': len(files),
+        'bytes': sum(f['bytes'] for f in files),
+        'partition_by': partition_by,
+        'states': list(states) if states else None,
+        'seconds': round(time.time() - started, 1)
+    }
+    logger.info(f"Exported {rows:,} {dataset} rows to {target} ({result['files']} files, {result['seconds']}s)")
+    return result
+
+
+def list_files(dataset: str, out_dir: str = PARQUET_EXPORT_DIR) -> List[Dict]:
+    """Parquet files of an exported dataset, relative to the dataset dir"""
+    root = os.path.join(out_dir, dataset)
+    files = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith('.parquet'):
+                path = os.path.join(dirpath, filename)
+                files.append({
+                    'path': os.path.relpath(path, root),
+                    'bytes': os.path.getsize(path),
+                    'modified': os.path.getmtime(path)
+                })
+    return sorted(files, key=lambda f: f['path'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export tables to partitioned Parquet")
+    parser.add_argument('datasets', nargs='+', choices=list(DATASETS))
+    parser.add_argument('--out', default=PARQUET_EXPORT_DIR, help="Output directory")
+    parser.add_argument('--state', action='append', dest='states', help="Only export these states (repeatable)")
+    parser.add_argument('--partition-by', help="Comma-separated partition columns (default per dataset)")
+    parser.add_argument('--compression', default='zstd', choices=['zstd', 'snappy', 'gzip', 'none'])
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    for dataset in args.datasets:
+        result = export_dataset(
+            dataset,
+            out_dir=args.out,
+            states=args.states,
+            partition_by=args.partition_by.split(',') if args.partition_by else None,
+            compression=args.compression,
+            batch_size=args.batch_size
+        )
+        print(f"{dataset}: {result['rows']:,} rows, {result['files']} files, "
+              f"{result['bytes'] / 1024 / 1024:.1f} MB -> {result['path']}")
+
+
+if __name__ == "__main__":
+    main()
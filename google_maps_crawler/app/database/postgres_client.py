@@ -5,7 +5,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
 
-from scripts.database_config import get_db_connection, execute_query
+from scripts.database_config import get_db_connection, execute_query, get_pool_stats, close_pool, notify_data_changed
 
 # Re-export for compatibility
 get_connection = get_db_connection
@@ -19,7 +19,7 @@ logger = logging.getLogger(__name__)
 
 class PostgresClient:
     def __init__(self):
-        # Test connection on init
+        # Test connection on init (checks a connection out of the shared pool)
         try:
             conn = get_db_connection()
             conn.close()
@@ -139,17 +139,19 @@ class PostgresClient:
             logger.error(f"Error saving business: {e}")
             return False
     
-    def save_businesses_batch(self, businesses: List[Business]) -> int:
-        """Save multiple businesses"""
+    def save_businesses_batch(self, businesses: List[Business], session_id: str = None, city: str = None) -> int:
+        """Save multiple businesses with one COPY + set-based upsert"""
         if not businesses:
             return 0
         
-        saved_count = 0
-        for business in businesses:
-            if self.save_business(business):
-                saved_count += 1
-        
-        return saved_count
+        try:
+            from .bulk_upsert import upsert_businesses
+            counts = upsert_businesses(businesses, session_id=session_id, city=city)
+            logger.info(f"Saved businesses batch: {counts['inserted']} inserted, {counts['updated']} updated")
+            return counts['inserted'] + counts['updated']
+        except Exception as e:
+            logger.error(f"Error saving businesses batch: {e}")
+            return 0
     
     # Crawl job operations
     def create_crawl_job(self, road: Road) -> Optional[str]:
@@ -444,4 +446,4 @@ postgres_client.initialize_api_tracking()
 
 # Export execute_query for direct use
 from scripts.database_config import execute_query
-__all__ = ['PostgresClient', 'postgres_client', 'execute_query']
\ No newline at end of file
+__all__ = ['PostgresClient', 'postgres_client', 'execute_query', 'get_connection', 'get_pool_stats', 'close_pool']
\ No newline at end of file
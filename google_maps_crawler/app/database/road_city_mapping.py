@@ -0,0 +1,418 @@
+"""
+Parallel, resumable road_city_mapping builder
+Named roads are mapped one county per task across N connections into
+road_city_mapping_build. road_city_mapping_tasks is the checkpoint: finished
+counties are skipped when a run is restarted, failed ones are retried. When
+every task is done the build replaces road_city_mapping in one transaction
+(the whole table, or only the built states with --state).
+
+Methods:
+    nearest   - nearest city/town/village in osm_places within --radius meters
+    boundary  - city_boundaries polygon containing the road (point in polygon),
+                falling back to the nearest place for roads outside every city
+
+Usage (from google_maps_crawler/):
+    python -m app.database.road_city_mapping --workers 8
+    python -m app.database.road_city_mapping --method boundary --target-only
+    python -m app.database.road_city_mapping --state CA --state NV
+    python -m app.database.road_city_mapping --restart      # discard a partial build
+"""
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PLACE_TYPES = ('city', 'town', 'village')
+DEFAULT_RADIUS_M = 10000
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 10
+
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS road_city_mapping_tasks (
+        state_code VARCHAR(2) NOT NULL,
+        county_fips VARCHAR(10) NOT NULL,   -- '' for roads without a county
+        roads BIGINT NOT NULL,              -- named roads, for progress/ETA
+        method VARCHAR(10) NOT NULL,
+        radius_m INTEGER NOT NULL,
+        target_only BOOLEAN NOT NULL,
+        partial BOOLEAN NOT NULL,           -- built for --state, replaces only those states
+        status VARCHAR(10) NOT NULL DEFAULT 'pending',  -- pending | running | done | failed
+        attempts INTEGER NOT NULL DEFAULT 0,
+        mapped BIGINT,
+        seconds REAL,
+        error TEXT,
+        finished_at TIMESTAMP,
+        PRIMARY KEY (state_code, county_fips)
+    );
+"""
+
+BUILD_TABLE_SQL = """
+    CREATE TABLE road_city_mapping_build (
+        road_id BIGINT NOT NULL,
+        city_name TEXT NOT NULL,
+        state_code VARCHAR(2) NOT NULL,
+        county_fips VARCHAR(10),
+        mapping_type VARCHAR(10),   -- within | nearest
+        distance_m REAL
+    )
+"""
+
+# Built before the swap, renamed to the final names after it
+BUILD_INDEXES = [
+    ('road_city_mapping_build_pkey', 'road_city_mapping_pkey',
+     "ALTER TABLE road_city_mapping_build ADD CONSTRAINT road_city_mapping_build_pkey "
+     "PRIMARY KEY (road_id, city_name, state_code)"),
+    ('idx_road_city_mapping_build_city', 'idx_road_city_mapping_city',
+     "CREATE INDEX idx_road_city_mapping_build_city ON road_city_mapping_build (state_code, city_name)"),
+    ('idx_road_city_mapping_build_state_county', 'idx_road_city_mapping_state_county',
+     "CREATE INDEX idx_road_city_mapping_build_state_county ON road_city_mapping_build (state_code, county_fips)"),
+]
+
+# The 3 nearest places by bounding box, ranked by meters
+NEAREST_PLACE_SQL = f"""
+    SELECT c.name, c.distance_m
+    FROM (
+        SELECT p.name, ST_Distance(p.geometry::geography, r.geometry::geography) as distance_m
+        FROM osm_places p
+        WHERE p.state_code = r.state_code
+          AND p.place_type IN ({', '.join(f"'{t}'" for t in PLACE_TYPES)})
+        ORDER BY p.geometry <-> r.geometry
+        LIMIT 3
+    ) c
+    WHERE c.distance_m <= %(radius_m)s
+    ORDER BY c.distance_m
+    LIMIT 1
+"""
+
+NEAREST_TASK_SQL = f"""
+    SELECT r.id as road_id, n.name as city_name, r.state_code, r.county_fips,
+           'nearest' as mapping_type, n.distance_m
+    FROM osm_roads_main r
+    CROSS JOIN LATERAL ({NEAREST_PLACE_SQL}) n
+    WHERE {{road_filter}}
+"""
+
+BOUNDARY_TASK_SQL = f"""
+    SELECT r.id as road_id, COALESCE(w.name, n.name) as city_name, r.state_code, r.county_fips,
+           CASE WHEN w.name IS NOT NULL THEN 'within' ELSE 'nearest' END as mapping_type,
+           CASE WHEN w.name IS NOT NULL THEN 0 ELSE n.distance_m END as distance_m
+    FROM osm_roads_main r
+    LEFT JOIN LATERAL (
+        SELECT cb.name
+        FROM city_boundaries cb
+        WHERE cb.state_code = r.state_code
+          AND ST_Covers(cb.geometry, ST_PointOnSurface(r.geometry))
+        ORDER BY cb.admin_level DESC  -- innermost boundary
+        LIMIT 1
+    ) w ON true
+    -- a one-time filter: the place lookup only runs for roads outside every boundary
+    LEFT JOIN LATERAL (
+        SELECT * FROM ({NEAREST_PLACE_SQL}) nearest WHERE w.name IS NULL
+    ) n ON true
+    WHERE {{road_filter}}
+"""
+
+ROAD_FILTER = """
+    r.state_code = %(state_code)s
+    AND (r.county_fips = %(county_fips)s OR (%(county_fips)s = '' AND r.county_fips IS NULL))
+    AND r.name IS NOT NULL
+"""
+
+TARGET_FILTER = """
+    AND EXISTS (
+        SELECT 1 FROM target_cities_346 t
+        WHERE t.city_name = m.city_name AND t.state_code = m.state_code
+    )
+"""
+
+
+def task_sql(method: str, target_only: bool) -> str:
+    mapped = (BOUNDARY_TASK_SQL if method == 'boundary' else NEAREST_TASK_SQL).format(road_filter=ROAD_FILTER)
+    return f"""
+        INSERT INTO road_city_mapping_build (road_id, city_name, state_code, county_fips, mapping_type, distance_m)
+        SELECT m.road_id, m.city_name, m.state_code, m.county_fips, m.mapping_type, m.distance_m
+        FROM ({mapped}) m
+        WHERE m.city_name IS NOT NULL
+        {TARGET_FILTER if target_only else ''}
+        ON CONFLICT DO NOTHING
+    """
+
+
+def start_build(conn, method: str, radius_m: int, target_only: bool, states: Optional[List[str]]):
+    """Fresh build table and one task per county with named roads"""
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS road_city_mapping_build")
+    cur.execute(BUILD_TABLE_SQL)
+    # Needed for ON CONFLICT while building; the other indexes come at the end
+    cur.execute(BUILD_INDEXES[0][2])
+    cur.execute("TRUNCATE road_city_mapping_tasks")
+    state_filter = "AND state_code = ANY(%(states)s)" if states else ""
+    cur.execute(f"""
+        INSERT INTO road_city_mapping_tasks (state_code, county_fips, roads, method, radius_m, target_only, partial)
+        SELECT state_code, COALESCE(county_fips, ''), COUNT(*),
+               %(method)s, %(radius_m)s, %(target_only)s, %(partial)s
+        FROM osm_roads_main
+        WHERE name IS NOT NULL AND state_code IS NOT NULL {state_filter}
+        GROUP BY state_code, COALESCE(county_fips, '')
+    """, {'method': method, 'radius_m': radius_m, 'target_only': target_only,
+          'partial': bool(states), 'states': states})
+    conn.commit()
+
+
+def build_settings(conn) -> Optional[Tuple[str, int, bool, bool]]:
+    cur = conn.cursor()
+    cur.execute("SELECT method, radius_m, target_only, partial FROM road_city_mapping_tasks LIMIT 1")
+    row = cur.fetchone()
+    return tuple(row) if row else None
+
+
+def _task_states(conn) -> set:
+    cur = conn.cursor()
+    cur.execute("SELECT DISTINCT state_code FROM road_city_mapping_tasks")
+    return {row[0] for row in cur.fetchall()}
+
+
+class _Progress:
+    """Road-weighted progress and ETA across workers"""
+
+    def __init__(self, conn):
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT COALESCE(SUM(roads), 0), COALESCE(SUM(roads) FILTER (WHERE status = 'done'), 0),
+                   COUNT(*), COUNT(*) FILTER (WHERE status = 'done')
+            FROM road_city_mapping_tasks
+        """)
+        self.total_roads, self.done_roads, self.total_tasks, self.done_tasks = cur.fetchone()
+        self.roads_this_run = 0
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def task_done(self, state_code: str, county_fips: str, roads: int, mapped: int, seconds: float):
+        with self.lock:
+            self.done_tasks += 1
+            self.done_roads += roads
+            self.roads_this_run += roads
+            rate = self.roads_this_run / max(time.time() - self.started, 0.001)
+            remaining = self.total_roads - self.done_roads
+            eta = remaining / rate if rate else 0
+            logger.info(
+                f"{state_code}/{county_fips or '-'}: {mapped:,} of {roads:,} roads mapped ({seconds:.1f}s) - "
+                f"{self.done_tasks}/{self.total_tasks} counties, "
+                f"{self.done_roads / max(self.total_roads, 1):.1%}, ETA {eta / 60:.0f} min"
+            )
+
+
+def _claim(cur, max_attempts: int):
+    cur.execute("""
+        UPDATE road_city_mapping_tasks t
+        SET status = 'running', attempts = t.attempts + 1
+        FROM (
+            SELECT state_code, county_fips
+            FROM road_city_mapping_tasks
+            WHERE status = 'pending'
+               OR (status = 'failed' AND attempts < %s
+                   AND finished_at < NOW() - make_interval(secs => attempts * %s))
+            ORDER BY roads DESC  -- big counties first, so the run doesn't end on one
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        ) next
+        WHERE t.state_code = next.state_code AND t.county_fips = next.county_fips
+        RETURNING t.state_code, t.county_fips, t.roads
+    """, (max_attempts, RETRY_DELAY_SECONDS))
+    return cur.fetchone()
+
+
+def _worker(insert_sql: str, radius_m: int, max_attempts: int, progress: _Progress, stop: threading.Event):
+    from .postgres_client import get_connection
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        while not stop.is_set():
+            task = _claim(cur, max_attempts)
+            conn.commit()
+            if task is None:
+                cur.execute("""
+                    SELECT COUNT(*) FROM road_city_mapping_tasks
+                    WHERE status = 'running' OR (status = 'failed' AND attempts < %s)
+                """, (max_attempts,))
+                if not cur.fetchone()[0]:
+                    return
+                # Others are still running, or a failed county waits for its retry
+                stop.wait(RETRY_DELAY_SECONDS)
+                continue
+
+            state_code, county_fips, roads = task
+            started = time.time()
+            try:
+                # A retried county starts clean
+                cur.execute(
+                    "DELETE FROM road_city_mapping_build WHERE state_code = %s AND COALESCE(county_fips, '') = %s",
+                    (state_code, county_fips)
+                )
+                cur.execute(insert_sql, {'state_code': state_code, 'county_fips': county_fips, 'radius_m': radius_m})
+                mapped = cur.rowcount
+                seconds = time.time() - started
+                cur.execute("""
+                    UPDATE road_city_mapping_tasks
+                    SET status = 'done', mapped = %s, seconds = %s, error = NULL, finished_at = NOW()
+                    WHERE state_code = %s AND county_fips = %s
+                """, (mapped, seconds, state_code, county_fips))
+                conn.commit()
+                progress.task_done(state_code, county_fips, roads, mapped, seconds)
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"{state_code}/{county_fips or '-'} failed: {e}")
+                cur.execute("""
+                    UPDATE road_city_mapping_tasks
+                    SET status = 'failed', error = %s, finished_at = NOW()
+                    WHERE state_code = %s AND county_fips = %s
+                """, (str(e), state_code, county_fips))
+                conn.commit()
+    finally:
+        conn.close()
+
+
+def run_tasks(conn, workers: int, max_attempts: int = MAX_ATTEMPTS) -> int:
+    """Run pending tasks across `workers` connections; returns the number of counties left unfinished"""
+    method, radius_m, target_only, _ = build_settings(conn)
+    insert_sql = task_sql(method, target_only)
+
+    cur = conn.cursor()
+    # Left over from an interrupted run (the caller holds the build lock)
+    cur.execute("UPDATE road_city_mapping_tasks SET status = 'pending' WHERE status = 'running'")
+    conn.commit()
+
+    progress = _Progress(conn)
+    logger.info(
+        f"Mapping {progress.total_tasks - progress.done_tasks} of {progress.total_tasks} counties "
+        f"({method}) with {workers} workers"
+    )
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_worker, insert_sql, radius_m, max_attempts, progress, stop) for _ in range(workers)]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            stop.set()
+            raise
+
+    cur.execute("SELECT COUNT(*) FROM road_city_mapping_tasks WHERE status <> 'done'")
+    unfinished = cur.fetchone()[0]
+    conn.commit()
+    return unfinished
+
+
+def _recreate_dependent_views(cur, views: List[Tuple[str, str]]):
+    for name, definition in views:
+        cur.execute(f"CREATE OR REPLACE VIEW {name} AS {definition}")
+
+
+def swap_in(conn):
+    """Replace road_city_mapping with the finished build in one transaction"""
+    cur = conn.cursor()
+    for _, _, sql in BUILD_INDEXES[1:]:
+        cur.execute(sql)
+    cur.execute("ANALYZE road_city_mapping_build")
+    conn.commit()
+
+    _, _, _, partial = build_settings(conn)
+    if partial:
+        # Only the built states change; readers see the old rows until commit
+        cur.execute("DELETE FROM road_city_mapping WHERE state_code = ANY(%s)", (sorted(_task_states(conn)),))
+        cur.execute("""
+            INSERT INTO road_city_mapping (road_id, city_name, state_code)
+            SELECT road_id, city_name, state_code FROM road_city_mapping_build
+            ON CONFLICT DO NOTHING
+        """)
+        cur.execute("DROP TABLE road_city_mapping_build")
+    else:
+        # Views bind to the table itself, so recreate them against the new one
+        cur.execute("""
+            SELECT DISTINCT v.oid::regclass::text, pg_get_viewdef(v.oid)
+            FROM pg_depend d
+            JOIN pg_rewrite rw ON rw.oid = d.objid
+            JOIN pg_class v ON v.oid = rw.ev_class AND v.relkind = 'v'
+            WHERE d.refobjid = 'road_city_mapping'::regclass AND v.oid <> d.refobjid
+        """)
+        views = cur.fetchall()
+        cur.execute("ALTER TABLE road_city_mapping RENAME TO road_city_mapping_old")
+        cur.execute("ALTER TABLE road_city_mapping_build RENAME TO road_city_mapping")
+        _recreate_dependent_views(cur, views)
+        cur.execute("DROP TABLE road_city_mapping_old")
+        for build_name, final_name, _ in BUILD_INDEXES:
+            cur.execute(f"ALTER INDEX {build_name} RENAME TO {final_name}")
+    cur.execute("TRUNCATE road_city_mapping_tasks")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build road_city_mapping county by county in parallel")
+    parser.add_argument('--method', choices=['nearest', 'boundary'], default='nearest')
+    parser.add_argument('--radius', type=int, default=DEFAULT_RADIUS_M, help="Max distance to a place (m)")
+    parser.add_argument('--target-only', action='store_true', help="Keep only target_cities_346 cities")
+    parser.add_argument('--state', action='append', dest='states', help="Only rebuild these states (repeatable)")
+    parser.add_argument('--workers', type=int, default=4, help="Parallel database connections")
+    parser.add_argument('--retries', type=int, default=MAX_ATTEMPTS, help="Attempts per county")
+    parser.add_argument('--restart', action='store_true', help="Discard a partial build and start over")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .postgres_client import get_connection
+    from . import road_stats
+    from scripts.database_config import notify_data_changed
+
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT pg_try_advisory_lock(hashtext('road_city_mapping_build'))")
+    if not cur.fetchone()[0]:
+        conn.close()
+        parser.error("another road_city_mapping build is running")
+    try:
+        cur.execute(SCHEMA_SQL)
+        conn.commit()
+
+        states = [s.upper() for s in args.states] if args.states else None
+        settings = build_settings(conn)
+        wanted = (args.method, args.radius, args.target_only, bool(states))
+        if settings is None or args.restart:
+            start_build(conn, args.method, args.radius, args.target_only, states)
+        elif settings != wanted or (states and set(states) != _task_states(conn)):
+            parser.error(f"a build with different settings is in progress {settings}; resume it with "
+                         f"the same options or pass --restart")
+        else:
+            logger.info("Resuming the build in progress")
+
+        started = time.time()
+        unfinished = run_tasks(conn, args.workers, args.retries)
+        if unfinished:
+            print(f"{unfinished} counties failed after {args.retries} attempts - "
+                  f"see road_city_mapping_tasks.error; rerun to retry them")
+            return
+
+        swap_in(conn)
+        print(f"road_city_mapping rebuilt ({time.time() - started:.0f}s)")
+
+        # city_roads_simple and the road stats follow road_city_mapping
+        road_stats.ensure_schema(conn)
+        cur.execute("SELECT DISTINCT state_code FROM road_city_mapping")
+        road_stats.mark_states(conn, [row[0] for row in cur.fetchall()])
+        print("Queued road stats refresh - run python -m app.database.road_stats")
+    finally:
+        # Pooled connection - don't hand it back still holding the lock
+        conn.rollback()
+        cur.execute("SELECT pg_advisory_unlock(hashtext('road_city_mapping_build'))")
+        conn.commit()
+        conn.close()
+
+    notify_data_changed()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Distance from crawled businesses to roads (businesses.distance_to_road,
+nearest_road_osm_id, nearest_road_distance)
+Text search also returns places several blocks away from the road it was asked
+about. After a crawl page is parsed, every place is measured in one query -
+meters to the crawled road's geometry and to the nearest road of any kind - so
+far-away results can be dropped before they are upserted.
+The SQL lives in schemas_road_distance.sql; the CLI drops the old 0 default
+of distance_to_road, indexes unmeasured rows and backfills businesses that were
+saved before they were measured.
+
+Usage (from google_maps_crawler/):
+    python -m app.database.road_distance                  # every unmeasured business
+    python -m app.database.road_distance --workers 4
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from . import async_db
+from ..models import Business
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'schemas_road_distance.sql')
+
+BATCH_SIZE = 2000
+
+# One-off migration steps, kept out of ensure_schema() so API and worker
+# startups don't take locks on businesses
+MIGRATION_SQL = "ALTER TABLE businesses ALTER COLUMN distance_to_road DROP DEFAULT"
+
+INDEX_SQL = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_businesses_distance_pending
+    ON businesses (place_id) WHERE nearest_road_distance IS NULL
+"""
+
+
+async def ensure_schema():
+    """Create the distance columns and business_road_distances()"""
+    with open(_SCHEMA_FILE) as f:
+        schema_sql = f.read()
+    async with async_db.connection() as conn:
+        await conn.execute(schema_sql)
+
+
+async def measure(businesses: List[Business]) -> List[Business]:
+    """Fill in the road distances of a crawl's businesses (one query, in place)"""
+    if not businesses:
+        return businesses
+
+    rows = await async_db.fetch(
+        """
+        SELECT ord, distance_to_road, nearest_road_osm_id, nearest_road_distance
+        FROM business_road_distances(%s::float8[], %s::float8[], %s::bigint[])
+        """,
+        (
+            [b.lng for b in businesses],
+            [b.lat for b in businesses],
+            [b.road_osm_id for b in businesses]
+        )
+    )
+    for row in rows:
+        b = businesses[row['ord'] - 1]
+        b.distance_to_road = row['distance_to_road']
+        b.nearest_road_osm_id = row['nearest_road_osm_id']
+        b.nearest_road_distance = row['nearest_road_distance']
+    return businesses
+
+
+def drop_far(businesses: List[Business], max_distance: Optional[float]) -> Tuple[List[Business], int]:
+    """
+    Keep businesses within max_distance meters of their road
+    Unmeasured ones (road not in osm_roads_main) are kept; max_distance <= 0 keeps all
+    Returns (kept, dropped_count)
+    """
+    if not max_distance or max_distance <= 0:
+        return businesses, 0
+    kept = [b for b in businesses if b.distance_to_road is None or b.distance_to_road <= max_distance]
+    return kept, len(businesses) - len(kept)
+
+
+def migrate(conn):
+    """Install the schema, drop the old default and index unmeasured rows"""
+    cur = conn.cursor()
+    with open(_SCHEMA_FILE) as f:
+        cur.execute(f.read())
+    cur.execute("""
+        SELECT column_default IS NOT NULL FROM information_schema.columns
+        WHERE table_name = 'businesses' AND column_name = 'distance_to_road'
+    """)
+    row = cur.fetchone()
+    if row and row[0]:
+        cur.execute(MIGRATION_SQL)
+    conn.commit()
+
+    # CONCURRENTLY can't run inside a transaction block
+    conn.autocommit = True
+    try:
+        cur.execute(INDEX_SQL)
+    finally:
+        conn.autocommit = False
+
+
+def _backfill_worker(batch_size: int, totals: dict, lock: threading.Lock):
+    from .postgres_client import get_connection
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        while True:
+            try:
+                cur.execute("SELECT backfill_business_road_distances(%s)", (batch_size,))
+                measured = cur.fetchone()[0]
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if not measured:
+                break
+            with lock:
+                totals['measured'] += measured
+                total = totals['measured']
+            logger.info(f"{total:,} businesses measured")
+    finally:
+        conn.close()
+
+
+def backfill(workers: int = 4, batch_size: int = BATCH_SIZE) -> int:
+    """Measure every stored business without distances across parallel connections"""
+    totals = {'measured': 0}
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_backfill_worker, batch_size, totals, lock) for _ in range(workers)]
+        for future in futures:
+            future.result()
+    return totals['measured']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure road distances of businesses saved without them")
+    parser.add_argument('--workers', type=int, default=4, help="Parallel database connections")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .postgres_client import get_connection
+    from scripts.database_config import notify_data_changed
+
+    conn = get_connection()
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+
+    started = time.time()
+    measured = backfill(args.workers, args.batch_size)
+    print(f"Measured {measured:,} businesses ({time.time() - started:.1f}s)")
+
+    if measured:
+        notify_data_changed(('crawl',))
+
+
+if __name__ == "__main__":
+    main()
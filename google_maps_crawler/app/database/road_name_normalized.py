@@ -0,0 +1,132 @@
+"""
+Stored normalized road names (osm_roads_main.road_name_normalized)
+
+normalize_road_name() is the SQL twin of crawler.road_names.normalize; its
+abbreviation table is generated from ROAD_ABBREVIATIONS so the two can't
+drift. A trigger keeps the column current for new/renamed roads; existing
+rows are backfilled in id batches, then the index is built concurrently.
+
+Usage (from google_maps_crawler/):
+    python -m app.database.road_name_normalized            # schema + backfill + index
+    python -m app.database.road_name_normalized --state CA # backfill one state
+"""
+import argparse
+import logging
+import time
+
+from ..crawler.road_names import ROAD_ABBREVIATIONS
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH = 50000
+
+
+def function_sql() -> str:
+    abbreviations = ',\n            '.join(f"('{word}', '{canonical}')" for word, canonical in ROAD_ABBREVIATIONS.items())
+    return f"""
+    -- Mirrors app/crawler/road_names.py normalize(): lowercase, drop apostrophes,
+    -- punctuation -> spaces, abbreviate street types and directions
+    CREATE OR REPLACE FUNCTION normalize_road_name(p_name TEXT)
+    RETURNS TEXT AS $$
+        SELECT string_agg(COALESCE(a.canonical, t.token), ' ' ORDER BY t.pos)
+        FROM regexp_split_to_table(
+            btrim(regexp_replace(regexp_replace(lower(p_name), '[''’]', '', 'g'), '[^0-9a-z]+', ' ', 'g')),
+            ' '
+        ) WITH ORDINALITY AS t(token, pos)
+        LEFT JOIN (VALUES
+            {abbreviations}
+        ) AS a(word, canonical) ON a.word = t.token
+        WHERE t.token <> ''
+    $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+    """
+
+
+SCHEMA_SQL = """
+    ALTER TABLE osm_roads_main ADD COLUMN IF NOT EXISTS road_name_normalized TEXT;
+
+    CREATE OR REPLACE FUNCTION set_road_name_normalized()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        NEW.road_name_normalized := normalize_road_name(NEW.name);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS osm_roads_main_name_normalized ON osm_roads_main;
+    CREATE TRIGGER osm_roads_main_name_normalized
+        BEFORE INSERT OR UPDATE OF name ON osm_roads_main
+        FOR EACH ROW EXECUTE FUNCTION set_road_name_normalized();
+"""
+
+# Equality lookups, optionally within a state
+INDEX_SQL = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_osm_roads_main_name_normalized
+    ON osm_roads_main (road_name_normalized, state_code)
+"""
+
+
+def ensure_schema(conn):
+    """Create the SQL function, the column and its trigger (sync connection)"""
+    cur = conn.cursor()
+    cur.execute(function_sql())
+    cur.execute(SCHEMA_SQL)
+    conn.commit()
+
+
+def backfill(conn, state_code: str = None, batch_size: int = BACKFILL_BATCH) -> int:
+    """Fill road_name_normalized in id ranges, one short transaction per batch"""
+    cur = conn.cursor()
+    state_filter = "AND state_code = %s" if state_code else ""
+    state_params = (state_code,) if state_code else ()
+
+    cur.execute(f"SELECT MIN(id), MAX(id) FROM osm_roads_main WHERE name IS NOT NULL {state_filter}", state_params)
+    low, high = cur.fetchone()
+    if low is None:
+        return 0
+
+    updated = 0
+    for start in range(low, high + 1, batch_size):
+        cur.execute(f"""
+            UPDATE osm_roads_main
+            SET road_name_normalized = normalize_road_name(name)
+            WHERE id >= %s AND id < %s AND name IS NOT NULL {state_filter}
+              AND road_name_normalized IS DISTINCT FROM normalize_road_name(name)
+        """, (start, start + batch_size) + state_params)
+        updated += cur.rowcount
+        conn.commit()
+    return updated
+
+
+def create_index(conn):
+    # CONCURRENTLY can't run inside a transaction block
+    conn.autocommit = True
+    try:
+        conn.cursor().execute(INDEX_SQL)
+    finally:
+        conn.autocommit = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add and backfill osm_roads_main.road_name_normalized")
+    parser.add_argument('--state', help="Only backfill this state")
+    parser.add_argument('--batch-size', type=int, default=BACKFILL_BATCH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .postgres_client import get_connection
+
+    conn = get_connection()
+    try:
+        ensure_schema(conn)
+        started = time.time()
+        updated = backfill(conn, args.state, args.batch_size)
+        print(f"Normalized {updated:,} road names ({time.time() - started:.1f}s)")
+        create_index(conn)
+        print("Index idx_osm_roads_main_name_normalized ready")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Per-road OSM POI aggregates (road_poi_aggregate)
+Counts, contact coverage and top brands per road, kept up to date by
+refreshing a state after POI imports and single roads after enrichment.
+The SQL lives in schemas_road_poi_aggregate.sql so psql-driven import
+scripts can call the same refresh functions.
+
+Usage (from google_maps_crawler/):
+    python -m app.database.road_poi_aggregate --state CA --state NV
+    python -m app.database.road_poi_aggregate --all
+"""
+import argparse
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from . import async_db
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'schemas_road_poi_aggregate.sql')
+
+AGGREGATE_COLUMNS = """
+    road_osm_id, road_name, state_code, county_fips,
+    poi_count, poi_with_phone, poi_with_website, poi_with_hours, brand_count, top_brands
+"""
+
+
+async def ensure_schema():
+    """Create the aggregate table and its refresh functions"""
+    with open(_SCHEMA_FILE) as f:
+        schema_sql = f.read()
+    async with async_db.connection() as conn:
+        await conn.execute(schema_sql)
+
+
+async def refresh_roads_async(road_osm_ids: Iterable[int]) -> int:
+    """Recompute a few roads, e.g. after their POIs were enriched"""
+    road_osm_ids = sorted({int(r) for r in road_osm_ids if r is not None})
+    if not road_osm_ids:
+        return 0
+    return await async_db.fetch_val("SELECT refresh_road_poi_aggregate_roads(%s::bigint[])", (road_osm_ids,))
+
+
+async def refresh_state_async(state_code: str) -> int:
+    return await async_db.fetch_val("SELECT refresh_road_poi_aggregate(%s)", (state_code,))
+
+
+def refresh_state(state_code: str) -> int:
+    """Recompute every road of a state in one transaction (sync, for import scripts)"""
+    from .postgres_client import get_connection
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT refresh_road_poi_aggregate(%s)", (state_code,))
+        refreshed = cur.fetchone()[0]
+        conn.commit()
+        return refreshed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+async def fetch_roads_with_stats(
+    state_code: Optional[str] = None,
+    county_fips: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: int = 20
+) -> List[Dict]:
+    """
+    Roads ordered by POI count, then name - roads with POIs come from the
+    aggregate's covering indexes, the page is topped up with POI-less roads
+    """
+    conditions = []
+    params = []
+
+    if state_code:
+        conditions.append("state_code = %s")
+        params.append(state_code)
+
+    if county_fips:
+        conditions.append("county_fips = %s")
+        params.append(county_fips)
+
+    road_conditions = [f"r.{c}" for c in conditions]
+    road_params = list(params)
+
+    if search:
+        conditions.append("road_name ILIKE %s")
+        params.append(f"%{search}%")
+        road_conditions.append("r.name ILIKE %s")
+        road_params.append(f"%{search}%")
+
+    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+    roads = await async_db.fetch(f"""
+        SELECT {AGGREGATE_COLUMNS}
+        FROM road_poi_aggregate
+        {where_clause}
+        ORDER BY poi_count DESC, road_name
+        LIMIT %s
+    """, params + [limit])
+
+    if len(roads) < limit:
+        road_conditions.append(
+            "NOT EXISTS (SELECT 1 FROM road_poi_aggregate a WHERE a.road_osm_id = r.osm_id)"
+        )
+        roads += await async_db.fetch(f"""
+            SELECT
+                r.osm_id as road_osm_id,
+                r.name as road_name,
+                r.state_code,
+                r.county_fips,
+                0 as poi_count,
+                0 as poi_with_phone,
+                0 as poi_with_website,
+                0 as poi_with_hours,
+                0 as brand_count,
+                NULL as top_brands
+            FROM osm_roads_main r
+            WHERE {" AND ".join(road_conditions)}
+            ORDER BY r.name
+            LIMIT %s
+        """, road_params + [limit - len(roads)])
+
+    return roads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild road_poi_aggregate rows")
+    parser.add_argument('--state', action='append', dest='states', help="State code (repeatable)")
+    parser.add_argument('--all', action='store_true', help="Every state that has OSM POIs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .postgres_client import execute_query, get_connection
+    from scripts.database_config import notify_data_changed
+
+    conn = get_connection()
+    try:
+        with open(_SCHEMA_FILE) as f:
+            conn.cursor().execute(f.read())
+        conn.commit()
+    finally:
+        conn.close()
+
+    states = args.states or []
+    if args.all:
+        states = [row['state_code'] for row in execute_query(
+            "SELECT DISTINCT state_code FROM osm_businesses WHERE state_code IS NOT NULL ORDER BY state_code"
+        )]
+    if not states:
+        parser.error("pass --state XX or --all")
+
+    for state_code in states:
+        started = time.time()
+        refreshed = refresh_state(state_code)
+        print(f"{state_code}: {refreshed:,} roads with POIs ({time.time() - started:.1f}s)")
+
+    notify_data_changed()
+
+
+if __name__ == "__main__":
+    main()
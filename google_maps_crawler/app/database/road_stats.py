@@ -0,0 +1,97 @@
+"""
+Incremental refresh of city_roads_simple and the road statistics
+(osm_road_stats, osm_road_stats_by_state)
+Imports and road-city mapping runs queue the (state, county) partitions they
+touch through triggers; this recomputes only those, one transaction per
+partition, so an AL reimport doesn't recompute road lengths for the country.
+The SQL lives in schemas_road_stats.sql so psql-driven scripts can call
+SELECT refresh_road_stats() directly.
+
+Usage (from google_maps_crawler/):
+    python -m app.database.road_stats               # refresh queued partitions
+    python -m app.database.road_stats --state AL    # queue and refresh a state
+    python -m app.database.road_stats --all         # rebuild every state
+"""
+import argparse
+import logging
+import os
+import time
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'schemas_road_stats.sql')
+
+
+def ensure_schema(conn):
+    """Create the summary tables, views, triggers and refresh functions (sync connection)"""
+    with open(_SCHEMA_FILE) as f:
+        conn.cursor().execute(f.read())
+    conn.commit()
+
+
+def mark_states(conn, state_codes: List[str]):
+    cur = conn.cursor()
+    for state_code in state_codes:
+        cur.execute("SELECT mark_road_stats_dirty(%s)", (state_code,))
+    conn.commit()
+
+
+def pending_partitions(conn) -> List[Tuple[str, str]]:
+    cur = conn.cursor()
+    cur.execute("SELECT state_code, county_fips FROM pending_road_stats_partitions()")
+    return [tuple(row) for row in cur.fetchall()]
+
+
+def refresh_pending(conn) -> int:
+    """Refresh every queued partition, committing each one; returns partitions refreshed"""
+    partitions = pending_partitions(conn)
+    cur = conn.cursor()
+    for state_code, county_fips in partitions:
+        started = time.time()
+        try:
+            cur.execute("SELECT refresh_road_stats_partition(%s, %s)", (state_code, county_fips))
+            city_rows = cur.fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        label = state_code if county_fips == '*' else f"{state_code}/{county_fips or '-'}"
+        logger.info(f"{label}: {city_rows:,} city roads ({time.time() - started:.1f}s)")
+    return len(partitions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh road statistics for changed states/counties")
+    parser.add_argument('--state', action='append', dest='states', help="Queue a whole state (repeatable)")
+    parser.add_argument('--all', action='store_true', help="Queue every state")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .postgres_client import execute_query, get_connection
+    from scripts.database_config import notify_data_changed
+
+    states = args.states or []
+    if args.all:
+        states = [row['state_code'] for row in execute_query(
+            "SELECT DISTINCT state_code FROM osm_roads_main WHERE state_code IS NOT NULL ORDER BY state_code"
+        )]
+
+    conn = get_connection()
+    try:
+        ensure_schema(conn)
+        if states:
+            mark_states(conn, states)
+        started = time.time()
+        refreshed = refresh_pending(conn)
+    finally:
+        conn.close()
+
+    print(f"Refreshed {refreshed} partitions ({time.time() - started:.1f}s)")
+    if refreshed:
+        notify_data_changed()
+
+
+if __name__ == "__main__":
+    main()
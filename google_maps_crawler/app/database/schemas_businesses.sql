@@ -26,4 +26,6 @@ CREATE INDEX idx_businesses_road ON businesses(road_osm_id);
 CREATE INDEX idx_businesses_session ON businesses(crawl_session_id);
 CREATE INDEX idx_businesses_city ON businesses(city);
 CREATE INDEX idx_businesses_rating ON businesses(rating DESC);
-CREATE INDEX idx_businesses_crawled ON businesses(crawled_at DESC);
\ No newline at end of file
+CREATE INDEX idx_businesses_crawled ON businesses(crawled_at DESC);
+-- Keyset pagination for /api/businesses (ORDER BY crawled_at DESC, place_id DESC)
+CREATE INDEX IF NOT EXISTS idx_businesses_crawled_keyset ON businesses(crawled_at DESC, place_id DESC);
\ No newline at end of file
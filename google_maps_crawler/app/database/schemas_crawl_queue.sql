@@ -0,0 +1,39 @@
+-- Durable crawl job queue (one row per road + keyword)
+-- Workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED, so any number
+-- of crawler processes can pull from it without double-crawling a road.
+CREATE TABLE IF NOT EXISTS crawl_queue (
+    id BIGSERIAL PRIMARY KEY,
+    road_osm_id BIGINT NOT NULL,
+    keyword VARCHAR(100) NOT NULL DEFAULT 'all',
+    priority INTEGER DEFAULT 0, -- higher runs first (road_business_stats score)
+    status VARCHAR(20) DEFAULT 'pending', -- pending, running, completed, failed, skipped
+    attempts INTEGER DEFAULT 0,
+    max_attempts INTEGER DEFAULT 5,
+    available_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- retry backoff pushes this forward
+    locked_by VARCHAR(100),
+    locked_until TIMESTAMP, -- visibility timeout, extended by worker heartbeats
+    session_id UUID,
+    businesses_found INTEGER,
+    last_error TEXT,
+    created_by VARCHAR(100) DEFAULT 'system',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP
+);
+
+-- Only one live job per road/keyword; finished rows are kept as history
+CREATE UNIQUE INDEX IF NOT EXISTS idx_crawl_queue_active
+    ON crawl_queue(road_osm_id, keyword)
+    WHERE status IN ('pending', 'running');
+
+-- Claim order
+CREATE INDEX IF NOT EXISTS idx_crawl_queue_claim
+    ON crawl_queue(priority DESC, available_at)
+    WHERE status = 'pending';
+
+-- Expired leases
+CREATE INDEX IF NOT EXISTS idx_crawl_queue_locked
+    ON crawl_queue(locked_until)
+    WHERE status = 'running';
+
+CREATE INDEX IF NOT EXISTS idx_crawl_queue_status ON crawl_queue(status);
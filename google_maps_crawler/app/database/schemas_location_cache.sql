@@ -0,0 +1,43 @@
+-- Persisted tier of the location analysis cache (see app/crawler/location_cache.py)
+-- Rows are only valid for the osm_businesses data version they were computed
+-- against. The version is a sequence bumped by a statement trigger, so
+-- concurrent importers never wait on each other (nextval takes no row lock).
+CREATE SEQUENCE IF NOT EXISTS osm_businesses_version_seq;
+
+CREATE TABLE IF NOT EXISTS location_score_cache (
+    kind VARCHAR(20) NOT NULL,      -- 'analysis' | 'classification'
+    cell VARCHAR(12) NOT NULL,      -- geohash of the snapped point
+    radius_km REAL NOT NULL,
+    data_version BIGINT NOT NULL,
+    result JSONB NOT NULL,
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (kind, cell, radius_km)
+);
+
+-- Current data version (0 until the first change after the sequence was created)
+CREATE OR REPLACE FUNCTION osm_businesses_version()
+RETURNS BIGINT AS $$
+    SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM osm_businesses_version_seq;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION bump_osm_businesses_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM nextval('osm_businesses_version_seq');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF to_regclass('osm_businesses') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS osm_businesses_version_bump ON osm_businesses;
+        CREATE TRIGGER osm_businesses_version_bump
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON osm_businesses
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_osm_businesses_version();
+    END IF;
+END
+$$;
+
+-- Rows from older data versions are never read again; location_cache.ensure_schema prunes them
+CREATE INDEX IF NOT EXISTS idx_location_score_cache_version ON location_score_cache (data_version);
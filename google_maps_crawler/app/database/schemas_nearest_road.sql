@@ -0,0 +1,70 @@
+-- Nearest named road per OSM POI (see app/database/nearest_road.py)
+-- nearest_road_checked_at is NULL for POIs that still need an assignment:
+-- new rows, and rows whose geometry changed (reset by the trigger below).
+ALTER TABLE osm_businesses ADD COLUMN IF NOT EXISTS nearest_road_checked_at TIMESTAMP;
+
+CREATE OR REPLACE FUNCTION reset_nearest_road_check()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.nearest_road_checked_at := NULL;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS osm_businesses_moved ON osm_businesses;
+CREATE TRIGGER osm_businesses_moved
+    BEFORE UPDATE OF geometry ON osm_businesses
+    FOR EACH ROW
+    WHEN (ST_AsEWKB(OLD.geometry) IS DISTINCT FROM ST_AsEWKB(NEW.geometry))
+    EXECUTE FUNCTION reset_nearest_road_check();
+
+-- Assign up to p_limit pending POIs of a state. Parallel callers take disjoint
+-- batches (SKIP LOCKED). The 5 nearest named segments by bounding box (<->)
+-- are ranked by true distance in meters. Returns the number of POIs handled and
+-- the roads that gained or lost POIs, for refresh_road_poi_aggregate_roads().
+CREATE OR REPLACE FUNCTION assign_nearest_roads(p_state_code TEXT, p_limit INTEGER)
+RETURNS TABLE (pois INTEGER, changed_roads BIGINT[]) AS $$
+    WITH batch AS (
+        SELECT osm_id, geometry, nearest_road_id
+        FROM osm_businesses
+        WHERE state_code = p_state_code AND nearest_road_checked_at IS NULL
+        ORDER BY osm_id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ),
+    nearest AS (
+        SELECT b.osm_id, b.nearest_road_id as old_road_id, r.osm_id as road_id, r.name, r.distance_m
+        FROM batch b
+        LEFT JOIN LATERAL (
+            SELECT c.osm_id, c.name, ST_Distance(c.geometry::geography, b.geometry::geography) as distance_m
+            FROM (
+                SELECT osm_id, name, geometry
+                FROM osm_roads_main
+                WHERE name IS NOT NULL
+                ORDER BY geometry <-> b.geometry
+                LIMIT 5
+            ) c
+            ORDER BY distance_m
+            LIMIT 1
+        ) r ON b.geometry IS NOT NULL
+    ),
+    updated AS (
+        UPDATE osm_businesses o
+        SET nearest_road_id = n.road_id,
+            nearest_road_name = n.name,
+            distance_to_road_m = n.distance_m,
+            nearest_road_checked_at = clock_timestamp()
+        FROM nearest n
+        WHERE o.osm_id = n.osm_id
+        RETURNING n.old_road_id, n.road_id
+    )
+    SELECT
+        (SELECT COUNT(*)::integer FROM updated),
+        ARRAY(
+            SELECT old_road_id FROM updated
+            WHERE old_road_id IS NOT NULL AND old_road_id IS DISTINCT FROM road_id
+            UNION
+            SELECT road_id FROM updated
+            WHERE road_id IS NOT NULL AND road_id IS DISTINCT FROM old_road_id
+        );
+$$ LANGUAGE sql;
@@ -0,0 +1,23 @@
+-- Raw Places API Text Search responses (see app/crawler/places_cache.py)
+-- One row per page; all pages of a request are written together, so a key
+-- that has rows has every page of its answer.
+CREATE TABLE IF NOT EXISTS places_response_cache (
+    request_key CHAR(64) NOT NULL,   -- sha256 of normalized body + field mask
+    page SMALLINT NOT NULL,          -- 1-based
+    tier VARCHAR(30) NOT NULL,
+    query TEXT,
+    response JSONB NOT NULL,
+    fetched_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (request_key, page)
+);
+
+CREATE INDEX IF NOT EXISTS idx_places_response_cache_fetched ON places_response_cache (fetched_at);
+
+-- Crawl summaries: billed pages go to api_calls_made, pages served from the cache here
+DO $$
+BEGIN
+    IF to_regclass('crawl_sessions') IS NOT NULL THEN
+        ALTER TABLE crawl_sessions ADD COLUMN IF NOT EXISTS cached_pages INTEGER DEFAULT 0;
+    END IF;
+END
+$$;
@@ -0,0 +1,86 @@
+-- Distance from crawled businesses to roads (see app/database/road_distance.py)
+-- distance_to_road: meters to the geometry of the road the business was crawled for
+-- nearest_road_osm_id / nearest_road_distance: the closest road of any kind and
+-- its distance. NULL nearest_road_distance = not measured yet.
+-- Dropping the old distance_to_road default and the pending-rows index are
+-- one-off steps of `python -m app.database.road_distance`.
+ALTER TABLE businesses ADD COLUMN IF NOT EXISTS nearest_road_osm_id BIGINT;
+ALTER TABLE businesses ADD COLUMN IF NOT EXISTS nearest_road_distance FLOAT;
+
+-- Distances for a whole page of places at once. The arrays are parallel;
+-- rows come back in input order (ord is 1-based). A road's OSM way can be
+-- split into several rows of osm_roads_main, so the closest piece counts.
+-- The nearest road overall: 5 candidates by bounding box (<->), ranked by
+-- true distance in meters.
+CREATE OR REPLACE FUNCTION business_road_distances(
+    p_lngs DOUBLE PRECISION[],
+    p_lats DOUBLE PRECISION[],
+    p_road_osm_ids BIGINT[]
+)
+RETURNS TABLE (ord BIGINT, distance_to_road DOUBLE PRECISION,
+               nearest_road_osm_id BIGINT, nearest_road_distance DOUBLE PRECISION) AS $$
+    WITH places AS (
+        SELECT t.ord, t.road_osm_id,
+               ST_SetSRID(ST_MakePoint(t.lng, t.lat), 4326) as geom
+        FROM unnest(p_lngs, p_lats, p_road_osm_ids) WITH ORDINALITY AS t(lng, lat, road_osm_id, ord)
+    )
+    SELECT
+        p.ord,
+        (
+            SELECT MIN(ST_Distance(r.geometry::geography, p.geom::geography))
+            FROM osm_roads_main r
+            WHERE r.osm_id = p.road_osm_id
+        ),
+        n.osm_id,
+        n.distance_m
+    FROM places p
+    LEFT JOIN LATERAL (
+        SELECT c.osm_id, ST_Distance(c.geometry::geography, p.geom::geography) as distance_m
+        FROM (
+            SELECT osm_id, geometry
+            FROM osm_roads_main
+            ORDER BY geometry <-> p.geom
+            LIMIT 5
+        ) c
+        ORDER BY distance_m
+        LIMIT 1
+    ) n ON true
+    ORDER BY p.ord;
+$$ LANGUAGE sql STABLE;
+
+-- Measure up to p_limit stored businesses that have no distances yet
+-- (rows saved before this stage existed). Parallel callers take disjoint batches.
+CREATE OR REPLACE FUNCTION backfill_business_road_distances(p_limit INTEGER)
+RETURNS INTEGER AS $$
+    WITH batch AS (
+        SELECT place_id, lng, lat, road_osm_id
+        FROM businesses
+        WHERE nearest_road_distance IS NULL AND lat IS NOT NULL AND lng IS NOT NULL
+        ORDER BY place_id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ),
+    arrays AS (
+        SELECT array_agg(place_id ORDER BY place_id) as place_ids,
+               array_agg(lng ORDER BY place_id) as lngs,
+               array_agg(lat ORDER BY place_id) as lats,
+               array_agg(road_osm_id ORDER BY place_id) as road_osm_ids
+        FROM batch
+    ),
+    measured AS (
+        SELECT a.place_ids[d.ord] as place_id, d.distance_to_road,
+               d.nearest_road_osm_id, d.nearest_road_distance
+        FROM arrays a, business_road_distances(a.lngs, a.lats, a.road_osm_ids) d
+    ),
+    updated AS (
+        UPDATE businesses b
+        SET distance_to_road = m.distance_to_road,
+            nearest_road_osm_id = m.nearest_road_osm_id,
+            nearest_road_distance = m.nearest_road_distance
+        FROM measured m
+        WHERE b.place_id = m.place_id
+        RETURNING m.nearest_road_distance
+    )
+    -- Rows still without a distance (no roads loaded at all) don't count as progress
+    SELECT COUNT(nearest_road_distance)::integer FROM updated;
+$$ LANGUAGE sql;
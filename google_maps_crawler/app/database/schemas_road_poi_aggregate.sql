@@ -0,0 +1,128 @@
+-- Precomputed per-road OSM POI aggregates (see app/database/road_poi_aggregate.py)
+-- Replaces the osm_roads_main x osm_businesses GROUP BY that road listings
+-- used to run per request. Only roads with at least one POI get a row.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS road_poi_aggregate (
+    road_osm_id BIGINT PRIMARY KEY,
+    road_name TEXT,
+    state_code VARCHAR(2),
+    county_fips VARCHAR(10),
+    poi_count INTEGER NOT NULL,
+    poi_with_phone INTEGER NOT NULL,
+    poi_with_website INTEGER NOT NULL,
+    poi_with_hours INTEGER NOT NULL,
+    brand_count INTEGER NOT NULL,
+    top_brands TEXT, -- up to 10 most frequent brands, most frequent first
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Listing order is poi_count DESC, road_name; INCLUDE makes the listings index-only
+CREATE INDEX IF NOT EXISTS idx_road_poi_aggregate_rank
+    ON road_poi_aggregate (poi_count DESC, road_name)
+    INCLUDE (road_osm_id, state_code, county_fips, poi_with_phone, poi_with_website, poi_with_hours, brand_count);
+CREATE INDEX IF NOT EXISTS idx_road_poi_aggregate_state
+    ON road_poi_aggregate (state_code, poi_count DESC, road_name)
+    INCLUDE (road_osm_id, county_fips, poi_with_phone, poi_with_website, poi_with_hours, brand_count);
+CREATE INDEX IF NOT EXISTS idx_road_poi_aggregate_county
+    ON road_poi_aggregate (state_code, county_fips, poi_count DESC, road_name)
+    INCLUDE (road_osm_id, poi_with_phone, poi_with_website, poi_with_hours, brand_count);
+CREATE INDEX IF NOT EXISTS idx_road_poi_aggregate_name_trgm
+    ON road_poi_aggregate USING GIN (road_name gin_trgm_ops);
+
+-- Recompute the given roads; roads left without POIs lose their row
+CREATE OR REPLACE FUNCTION refresh_road_poi_aggregate_roads(p_road_ids BIGINT[])
+RETURNS INTEGER AS $$
+DECLARE
+    refreshed INTEGER;
+BEGIN
+    DELETE FROM road_poi_aggregate WHERE road_osm_id = ANY(p_road_ids);
+
+    INSERT INTO road_poi_aggregate (
+        road_osm_id, road_name, state_code, county_fips,
+        poi_count, poi_with_phone, poi_with_website, poi_with_hours,
+        brand_count, top_brands, updated_at
+    )
+    WITH pois AS (
+        SELECT nearest_road_id, brand, phone, website, opening_hours
+        FROM osm_businesses
+        WHERE nearest_road_id = ANY(p_road_ids)
+    ),
+    counts AS (
+        SELECT
+            nearest_road_id,
+            COUNT(*) as poi_count,
+            COUNT(phone) as poi_with_phone,
+            COUNT(website) as poi_with_website,
+            COUNT(opening_hours) as poi_with_hours
+        FROM pois
+        GROUP BY nearest_road_id
+    ),
+    brands AS (
+        SELECT
+            nearest_road_id,
+            brand,
+            ROW_NUMBER() OVER (PARTITION BY nearest_road_id ORDER BY COUNT(*) DESC, brand) as brand_rank
+        FROM pois
+        WHERE brand IS NOT NULL AND brand != ''
+        GROUP BY nearest_road_id, brand
+    ),
+    brand_stats AS (
+        SELECT
+            nearest_road_id,
+            COUNT(*) as brand_count,
+            STRING_AGG(brand, ', ' ORDER BY brand_rank) FILTER (WHERE brand_rank <= 10) as top_brands
+        FROM brands
+        GROUP BY nearest_road_id
+    )
+    SELECT
+        c.nearest_road_id,
+        r.name,
+        r.state_code,
+        r.county_fips,
+        c.poi_count,
+        c.poi_with_phone,
+        c.poi_with_website,
+        c.poi_with_hours,
+        COALESCE(bs.brand_count, 0),
+        bs.top_brands,
+        CURRENT_TIMESTAMP
+    FROM counts c
+    LEFT JOIN brand_stats bs ON bs.nearest_road_id = c.nearest_road_id
+    CROSS JOIN LATERAL (
+        SELECT name, state_code, county_fips
+        FROM osm_roads_main
+        WHERE osm_id = c.nearest_road_id
+        LIMIT 1
+    ) r
+    -- a concurrent refresh of the same road may have inserted it already
+    ON CONFLICT (road_osm_id) DO UPDATE SET
+        road_name = EXCLUDED.road_name,
+        state_code = EXCLUDED.state_code,
+        county_fips = EXCLUDED.county_fips,
+        poi_count = EXCLUDED.poi_count,
+        poi_with_phone = EXCLUDED.poi_with_phone,
+        poi_with_website = EXCLUDED.poi_with_website,
+        poi_with_hours = EXCLUDED.poi_with_hours,
+        brand_count = EXCLUDED.brand_count,
+        top_brands = EXCLUDED.top_brands,
+        updated_at = EXCLUDED.updated_at;
+
+    GET DIAGNOSTICS refreshed = ROW_COUNT;
+    RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute every road of a state (run after a POI import / road mapping):
+-- the roads it already has rows for plus every road its POIs are mapped to
+CREATE OR REPLACE FUNCTION refresh_road_poi_aggregate(p_state_code TEXT)
+RETURNS INTEGER AS $$
+BEGIN
+    RETURN refresh_road_poi_aggregate_roads(ARRAY(
+        SELECT road_osm_id FROM road_poi_aggregate WHERE state_code = p_state_code
+        UNION
+        SELECT nearest_road_id FROM osm_businesses
+        WHERE state_code = p_state_code AND nearest_road_id IS NOT NULL
+    ));
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,285 @@
+-- Incrementally maintained road statistics (see app/database/road_stats.py)
+-- city_roads_simple, osm_road_stats and osm_road_stats_by_state used to be
+-- materialized views that could only be rebuilt for the whole country.
+-- Triggers now record which (state, county) partitions an import touched, and
+-- refresh_road_stats_partition() recomputes just those, replacing their rows in
+-- one transaction - readers keep seeing the old rows until it commits.
+
+-- One-time migration from the materialized views (keeps city_roads_simple's rows)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_matviews WHERE matviewname = 'osm_road_stats') THEN
+        DROP MATERIALIZED VIEW osm_road_stats CASCADE;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_matviews WHERE matviewname = 'osm_road_stats_by_state') THEN
+        DROP MATERIALIZED VIEW osm_road_stats_by_state CASCADE;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_matviews WHERE matviewname = 'city_roads_simple') THEN
+        CREATE TABLE city_roads_simple_new AS SELECT * FROM city_roads_simple;
+        DROP MATERIALIZED VIEW city_roads_simple CASCADE;
+        ALTER TABLE city_roads_simple_new RENAME TO city_roads_simple;
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS city_roads_simple (
+    osm_id BIGINT,
+    road_name TEXT,
+    highway TEXT,
+    ref TEXT,
+    city_name TEXT,
+    state_code VARCHAR(2),
+    county_fips VARCHAR(10)
+);
+
+CREATE INDEX IF NOT EXISTS idx_city_roads_simple_city ON city_roads_simple(city_name, state_code);
+CREATE INDEX IF NOT EXISTS idx_city_roads_simple_name ON city_roads_simple(road_name);
+CREATE INDEX IF NOT EXISTS idx_city_roads_simple_state ON city_roads_simple(state_code);
+CREATE INDEX IF NOT EXISTS idx_city_roads_simple_osm_id ON city_roads_simple(osm_id);
+-- Keyset pagination for /api/roads/by-city
+CREATE INDEX IF NOT EXISTS idx_city_roads_simple_city_keyset ON city_roads_simple(state_code, city_name, road_name, osm_id);
+-- Partition replacement
+CREATE INDEX IF NOT EXISTS idx_city_roads_simple_county ON city_roads_simple(state_code, county_fips);
+
+-- Per-county road counts; every statistic is additive across counties, so the
+-- national and per-state views are sums over ~3,000 rows
+CREATE TABLE IF NOT EXISTS road_stats_county (
+    state_code VARCHAR(2) NOT NULL,
+    county_fips VARCHAR(10) NOT NULL,       -- '' for roads without a county
+    total_segments BIGINT NOT NULL,
+    segments_with_names BIGINT NOT NULL,
+    unique_roads BIGINT NOT NULL,           -- distinct names within the county
+    highway_segments BIGINT NOT NULL,
+    major_road_segments BIGINT NOT NULL,
+    residential_segments BIGINT NOT NULL,
+    service_segments BIGINT NOT NULL,
+    named_length_km DOUBLE PRECISION,       -- total length of named segments
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (state_code, county_fips)
+);
+
+-- Partitions waiting for a refresh; county_fips '*' means the whole state
+CREATE TABLE IF NOT EXISTS road_stats_dirty (
+    state_code VARCHAR(2) NOT NULL,
+    county_fips VARCHAR(10) NOT NULL,
+    marked_at TIMESTAMP NOT NULL DEFAULT clock_timestamp(),
+    PRIMARY KEY (state_code, county_fips)
+);
+
+CREATE OR REPLACE VIEW osm_road_stats AS
+SELECT
+    SUM(total_segments)::bigint as total_segments,
+    SUM(segments_with_names)::bigint as segments_with_names,
+    SUM(unique_roads)::bigint as unique_roads_with_names,
+    SUM(highway_segments)::bigint as highway_segments,
+    SUM(major_road_segments)::bigint as major_road_segments,
+    SUM(residential_segments)::bigint as residential_segments,
+    SUM(service_segments)::bigint as service_segments,
+    ROUND((SUM(named_length_km) / NULLIF(SUM(segments_with_names), 0))::numeric, 2) as avg_road_length_km,
+    MAX(refreshed_at) as last_updated
+FROM road_stats_county;
+
+CREATE OR REPLACE VIEW osm_road_stats_by_state AS
+SELECT
+    state_code,
+    SUM(total_segments)::bigint as total_segments,
+    COUNT(*) FILTER (WHERE county_fips <> '') as counties,
+    SUM(segments_with_names)::bigint as segments_with_names,
+    SUM(unique_roads)::bigint as unique_roads
+FROM road_stats_county
+GROUP BY state_code;
+
+-- Queue a partition (e.g. from an import script that bypassed the triggers)
+CREATE OR REPLACE FUNCTION mark_road_stats_dirty(p_state_code TEXT, p_county_fips TEXT DEFAULT '*')
+RETURNS void AS $$
+    INSERT INTO road_stats_dirty (state_code, county_fips, marked_at)
+    VALUES (p_state_code, COALESCE(p_county_fips, ''), clock_timestamp())
+    ON CONFLICT (state_code, county_fips) DO UPDATE SET marked_at = EXCLUDED.marked_at;
+$$ LANGUAGE sql;
+
+-- Statement-level, so a bulk import marks each touched county once. Updating
+-- the dirty row (rather than DO NOTHING) locks it until the import commits,
+-- which makes a concurrent refresh wait for the import's rows.
+CREATE OR REPLACE FUNCTION mark_road_stats_dirty_from_roads()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO road_stats_dirty (state_code, county_fips, marked_at)
+        SELECT DISTINCT state_code, COALESCE(county_fips, ''), clock_timestamp()
+        FROM new_rows WHERE state_code IS NOT NULL
+        ON CONFLICT (state_code, county_fips) DO UPDATE SET marked_at = EXCLUDED.marked_at;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO road_stats_dirty (state_code, county_fips, marked_at)
+        SELECT DISTINCT state_code, COALESCE(county_fips, ''), clock_timestamp()
+        FROM old_rows WHERE state_code IS NOT NULL
+        ON CONFLICT (state_code, county_fips) DO UPDATE SET marked_at = EXCLUDED.marked_at;
+    ELSE
+        -- Only columns the statistics read; backfills like road_name_normalized don't count
+        INSERT INTO road_stats_dirty (state_code, county_fips, marked_at)
+        SELECT DISTINCT p.state_code, COALESCE(p.county_fips, ''), clock_timestamp()
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        CROSS JOIN LATERAL (VALUES (n.state_code, n.county_fips), (o.state_code, o.county_fips)) p(state_code, county_fips)
+        WHERE p.state_code IS NOT NULL
+          AND (n.name, n.highway, n.ref, n.state_code, n.county_fips, ST_AsEWKB(n.geometry))
+              IS DISTINCT FROM (o.name, o.highway, o.ref, o.state_code, o.county_fips, ST_AsEWKB(o.geometry))
+        ON CONFLICT (state_code, county_fips) DO UPDATE SET marked_at = EXCLUDED.marked_at;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- road_city_mapping is rebuilt per state; city_roads_simple follows it
+CREATE OR REPLACE FUNCTION mark_road_stats_dirty_from_mapping()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO road_stats_dirty (state_code, county_fips, marked_at)
+        SELECT DISTINCT state_code, '*', clock_timestamp() FROM old_rows WHERE state_code IS NOT NULL
+        ON CONFLICT (state_code, county_fips) DO UPDATE SET marked_at = EXCLUDED.marked_at;
+    ELSE
+        INSERT INTO road_stats_dirty (state_code, county_fips, marked_at)
+        SELECT DISTINCT state_code, '*', clock_timestamp() FROM new_rows WHERE state_code IS NOT NULL
+        ON CONFLICT (state_code, county_fips) DO UPDATE SET marked_at = EXCLUDED.marked_at;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS road_stats_roads_insert ON osm_roads_main;
+DROP TRIGGER IF EXISTS road_stats_roads_update ON osm_roads_main;
+DROP TRIGGER IF EXISTS road_stats_roads_delete ON osm_roads_main;
+CREATE TRIGGER road_stats_roads_insert AFTER INSERT ON osm_roads_main
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_road_stats_dirty_from_roads();
+CREATE TRIGGER road_stats_roads_update AFTER UPDATE ON osm_roads_main
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_road_stats_dirty_from_roads();
+CREATE TRIGGER road_stats_roads_delete AFTER DELETE ON osm_roads_main
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_road_stats_dirty_from_roads();
+
+DROP TRIGGER IF EXISTS road_stats_mapping_insert ON road_city_mapping;
+DROP TRIGGER IF EXISTS road_stats_mapping_update ON road_city_mapping;
+DROP TRIGGER IF EXISTS road_stats_mapping_delete ON road_city_mapping;
+CREATE TRIGGER road_stats_mapping_insert AFTER INSERT ON road_city_mapping
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_road_stats_dirty_from_mapping();
+CREATE TRIGGER road_stats_mapping_update AFTER UPDATE ON road_city_mapping
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_road_stats_dirty_from_mapping();
+CREATE TRIGGER road_stats_mapping_delete AFTER DELETE ON road_city_mapping
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_road_stats_dirty_from_mapping();
+
+-- Recompute one partition ('*' = whole state) and take it off the queue.
+-- Returns the number of city_roads_simple rows written.
+CREATE OR REPLACE FUNCTION refresh_road_stats_partition(p_state_code TEXT, p_county_fips TEXT)
+RETURNS INTEGER AS $$
+DECLARE
+    whole_state BOOLEAN := p_county_fips = '*';
+    city_rows INTEGER;
+BEGIN
+    -- Claim first: an import still writing this partition holds the dirty
+    -- row's lock, so this waits for it and then sees its rows
+    DELETE FROM road_stats_dirty
+    WHERE state_code = p_state_code AND (whole_state OR county_fips = p_county_fips);
+
+    DELETE FROM road_stats_county
+    WHERE state_code = p_state_code AND (whole_state OR county_fips = p_county_fips);
+
+    INSERT INTO road_stats_county (
+        state_code, county_fips, total_segments, segments_with_names, unique_roads,
+        highway_segments, major_road_segments, residential_segments, service_segments,
+        named_length_km, refreshed_at
+    )
+    SELECT
+        state_code,
+        COALESCE(county_fips, ''),
+        COUNT(*),
+        COUNT(name),
+        COUNT(DISTINCT name),
+        COUNT(*) FILTER (WHERE highway IN ('motorway', 'trunk')),
+        COUNT(*) FILTER (WHERE highway IN ('primary', 'secondary', 'tertiary')),
+        COUNT(*) FILTER (WHERE highway = 'residential'),
+        COUNT(*) FILTER (WHERE highway = 'service'),
+        SUM(ST_Length(geography(geometry)) / 1000.0) FILTER (WHERE name IS NOT NULL),
+        CURRENT_TIMESTAMP
+    FROM osm_roads_main
+    WHERE state_code = p_state_code
+      AND (whole_state OR county_fips = p_county_fips OR (p_county_fips = '' AND county_fips IS NULL))
+    GROUP BY state_code, COALESCE(county_fips, '');
+
+    DELETE FROM city_roads_simple
+    WHERE state_code = p_state_code
+      AND (whole_state OR county_fips = p_county_fips OR (p_county_fips = '' AND county_fips IS NULL));
+
+    INSERT INTO city_roads_simple (osm_id, road_name, highway, ref, city_name, state_code, county_fips)
+    SELECT
+        r.osm_id,
+        r.name,
+        r.highway,
+        r.ref,
+        rcm.city_name,
+        rcm.state_code,
+        r.county_fips
+    FROM road_city_mapping rcm
+    JOIN osm_roads_main r ON r.id = rcm.road_id
+    WHERE rcm.state_code = p_state_code
+      AND r.name IS NOT NULL
+      AND (whole_state OR r.county_fips = p_county_fips OR (p_county_fips = '' AND r.county_fips IS NULL));
+
+    GET DIAGNOSTICS city_rows = ROW_COUNT;
+    RETURN city_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions to refresh: a queued whole state covers its queued counties
+CREATE OR REPLACE FUNCTION pending_road_stats_partitions()
+RETURNS TABLE (state_code VARCHAR, county_fips VARCHAR) AS $$
+    SELECT d.state_code, d.county_fips
+    FROM road_stats_dirty d
+    WHERE d.county_fips = '*'
+       OR NOT EXISTS (
+           SELECT 1 FROM road_stats_dirty s
+           WHERE s.state_code = d.state_code AND s.county_fips = '*'
+       )
+    ORDER BY d.state_code, d.county_fips;
+$$ LANGUAGE sql STABLE;
+
+-- Refresh everything queued in one transaction (for psql-driven scripts;
+-- python -m app.database.road_stats commits per partition instead)
+-- The old scripts/create_stats_materialized_view.sql version returned void,
+-- and CREATE OR REPLACE can't change a return type
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_proc
+               WHERE proname = 'refresh_road_stats' AND pronargs = 0
+                 AND prorettype = 'void'::regtype) THEN
+        DROP FUNCTION refresh_road_stats();
+    END IF;
+END
+$$;
+CREATE OR REPLACE FUNCTION refresh_road_stats()
+RETURNS INTEGER AS $$
+DECLARE
+    v_partition RECORD;
+    refreshed INTEGER := 0;
+BEGIN
+    FOR v_partition IN SELECT * FROM pending_road_stats_partitions() LOOP
+        PERFORM refresh_road_stats_partition(v_partition.state_code, v_partition.county_fips);
+        refreshed := refreshed + 1;
+    END LOOP;
+    RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- First install: queue every state so the summaries get built
+INSERT INTO road_stats_dirty (state_code, county_fips)
+SELECT DISTINCT state_code, '*'
+FROM osm_roads_main
+WHERE state_code IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM road_stats_county)
+  AND NOT EXISTS (SELECT 1 FROM road_stats_dirty)
+ON CONFLICT DO NOTHING;
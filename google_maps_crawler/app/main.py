@@ -1,13 +1,20 @@
 """
 FastAPI application for Google Maps crawler
 """
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
+import asyncio
 import logging
 from .database.postgres_client import PostgresClient
-from .crawler.google_maps import GoogleMapsClient
+from .database import async_db, road_distance, road_poi_aggregate
+from .crawler.google_maps import PlacesAPIError, get_client
+from .crawler.rate_limiter import QuotaExceeded
+from .crawler import crawl_service, job_queue, location_cache, places_cache, road_search_index
+from .cache import cached, response_cache, OSM, CRAWL
+from . import passwords
 from .crawler.road_sampler import RoadSampler
 from .models import CrawlStats
 from .config import BUSINESS_TYPES, CRAWLER_DELAY_SECONDS
@@ -17,6 +24,13 @@ from .api.businesses_api import router as businesses_router
 from .api.crawl_sessions_api import router as sessions_router
 from .api.roads_api import router as roads_router
 from .api.auth_api import router as auth_router
+from .api.crawl_queue_api import router as crawl_queue_router
+from .api.cache_api import router as cache_router
+from .api.parquet_export_api import router as parquet_export_router
+from .api.smart_crawl_api import router as smart_crawl_router
+from .api.roads_simple_stats import router as roads_stats_router
+from .api.roads_with_poi_stats import router as roads_poi_stats_router
+from .api.pagination import decode_cursor, encode_cursor
 import time
 import json
 
@@ -37,6 +51,12 @@ app.include_router(analyze_router)
 app.include_router(businesses_router)
 app.include_router(sessions_router)
 app.include_router(roads_router)
+app.include_router(crawl_queue_router)
+app.include_router(cache_router)
+app.include_router(parquet_export_router)
+app.include_router(smart_crawl_router)
+app.include_router(roads_stats_router)
+app.include_router(roads_poi_stats_router)
 
 # Configure CORS
 app.add_middleware(
@@ -49,7 +69,7 @@ app.add_middleware(
 
 # Initialize clients
 db = PostgresClient()
-gmaps = GoogleMapsClient()
+gmaps = get_client()
 sampler = RoadSampler()
 
 # Initialize API tracking table on startup
@@ -77,6 +97,87 @@ async def startup_event():
         logger.info("API tracking table initialized")
     except Exception as e:
         logger.error(f"Failed to initialize API tracking: {e}")
+    
+    try:
+        await async_db.init_pool()
+    except Exception as e:
+        logger.error(f"Failed to create async database pool: {e}")
+    
+    try:
+        await job_queue.ensure_schema()
+        logger.info("Crawl queue table initialized")
+    except Exception as e:
+        logger.error(f"Failed to initialize crawl queue: {e}")
+    
+    try:
+        await road_poi_aggregate.ensure_schema()
+        logger.info("Road POI aggregate table initialized")
+    except Exception as e:
+        logger.error(f"Failed to initialize road POI aggregates: {e}")
+    
+    try:
+        await road_distance.ensure_schema()
+        logger.info("Business road distances initialized")
+    except Exception as e:
+        logger.error(f"Failed to initialize business road distances: {e}")
+
+    try:
+        await places_cache.ensure_schema()
+        logger.info("Places response cache initialized")
+    except Exception as e:
+        logger.error(f"Failed to initialize Places response cache: {e}")
+    
+    try:
+        await location_cache.ensure_schema()
+        logger.info("Location score cache table initialized")
+    except Exception as e:
+        logger.error(f"Failed to initialize location score cache: {e}")
+    
+    # Built in the background; /roads/search falls back to SQL until it's ready
+    road_search_index.schedule_refresh()
+    
+    # Carry today's Places API usage over restarts so the daily limit holds
+    try:
+        used_today = await async_db.fetch_val(
+            "SELECT COALESCE(SUM(request_count), 0) FROM api_calls WHERE created_at >= CURRENT_DATE"
+        )
+        gmaps.daily_quota.seed(int((used_today or 0) * gmaps.share))
+    except Exception as e:
+        logger.error(f"Failed to load today's API usage: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled database connections on shutdown"""
+    from .database.postgres_client import close_pool
+    await gmaps.aclose()
+    await response_cache.close()
+    passwords.shutdown()
+    await async_db.close_pool()
+    close_pool()
+    logger.info("Database pool closed")
+
+@app.get("/health")
+async def health():
+    """Health check with database pool statistics"""
+    from .database.postgres_client import get_pool_stats
+    try:
+        await async_db.fetch_val("SELECT 1")
+        db_status = "ok"
+    except Exception as e:
+        logger.error(f"Health check failed: {e}")
+        db_status = "error"
+
+    return {
+        "status": "ok" if db_status == "ok" else "degraded",
+        "database": db_status,
+        "pool": get_pool_stats(),
+        "async_pool": async_db.get_pool_stats(),
+        "google_maps": gmaps.get_usage(),
+        "cache": response_cache.stats(),
+        "password_hashing": passwords.metrics.stats(),
+        "location_cache": location_cache.location_cache.info(),
+        "road_search_index": road_search_index.get_index().info() if road_search_index.get_index() else None
+    }
 
 @app.get("/")
 async def root():
@@ -85,11 +186,13 @@ async def root():
         "name": "Google Maps Business Crawler",
         "status": "active",
         "endpoints": {
+            "health": "/health",
             "stats": "/stats",
             "roads_by_city": "/api/roads/by-city",
             "target_cities": "/api/roads/target-cities",
             "city_stats": "/api/roads/city-stats",
             "crawl": "/crawl/start",
+            "crawl_queue": "/api/crawl-queue/stats",
             "roads": "/roads/unprocessed"
         }
     }
@@ -97,27 +200,24 @@ async def root():
 @app.get("/stats", response_model=CrawlStats)
 async def get_stats():
     """Get crawling statistics - fast version with OSM data counts"""
-    # Query OSM data stats
-    from .database.postgres_client import execute_query
-    
-    # Get stats from cache table (INSTANT!)
-    stats_result = execute_query("""
-        SELECT 
-            total_segments as total_roads,
-            unique_roads_with_names as roads_with_names,
-            last_updated
-        FROM osm_stats_cache
-        WHERE id = 1
-    """, fetch_one=True)
+    # Get stats from cache table (INSTANT!) and dynamic crawl stats concurrently
+    stats_result, crawl_stats = await asyncio.gather(
+        async_db.fetch_one("""
+            SELECT 
+                total_segments as total_roads,
+                unique_roads_with_names as roads_with_names,
+                last_updated
+            FROM osm_stats_cache
+            WHERE id = 1
+        """),
+        run_in_threadpool(db.get_crawl_stats)
+    )
     
     result = stats_result if stats_result else {
         'total_roads': 0,
         'roads_with_names': 0
     }
     
-    # Get dynamic crawl stats
-    crawl_stats = db.get_crawl_stats()
-    
     stats = {
         'total_roads': result['total_roads'] if result else 0,
         'roads_with_names': result['roads_with_names'] if result else 0,
@@ -135,26 +235,23 @@ async def get_live_stats():
     return await get_stats()
 
 @app.get("/api/usage")
+@cached("/api/usage", ttl=60, tags=(CRAWL,))
 async def get_api_usage():
     """Get API usage statistics from crawl sessions"""
-    from .database.postgres_client import execute_query
-    
     try:
+        # Independent aggregates - run them concurrently
         # Get total crawls (each crawl uses API calls)
-        total_crawls = execute_query("""
+        total_crawls_query = async_db.fetch_one("""
             SELECT 
                 COUNT(*) as total_crawls,
                 SUM(businesses_found) as total_results,
                 COUNT(DISTINCT DATE(started_at)) as days_active
             FROM crawl_sessions
             WHERE status = 'completed'
-        """, fetch_one=True)
-        
-        # Estimate API requests (each crawl with 60 results = 3 requests)
-        estimated_requests = (total_crawls['total_crawls'] or 0) * 3
+        """)
         
         # Get crawls by keyword
-        by_keyword = execute_query("""
+        by_keyword_query = async_db.fetch("""
             SELECT 
                 keyword,
                 COUNT(*) as crawl_count,
@@ -168,17 +265,17 @@ async def get_api_usage():
         """)
         
         # Get today's usage
-        today_usage = execute_query("""
+        today_usage_query = async_db.fetch_one("""
             SELECT 
                 COUNT(*) as crawl_count,
                 SUM(businesses_found) as total_results
             FROM crawl_sessions
             WHERE DATE(started_at) = CURRENT_DATE
             AND status = 'completed'
-        """, fetch_one=True)
+        """)
         
         # Get daily usage for last 7 days
-        daily_usage = execute_query("""
+        daily_usage_query = async_db.fetch("""
             SELECT 
                 DATE(started_at) as date,
                 COUNT(*) as crawl_count,
@@ -191,7 +288,7 @@ async def get_api_usage():
         """)
         
         # Get recent crawls
-        recent_crawls = execute_query("""
+        recent_crawls_query = async_db.fetch("""
             SELECT 
                 road_name,
                 keyword,
@@ -204,6 +301,14 @@ async def get_api_usage():
             LIMIT 10
         """)
         
+        total_crawls, by_keyword, today_usage, daily_usage, recent_crawls = await asyncio.gather(
+            total_crawls_query, by_keyword_query, today_usage_query,
+            daily_usage_query, recent_crawls_query
+        )
+        
+        # Estimate API requests (each crawl with 60 results = 3 requests)
+        estimated_requests = (total_crawls['total_crawls'] or 0) * 3
+        
         # Calculate estimated API calls
         today_api_calls = (today_usage['crawl_count'] or 0) * 3
         
@@ -254,7 +359,7 @@ async def get_unprocessed_roads(
     limit: int = 50
 ):
     """Get list of unprocessed roads for crawling"""
-    roads = db.get_unprocessed_roads(state_code, county_fips, limit)
+    roads = await run_in_threadpool(db.get_unprocessed_roads, state_code, county_fips, limit)
     return {"roads": roads, "count": len(roads)}
 
 @app.get("/crawl/status")
@@ -264,7 +369,7 @@ async def get_crawl_status(
     keyword: Optional[str] = None
 ):
     """Get crawl status for roads"""
-    statuses = db.get_crawl_status(state_code, county_fips, keyword)
+    statuses = await run_in_threadpool(db.get_crawl_status, state_code, county_fips, keyword)
     
     # Convert to dict keyed by road_linearid for easy lookup
     status_dict = {}
@@ -279,7 +384,7 @@ async def get_crawl_status(
 @app.get("/counties/{state_code}")
 async def get_counties_by_state(state_code: str):
     """Get all counties for a specific state"""
-    counties = db.get_counties_by_state(state_code)
+    counties = await run_in_threadpool(db.get_counties_by_state, state_code)
     return {
         "state_code": state_code,
         "count": len(counties),
@@ -287,9 +392,10 @@ async def get_counties_by_state(state_code: str):
     }
 
 @app.get("/states/summary")
+@cached("/states/summary", ttl=3600)
 async def get_states_summary():
     """Get summary of all states with road counts"""
-    summary = db.get_states_summary()
+    summary = await run_in_threadpool(db.get_states_summary)
     return summary
 
 @app.get("/roads/search")
@@ -305,6 +411,18 @@ async def search_roads(
     if not q or len(q) < 2:
         raise HTTPException(status_code=400, detail="Search query must be at least 2 characters")
     
+    index = road_search_index.get_index()
+    if index is not None:
+        results = index.search(q, state_code, county_fips, limit)
+        return {
+            "query": q,
+            "normalized_search": True,
+            "count": len(results),
+            "results": results,
+            "note": "Ranked by exact, prefix, word and typo-tolerant matches on normalized names (e.g., '10th Avenue' also finds '10th Ave', 'W 10th Ave')"
+        }
+    
+    conn = None
     try:
         conn = get_connection()
         results = search_roads_enhanced(conn, q, state_code, county_fips, limit)
@@ -329,312 +447,79 @@ async def crawl_single_road(
     keyword: str = "all"
 ):
     """Crawl a single road - synchronous with real-time updates"""
-    from .database.postgres_client import execute_query
-    import uuid
-    
     # Get road details
-    road_data = execute_query(
-        """
-        SELECT 
-            r.osm_id,
-            r.name,
-            r.highway,
-            r.ref,
-            r.county_fips,
-            r.state_code,
-            ST_X(ST_Centroid(r.geometry)) as center_lon,
-            ST_Y(ST_Centroid(r.geometry)) as center_lat,
-            rcm.city_name
-        FROM osm_roads_main r
-        LEFT JOIN road_city_mapping rcm ON r.id = rcm.road_id
-        WHERE r.osm_id = %s
-        LIMIT 1
-        """, 
-        (int(road_id),), 
-        fetch_one=True
-    )
+    road_data = await crawl_service.get_road(int(road_id))
     
     if not road_data:
         raise HTTPException(status_code=404, detail="Road not found")
     
-    # Create crawl session
-    session_id = str(uuid.uuid4())
-    execute_query(
-        """
-        INSERT INTO crawl_sessions (
-            id, road_osm_id, road_name, city_name, state_code, keyword, status
-        ) VALUES (%s, %s, %s, %s, %s, %s, 'crawling')
-        """,
-        (session_id, road_data['osm_id'], road_data['name'], 
-         road_data.get('city_name'), road_data['state_code'], keyword)
-    )
-    
     try:
-        # Perform crawl synchronously
-        businesses = await crawl_road_now(road_data, keyword, session_id)
-        
-        # Ensure businesses is not None
-        if businesses is None:
-            businesses = []
-        
-        # Update session as completed
-        execute_query(
-            """
-            UPDATE crawl_sessions 
-            SET status = 'completed', 
-                businesses_found = %s,
-                completed_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-            """,
-            (len(businesses), session_id)
-        )
-        
-        return {
-            "session_id": session_id,
-            "status": "completed",
-            "businesses_found": len(businesses),
-            "road_name": road_data.get('name'),
-            "message": f"Successfully crawled {len(businesses)} businesses"
-        }
-        
+        # Perform crawl synchronously (session is created and closed by the service)
+        result = await crawl_service.crawl_road(gmaps, road_data, keyword)
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except PlacesAPIError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
-        # Update session as failed
-        execute_query(
-            """
-            UPDATE crawl_sessions 
-            SET status = 'failed', 
-                error_message = %s,
-                completed_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-            """,
-            (str(e), session_id)
-        )
-        
         raise HTTPException(status_code=500, detail=str(e))
-
-async def crawl_road_now(road_data: dict, keyword: str, session_id: str):
-    """Crawl businesses along a road using new Text Search API"""
-    from .database.postgres_client import execute_query
-    
-    road_id = road_data['osm_id']
-    road_name = road_data.get('name', '')
-    state_code = road_data.get('state_code', '')
-    county_fips = road_data.get('county_fips', '')
-    center_lat = road_data.get('center_lat')
-    center_lon = road_data.get('center_lon')
-    
-    logger.info(f"Crawling road {road_name} for keyword: {keyword}")
     
-    try:
-        # Get city name for better search
-        city_result = execute_query(
-            """
-            SELECT DISTINCT city_name 
-            FROM road_city_mapping 
-            WHERE road_id = (SELECT id FROM osm_roads_main WHERE osm_id = %s LIMIT 1)
-            LIMIT 1
-            """,
-            (road_id,),
-            fetch_one=True
-        )
-        city_name = city_result['city_name'] if city_result else ''
-        
-        # Use new Text Search API - much more efficient!
-        # Search directly for businesses on this road
-        businesses = []
-        
-        # If we have keyword, search for specific type
-        if keyword and keyword != 'all':
-            query = f"{keyword} on {road_name}, {city_name}, {state_code}"
-        else:
-            query = f"businesses on {road_name}, {city_name}, {state_code}"
-        
-        logger.info(f"Text search query: {query}")
-        
-        # Call new API method
-        results = gmaps.search_businesses_on_road(
-            road_name=road_name,
-            city_name=city_name,
-            state_code=state_code,
-            center_lat=center_lat,
-            center_lng=center_lon,
-            business_type=keyword if keyword != 'all' else None
-        )
-        
-        # Check if results is None or empty
-        if results is None:
-            logger.warning(f"No results returned for {road_name}")
-            results = []
-        
-        # Process results
-        for place_data in results:
-            business = gmaps.parse_business(place_data, road_id, road_name)
-            # No need to filter by keyword anymore since API already filtered
-            businesses.append(business)
-        
-        # Handle case where businesses might be None
-        if businesses is None:
-            businesses = []
-            
-        total_businesses = len(businesses)
-        
-        # Save businesses to database with session_id
-        if businesses:
-            saved_businesses = []
-            for business in businesses:
-                # Save to businesses table with session_id
-                result = execute_query(
-                    """
-                    INSERT INTO businesses (
-                        place_id, name, formatted_address, lat, lng,
-                        types, rating, user_ratings_total, price_level,
-                        phone_number, website, opening_hours,
-                        road_osm_id, road_name, distance_to_road,
-                        crawled_at, crawl_session_id, city
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb,
-                        %s, %s, %s, %s, %s, %s
-                    )
-                    ON CONFLICT (place_id) DO UPDATE SET
-                        crawl_session_id = EXCLUDED.crawl_session_id,
-                        crawled_at = EXCLUDED.crawled_at
-                    RETURNING place_id
-                    """,
-                    (
-                        business.place_id, business.name, business.formatted_address,
-                        business.lat, business.lng, business.types, business.rating,
-                        business.user_ratings_total, business.price_level,
-                        business.phone_number, business.website, 
-                        json.dumps(business.opening_hours) if business.opening_hours else None,
-                        business.road_osm_id, business.road_name, business.distance_to_road,
-                        business.crawled_at, session_id, city_name
-                    ),
-                    fetch_one=True
-                )
-                if result:
-                    saved_businesses.append(business)
-            
-            logger.info(f"Saved {len(saved_businesses)} businesses for {road_name}")
-            return saved_businesses
-        else:
-            logger.info(f"No businesses found for {road_name}")
-        
-        return []
-        
-    except Exception as e:
-        logger.error(f"Error crawling road {road_id}: {e}")
-        # Don't call db.update_crawl_status as db might not be initialized
-        raise e
-
-async def crawl_road(road, job_id: str):
-    """Crawl businesses along a single road"""
-    logger.info(f"Starting crawl for road: {road.name or road.osm_id}")
-    
-    # Update job status
-    db.update_crawl_job(job_id, "processing")
-    
-    try:
-        # NEW: Use Text Search API instead of sampling points
-        # Get city info for the road
-        city_result = execute_query(
-            """
-            SELECT DISTINCT city_name, state_code
-            FROM road_city_mapping rcm
-            JOIN osm_roads_main r ON r.id = rcm.road_id 
-            WHERE r.osm_id = %s
-            LIMIT 1
-            """,
-            (road.osm_id,),
-            fetch_one=True
-        )
-        
-        if city_result:
-            # Single API call per road instead of multiple points!
-            places = gmaps.search_businesses_on_road(
-                road_name=road.name,
-                city_name=city_result['city_name'],
-                state_code=city_result['state_code']
-            )
-        
-        all_businesses = []
-        
-        # Search for businesses at each sample point
-        for point in sample_points:
-            for business_type in BUSINESS_TYPES:
-                # Search nearby places
-                places = gmaps.search_nearby_places(
-                    location=point,
-                    place_type=business_type
-                )
-                
-                # Get detailed info for each place
-                for place in places:
-                    if 'place_id' in place:
-                        details = gmaps.get_place_details(place['place_id'])
-                        if details:
-                            business = gmaps.parse_business(details, road.osm_id)
-                            all_businesses.append(business)
-                
-                # Respect rate limits
-                time.sleep(CRAWLER_DELAY_SECONDS)
-        
-        # Save businesses
-        for business in all_businesses:
-            db.save_business(business)
-        
-        # Mark road as processed
-        db.mark_road_processed(road.osm_id, len(all_businesses))
-        
-        # Update job status
-        db.update_crawl_job(job_id, "completed", len(all_businesses))
-        
-        logger.info(f"Completed crawl for road: {road.name}, found {len(all_businesses)} businesses")
-        
-    except Exception as e:
-        logger.error(f"Error crawling road {road.osm_id}: {e}")
-        db.update_crawl_job(job_id, "failed", error=str(e))
+    result["message"] = f"Successfully crawled {result['businesses_found']} businesses"
+    if result["cache_hit"]:
+        result["message"] += " (served from the Text Search cache, no API calls)"
+    return result
 
 @app.post("/crawl/start")
 async def start_crawl(
-    background_tasks: BackgroundTasks,
     state_code: Optional[str] = None,
     county_fips: Optional[str] = None,
+    keyword: str = "all",
+    min_score: int = 0,
     limit: int = 10
 ):
-    """Start crawling unprocessed roads"""
-    # Get unprocessed roads
-    roads = db.get_unprocessed_roads(state_code, county_fips, limit)
-    
-    if not roads:
-        return {"message": "No unprocessed roads found"}
+    """Queue uncrawled roads (highest business potential first) for the crawl workers"""
+    queued = await job_queue.enqueue_from_stats(
+        keyword=keyword,
+        state_code=state_code,
+        county_fips=county_fips,
+        min_score=min_score,
+        limit=limit
+    )
     
-    # Create crawl job
-    job_id = db.create_crawl_job(len(roads))
+    if not queued:
+        return {"message": "No uncrawled roads found", "roads_to_process": 0}
     
-    # Add roads to background tasks
-    for road in roads:
-        background_tasks.add_task(crawl_road, road, job_id)
+    queue = await job_queue.queue_stats()
     
     return {
-        "job_id": job_id,
-        "roads_to_process": len(roads),
-        "message": f"Started crawling {len(roads)} roads"
+        "roads_to_process": queued,
+        "queue": {k: queue[k] for k in ('pending', 'running', 'completed', 'failed', 'skipped')},
+        "active_workers": len(queue['workers']),
+        "message": f"Queued {queued} roads - run `python -m app.crawler.crawl_worker` to process them"
     }
 
 @app.get("/api/roads/by-city")
+@cached("/api/roads/by-city", tags=(OSM, CRAWL))
 async def get_roads_by_city(
     state_code: str,
     city_name: str,
     keyword: Optional[str] = None,
     skip: int = 0,
-    limit: int = 200
+    limit: int = 200,
+    cursor: Optional[str] = None
 ):
-    """Get roads for a specific city"""
+    """Get roads for a specific city (pass next_cursor back as `cursor` to page without OFFSET)"""
     try:
-        from .database.postgres_client import execute_query
-        # Use fast materialized view
-        roads = execute_query(
-            """
+        conditions = ["state_code = %s", "city_name = %s"]
+        params = [state_code, city_name]
+        if cursor:
+            after = decode_cursor(cursor, 'road_name', 'osm_id')
+            conditions.append("(road_name, osm_id) > (%s, %s)")
+            params.extend([after['road_name'], after['osm_id']])
+            skip = 0
+        
+        # Use fast materialized view; one extra row tells us whether there is a next page
+        roads = await async_db.fetch(
+            f"""
             SELECT 
                 osm_id,
                 road_name,
@@ -643,45 +528,52 @@ async def get_roads_by_city(
                 highway,
                 county_fips
             FROM city_roads_simple
-            WHERE state_code = %s 
-            AND city_name = %s
-            ORDER BY road_name
+            WHERE {' AND '.join(conditions)}
+            ORDER BY road_name, osm_id
             LIMIT %s OFFSET %s
             """,
-            (state_code, city_name, limit, skip)
+            params + [limit + 1, skip]
         )
         
-        # Get crawl status if keyword specified
-        if keyword and roads:
-            road_ids = [r['osm_id'] for r in roads]
-            status_results = execute_query(
-                """
-                SELECT road_linearid, status
-                FROM crawl_status
-                WHERE road_linearid = ANY(%s) AND keyword = %s
-                """,
-                (road_ids, keyword)
-            )
-            
-            # Convert to dict for easy lookup
-            status_map = {str(s['road_linearid']): s['status'] for s in status_results}
-            
-            # Add status to roads
-            for road in roads:
-                road['crawl_status'] = status_map.get(str(road['osm_id']), 'not_crawled')
+        next_cursor = None
+        if len(roads) > limit:
+            roads = roads[:limit]
+            next_cursor = encode_cursor(road_name=roads[-1]['road_name'], osm_id=roads[-1]['osm_id'])
         
-        # Add business potential scores
         if roads:
             road_ids = [r['osm_id'] for r in roads]
-            scores = execute_query(
+            
+            # Business potential scores and crawl status are independent lookups
+            lookups = [async_db.fetch(
                 """
                 SELECT osm_id, poi_count, business_potential_score
                 FROM road_business_stats
                 WHERE osm_id = ANY(%s)
                 """,
                 (road_ids,)
-            )
+            )]
+            if keyword:
+                lookups.append(async_db.fetch(
+                    """
+                    SELECT road_linearid, status
+                    FROM crawl_status
+                    WHERE road_linearid = ANY(%s) AND keyword = %s
+                    """,
+                    (road_ids, keyword)
+                ))
+            
+            scores, *status_results = await asyncio.gather(*lookups)
+            
+            # Get crawl status if keyword specified
+            if status_results:
+                # Convert to dict for easy lookup
+                status_map = {str(s['road_linearid']): s['status'] for s in status_results[0]}
+                
+                # Add status to roads
+                for road in roads:
+                    road['crawl_status'] = status_map.get(str(road['osm_id']), 'not_crawled')
             
+            # Add business potential scores
             score_map = {s['osm_id']: s for s in scores}
             for road in roads:
                 score_data = score_map.get(road['osm_id'], {})
@@ -692,8 +584,11 @@ async def get_roads_by_city(
             "state_code": state_code,
             "city_name": city_name,
             "total": len(roads),
+            "next_cursor": next_cursor,
             "roads": roads
         }
+    except HTTPException:
+        raise  # bad cursor -> 400
     except Exception as e:
         logger.error(f"Error getting roads by city: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -701,13 +596,13 @@ async def get_roads_by_city(
 # Target cities endpoint moved to roads_api.py
 
 @app.get("/api/roads/city-stats")
+@cached("/api/roads/city-stats", tags=(OSM, CRAWL))
 async def get_city_stats(state_code: str, city_name: str):
     """Get statistics for a specific city"""
     try:
-        from .database.postgres_client import execute_query
-        
+        # Three independent aggregates - run them concurrently
         # Get road type distribution
-        road_types = execute_query(
+        road_types_query = async_db.fetch(
             """
             SELECT 
                 r.highway,
@@ -724,7 +619,7 @@ async def get_city_stats(state_code: str, city_name: str):
         )
         
         # Get crawl status summary
-        crawl_status = execute_query(
+        crawl_status_query = async_db.fetch(
             """
             SELECT 
                 cs.status,
@@ -739,7 +634,7 @@ async def get_city_stats(state_code: str, city_name: str):
         )
         
         # Get business potential summary
-        potential_summary = execute_query(
+        potential_summary_query = async_db.fetch(
             """
             SELECT 
                 CASE 
@@ -766,6 +661,10 @@ async def get_city_stats(state_code: str, city_name: str):
             (state_code, city_name)
         )
         
+        road_types, crawl_status, potential_summary = await asyncio.gather(
+            road_types_query, crawl_status_query, potential_summary_query
+        )
+        
         return {
             "city_name": city_name,
             "state_code": state_code,
@@ -23,7 +23,9 @@ class Business(BaseModel):
     # Road association
     road_osm_id: int
     road_name: Optional[str]
-    distance_to_road: float
+    distance_to_road: Optional[float] = None  # Meters, filled in by road_distance.measure
+    nearest_road_osm_id: Optional[int] = None
+    nearest_road_distance: Optional[float] = None
     
     # Metadata
     crawled_at: datetime
@@ -0,0 +1,150 @@
+"""
+Password hashing off the event loop
+bcrypt costs 100-300ms of CPU per check; running it inline in an async route
+blocks every other request on the worker. Checks run in a small thread pool
+(bcrypt releases the GIL), the number of checks waiting for it is capped, and
+repeated failures for one username are throttled before any hashing is done.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import bcrypt
+
+from .cache import LRUDict
+from .config import (
+    AUTH_HASH_WORKERS, AUTH_HASH_MAX_PENDING,
+    AUTH_LOGIN_MAX_FAILURES, AUTH_LOGIN_FAILURE_WINDOW
+)
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0
+
+
+class HasherBusy(Exception):
+    """Too many password checks already queued"""
+
+
+class LoginThrottled(Exception):
+    """Too many failed logins for a username"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class _Metrics:
+    """Counters plus a window of recent hash latencies for percentiles"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._waits = deque(maxlen=window)
+        self.counts = {'verified': 0, 'rejected': 0, 'hashed': 0, 'busy': 0, 'throttled': 0}
+
+    def incr(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def observe(self, wait: float, latency: float):
+        with self._lock:
+            self._waits.append(wait)
+            self._latencies.append(latency)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            waits = sorted(self._waits)
+            counts = dict(self.counts)
+
+        def pct(values, p):
+            return round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 1) if values else None
+
+        return {
+            **counts,
+            'pending': _pending,
+            'workers': AUTH_HASH_WORKERS,
+            'max_pending': AUTH_HASH_MAX_PENDING,
+            'hash_ms': {'p50': pct(latencies, 0.5), 'p95': pct(latencies, 0.95), 'max': pct(latencies, 1.0)},
+            'queue_wait_ms': {'p50': pct(waits, 0.5), 'p95': pct(waits, 0.95), 'max': pct(waits, 1.0)}
+        }
+
+
+metrics = _Metrics()
+
+# username -> timestamps of recent failed logins (bounded, oldest usernames evicted)
+_failures = LRUDict(10000)
+
+
+async def _run(fn, *args):
+    """Run a bcrypt call in the pool, rejecting early when the queue is full"""
+    global _pending
+    if _pending >= AUTH_HASH_MAX_PENDING:
+        metrics.incr('busy')
+        raise HasherBusy()
+
+    _pending += 1
+    queued = time.perf_counter()
+    timing = {}
+
+    def timed():
+        timing['start'] = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            timing['end'] = time.perf_counter()
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, timed)
+    finally:
+        _pending -= 1
+        if 'end' in timing:
+            metrics.observe(timing['start'] - queued, timing['end'] - timing['start'])
+
+
+def check_throttle(username: str):
+    """Raise LoginThrottled if the username failed too often in the window"""
+    attempts = _failures.get(username.lower())
+    if not attempts:
+        return
+    cutoff = time.time() - AUTH_LOGIN_FAILURE_WINDOW
+    while attempts and attempts[0] < cutoff:
+        attempts.popleft()
+    if len(attempts) >= AUTH_LOGIN_MAX_FAILURES:
+        metrics.incr('throttled')
+        raise LoginThrottled(int(attempts[0] + AUTH_LOGIN_FAILURE_WINDOW - time.time()) + 1)
+
+
+def record_failure(username: str):
+    key = username.lower()
+    attempts = _failures.get(key)
+    if attempts is None:
+        attempts = deque(maxlen=AUTH_LOGIN_MAX_FAILURES)
+        _failures.set(key, attempts)
+    attempts.append(time.time())
+
+
+def record_success(username: str):
+    _failures.set(username.lower(), None)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    ok = await _run(bcrypt.checkpw, plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    metrics.incr('verified' if ok else 'rejected')
+    return ok
+
+
+async def hash_password(password: str) -> str:
+    hashed = await _run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt())
+    metrics.incr('hashed')
+    return hashed.decode('utf-8')
+
+
+def shutdown():
+    _executor.shutdown(wait=False)
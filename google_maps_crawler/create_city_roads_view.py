@@ -1,58 +1,38 @@
 #!/usr/bin/env python3
-"""Create the city_roads_simple materialized view"""
+"""Rebuild city_roads_simple (and the road statistics) for every state"""
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from scripts.database_config import execute_query, get_db_connection
-import psycopg2
+from scripts.database_config import execute_query, get_db_connection, notify_data_changed
+from app.database import road_stats
 
 def create_view():
-    """Create city_roads_simple materialized view"""
+    """Rebuild city_roads_simple - imports normally refresh only what changed (app/database/road_stats.py)"""
     
-    print("Creating city_roads_simple materialized view...")
+    print("Rebuilding city_roads_simple...")
     
     conn = None
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
         
-        # Drop if exists
-        print("Dropping existing view if any...")
-        cursor.execute("DROP MATERIALIZED VIEW IF EXISTS city_roads_simple CASCADE")
+        # Tables, indexes and refresh functions (migrates the old materialized view)
+        road_stats.ensure_schema(conn)
         
-        # Create the view
-        print("Creating materialized view...")
-        create_query = """
-        CREATE MATERIALIZED VIEW city_roads_simple AS
-        SELECT 
-            r.osm_id,
-            r.name as road_name,
-            r.highway,
-            r.ref,
-            rcm.city_name,
-            rcm.state_code,
-            r.county_fips
-        FROM osm_roads_main r
-        INNER JOIN road_city_mapping rcm ON r.id = rcm.road_id
-        WHERE r.name IS NOT NULL
-        """
-        cursor.execute(create_query)
+        states = [row['state_code'] for row in execute_query(
+            "SELECT DISTINCT state_code FROM road_city_mapping WHERE state_code IS NOT NULL ORDER BY state_code"
+        )]
+        road_stats.mark_states(conn, states)
         
-        # Create indexes
-        print("Creating indexes...")
-        cursor.execute("CREATE INDEX idx_city_roads_simple_city ON city_roads_simple(city_name, state_code)")
-        cursor.execute("CREATE INDEX idx_city_roads_simple_name ON city_roads_simple(road_name)")
-        cursor.execute("CREATE INDEX idx_city_roads_simple_state ON city_roads_simple(state_code)")
-        cursor.execute("CREATE INDEX idx_city_roads_simple_osm_id ON city_roads_simple(osm_id)")
+        # One transaction per state - the API keeps reading the old rows meanwhile
+        print(f"Refreshing {len(states)} states...")
+        road_stats.refresh_pending(conn)
         
-        # Analyze
-        print("Analyzing view...")
+        cursor = conn.cursor()
         cursor.execute("ANALYZE city_roads_simple")
-        
-        # Commit
         conn.commit()
+        notify_data_changed()
         
         # Get count
         cursor.execute("SELECT COUNT(*) as total_roads FROM city_roads_simple")
@@ -77,4 +57,4 @@ def create_view():
             conn.close()
 
 if __name__ == "__main__":
-    create_view()
\ No newline at end of file
+    create_view()
@@ -5,7 +5,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from scripts.database_config import execute_query, get_db_connection
+from scripts.database_config import execute_query, get_db_connection, notify_data_changed
 import psycopg2
 
 def create_view():
@@ -74,6 +74,7 @@ def create_view():
         
         # Commit
         conn.commit()
+        notify_data_changed()
         
         # Get count
         cursor.execute("SELECT COUNT(*) as total_roads FROM road_business_stats")
@@ -39,7 +39,7 @@ async def start_crawl(state_code: Optional[str] = None, limit: int = 10):
         if response.status_code == 200:
             result = response.json()
             print(f"\n{result['message']}")
-            print(f"Job IDs: {result['job_ids']}")
+            print(f"Queue: {result.get('queue')}")
         else:
             print(f"Error: {response.text}")
 
@@ -1,29 +1,18 @@
--- Create materialized view for fast city road queries
+-- Full rebuild of city_roads_simple (roads pre-joined to their city)
+-- city_roads_simple is a table refreshed per (state, county) by
+-- google_maps_crawler/app/database/schemas_road_stats.sql (install it with
+-- `python -m app.database.road_stats`), which also creates its indexes.
+-- After imports or a road_city_mapping run, refresh only what changed:
+--     SELECT refresh_road_stats();
+-- This script queues every state instead.
 
--- Drop if exists
-DROP MATERIALIZED VIEW IF EXISTS city_roads_simple CASCADE;
+SELECT mark_road_stats_dirty(state_code)
+FROM (SELECT DISTINCT state_code FROM road_city_mapping WHERE state_code IS NOT NULL) s;
 
--- Create simple materialized view with pre-joined data
-CREATE MATERIALIZED VIEW city_roads_simple AS
-SELECT 
-    r.osm_id,
-    r.name as road_name,
-    r.highway,
-    r.ref,
-    rcm.city_name,
-    rcm.state_code,
-    r.county_fips
-FROM osm_roads_main r
-INNER JOIN road_city_mapping rcm ON r.id = rcm.road_id
-WHERE r.name IS NOT NULL;
-
--- Create indexes for fast queries
-CREATE INDEX idx_city_roads_simple_city ON city_roads_simple(city_name, state_code);
-CREATE INDEX idx_city_roads_simple_name ON city_roads_simple(road_name);
-CREATE INDEX idx_city_roads_simple_state ON city_roads_simple(state_code);
+SELECT refresh_road_stats();
 
 -- Analyze for query planner
 ANALYZE city_roads_simple;
 
 -- Show row count
-SELECT COUNT(*) as total_roads FROM city_roads_simple;
\ No newline at end of file
+SELECT COUNT(*) as total_roads FROM city_roads_simple;
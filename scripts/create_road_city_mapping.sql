@@ -1,5 +1,7 @@
 -- Create a pre-calculated mapping table for roads to cities
 -- This is more efficient than doing spatial joins on the fly
+-- Full rebuilds: python -m app.database.road_city_mapping (google_maps_crawler/),
+-- which maps county by county across parallel connections and can resume
 
 -- First, create the mapping table
 CREATE TABLE IF NOT EXISTS road_city_mapping (
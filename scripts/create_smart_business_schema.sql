@@ -6,6 +6,9 @@
 -- DROP TABLE IF EXISTS osm_business_payments CASCADE;
 -- DROP TABLE IF EXISTS osm_business_tags CASCADE;
 
+-- Name similarity for matching Google results to POIs (app/crawler/osm_merge.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Main business table with extended fields
 CREATE TABLE IF NOT EXISTS osm_businesses (
     -- Primary key
@@ -1,13 +1,19 @@
 import os
+import threading
+import time
+import logging
+from collections import deque
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.pool import QueuePool
 import psycopg2
+from psycopg2 import extensions
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import PoolError
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database configuration
 DB_CONFIG = {
     'host': os.getenv('DB_HOST', 'localhost'),
@@ -20,19 +26,263 @@ DB_CONFIG = {
 # Connection string
 DATABASE_URL = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 
-# SQLAlchemy engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=int(os.getenv('DB_POOL_MIN', 10)),
-    max_overflow=int(os.getenv('DB_POOL_MAX', 50)),
-    pool_pre_ping=True,
-    echo=False
-)
+# Connection pool settings
+POOL_CONFIG = {
+    'minconn': int(os.getenv('DB_POOL_MIN', 2)),
+    'maxconn': int(os.getenv('DB_POOL_MAX', 20)),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),               # seconds to wait for a free connection
+    'health_check_after': float(os.getenv('DB_POOL_HEALTH_CHECK', 30)),  # ping connections idle longer than this
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', 3600)),   # recycle connections older than this
+}
+
+
+class PoolTimeout(PoolError):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class PooledConnection:
+    """
+    A psycopg2 connection checked out of the pool.
+    Behaves like the raw connection, except close() hands it back to the pool.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    @property
+    def raw(self):
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.putconn(self._conn)
+            self._conn = None
+
+    @property
+    def closed(self):
+        return self._conn is None or self._conn.closed
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # Settings like conn.autocommit must reach the psycopg2 connection
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        elif self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        else:
+            setattr(self._conn, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._conn is not None:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool.
+    - blocks (up to `timeout`) instead of failing when all connections are busy
+    - pings connections that sat idle for a while before handing them out
+    - recycles connections after `max_lifetime` seconds
+    """
+
+    def __init__(self, minconn=2, maxconn=20, timeout=30.0, health_check_after=30.0,
+                 max_lifetime=3600.0, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Invalid pool size: min={minconn}, max={maxconn}")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.max_lifetime = max_lifetime
+        self._connect_kwargs = connect_kwargs
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._idle = deque()      # (conn, created_at, last_used)
+        self._created_at = {}     # id(conn) -> created_at for checked out connections
+        self._closed = False
+        self._pid = os.getpid()
+
+        self._stats = {
+            'connections_opened': 0,
+            'connections_closed': 0,
+            'checkouts': 0,
+            'checkout_wait_seconds': 0.0,
+            'timeouts': 0,
+            'health_checks': 0,
+            'health_check_failures': 0,
+        }
+
+        for _ in range(minconn):
+            conn = self._connect()
+            self._idle.append((conn, time.monotonic(), time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._connect_kwargs)
+        self._stats['connections_opened'] += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            if not conn.closed:
+                conn.close()
+        except Exception:
+            pass
+        self._stats['connections_closed'] += 1
+
+    def _is_healthy(self, conn, created_at, last_used):
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if now - last_used < self.health_check_after:
+            return True
+
+        self._stats['health_checks'] += 1
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception as e:
+            self._stats['health_check_failures'] += 1
+            logger.warning(f"Dropping unhealthy pooled connection: {e}")
+            return False
+
+    def getconn(self):
+        """Check out a raw connection; must be returned with putconn()"""
+        if self._closed:
+            raise PoolError("connection pool is closed")
+
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            self._stats['timeouts'] += 1
+            raise PoolTimeout(f"Timed out after {self.timeout}s waiting for a database connection")
+
+        try:
+            while True:
+                with self._lock:
+                    entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    conn, created_at = self._connect(), time.monotonic()
+                    break
+                conn, created_at, last_used = entry
+                if self._is_healthy(conn, created_at, last_used):
+                    break
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._created_at[id(conn)] = created_at
+            self._stats['checkouts'] += 1
+            self._stats['checkout_wait_seconds'] += time.monotonic() - started
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool (rolls back any open transaction)"""
+        with self._lock:
+            created_at = self._created_at.pop(id(conn), None)
+        if created_at is None:
+            raise PoolError("trying to put a connection that is not checked out of this pool")
+
+        try:
+            if not close and not conn.closed:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+                with self._lock:
+                    if not self._closed and len(self._idle) < self.maxconn:
+                        self._idle.append((conn, created_at, time.monotonic()))
+                        return
+            self._discard(conn)
+        except Exception as e:
+            logger.warning(f"Discarding broken pooled connection: {e}")
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def connection(self):
+        """Check out a connection wrapped so that close() returns it to the pool"""
+        return PooledConnection(self, self.getconn())
+
+    def closeall(self):
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            in_use = len(self._created_at)
+            idle = len(self._idle)
+            stats = dict(self._stats)
+        checkouts = stats['checkouts']
+        stats.update({
+            'min_size': self.minconn,
+            'max_size': self.maxconn,
+            'in_use': in_use,
+            'idle': idle,
+            'size': in_use + idle,
+            'avg_checkout_wait_ms': round(stats.pop('checkout_wait_seconds') / checkouts * 1000, 3) if checkouts else 0.0,
+        })
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Get the process-wide connection pool, creating it on first use"""
+    global _pool
+    # Forked workers must not share sockets with the parent
+    if _pool is None or _pool._pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool._pid != os.getpid():
+                _pool = ConnectionPool(**POOL_CONFIG, **DB_CONFIG)
+                logger.info(f"Database pool created (min={_pool.minconn}, max={_pool.maxconn})")
+    return _pool
+
+
+def close_pool():
+    """Close all pooled connections (call on shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+def get_pool_stats():
+    """Get connection pool statistics"""
+    if _pool is None:
+        return {'status': 'not_initialized'}
+    return _pool.stats()
+
 
 def get_db_connection():
-    """Get a database connection using psycopg2"""
-    return psycopg2.connect(**DB_CONFIG)
+    """Get a pooled database connection; close() returns it to the pool"""
+    return get_pool().connection()
 
 def get_db_cursor():
     """Get a database cursor with RealDictCursor for dict-like results"""
@@ -45,7 +295,7 @@ def execute_query(query, params=None, fetch_one=False):
     try:
         conn, cursor = get_db_cursor()
         cursor.execute(query, params)
-        
+
         if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')):
             conn.commit()
             return cursor.rowcount
@@ -62,6 +312,22 @@ def execute_query(query, params=None, fetch_one=False):
         if conn:
             conn.close()
 
+def notify_data_changed(tags=('osm',)):
+    """
+    Tell the crawler API that imported data changed so it drops cached responses
+    Best effort - an API that isn't running has nothing cached
+    """
+    from urllib.parse import urlencode
+    from urllib.request import Request, urlopen
+
+    api_url = os.getenv('CRAWLER_API_URL', 'http://localhost:8000')
+    url = f"{api_url}/api/cache/invalidate?{urlencode([('tags', t) for t in tags])}"
+    try:
+        urlopen(Request(url, method='POST'), timeout=5).close()
+        logger.info(f"Invalidated API cache: {', '.join(tags)}")
+    except Exception as e:
+        logger.warning(f"Could not invalidate API cache at {api_url}: {e}")
+
 def test_connection():
     """Test database connection"""
     try:
@@ -75,7 +341,8 @@ def test_connection():
         return {
             'status': 'connected',
             'postgres_version': version[0],
-            'postgis_version': postgis_version[0]
+            'postgis_version': postgis_version[0],
+            'pool': get_pool_stats()
         }
     except Exception as e:
         return {
@@ -91,5 +358,6 @@ if __name__ == "__main__":
     if result['status'] == 'connected':
         print(f"PostgreSQL: {result['postgres_version']}")
         print(f"PostGIS: {result['postgis_version']}")
+        print(f"Pool: {result['pool']}")
     else:
-        print(f"Error: {result['error']}")
\ No newline at end of file
+        print(f"Error: {result['error']}")
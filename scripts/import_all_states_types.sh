@@ -74,7 +74,9 @@ EXISTING=$(docker exec roads-postgres psql -U postgres -d roads_db -t -c "
 echo "Already imported: $EXISTING"
 echo ""
 
-# Process each state
+# Collect the states to import
+TASKS=()
+TODO_STATES=()
 for state_pair in "${STATES[@]}"; do
     IFS=':' read -r state_name STATE_CODE <<< "$state_pair"
     
@@ -93,8 +95,6 @@ for state_pair in "${STATES[@]}"; do
         continue
     fi
     
-    echo -e "${GREEN}Processing $STATE_CODE ($state_name)...${NC}"
-    
     # Check if state has roads before processing
     ROAD_COUNT=$(docker exec roads-postgres psql -U postgres -d roads_db -t -c "
         SELECT COUNT(*) FROM osm_roads_main WHERE state_code = '$STATE_CODE'
@@ -105,33 +105,42 @@ for state_pair in "${STATES[@]}"; do
         continue
     fi
     
-    # 1. Import POI types
-    echo "  → Importing POIs..."
-    if docker exec osm-python python3 /scripts/import_poi_types_only.py "$STATE_CODE" "$CONTAINER_FILE"; then
+    TASKS+=("$STATE_CODE:$CONTAINER_FILE")
+    TODO_STATES+=("$STATE_CODE")
+done
+
+# 1. Import POIs for all states at once (one worker process per file, resumable)
+if [ ${#TASKS[@]} -gt 0 ]; then
+    echo -e "${GREEN}Importing POIs for ${#TASKS[@]} states...${NC}"
+    docker exec osm-python python3 /scripts/import_poi_types_parallel.py \
+        --workers "${IMPORT_WORKERS:-4}" --defer-indexes "${TASKS[@]}" \
+        || echo -e "${RED}❌ Some imports failed - rerun to retry them${NC}"
+    echo ""
+fi
+
+# assign_nearest_roads() and its pending marker (the API doesn't install them)
+docker exec -i roads-postgres psql -U postgres -d roads_db \
+    < "$(dirname "$0")/../google_maps_crawler/app/database/schemas_nearest_road.sql"
+
+# Process each imported state
+for STATE_CODE in "${TODO_STATES[@]}"; do
+    echo -e "${GREEN}Processing $STATE_CODE...${NC}"
+    
+    IMPORTED=$(docker exec roads-postgres psql -U postgres -d roads_db -t -c "
+        SELECT COUNT(*) FROM poi_import_progress
+        WHERE state_code = '$STATE_CODE' AND status = 'done'
+    " | tr -d ' ')
+    
+    if [ "$IMPORTED" -gt "0" ]; then
         
         # 2. Map to roads
         echo "  → Mapping to roads..."
         # Create temporary SQL with state code embedded
         cat > /tmp/map_${STATE_CODE}.sql << EOF
 -- Map POIs to roads for $STATE_CODE
-UPDATE osm_businesses b
-SET nearest_road_id = sub.road_id
-FROM (
-    SELECT DISTINCT ON (b.osm_id)
-        b.osm_id,
-        r.osm_id as road_id
-    FROM osm_businesses b
-    CROSS JOIN LATERAL (
-        SELECT osm_id
-        FROM osm_roads_main r
-        WHERE r.state_code = b.state_code
-        ORDER BY r.geometry <-> b.geometry
-        LIMIT 1
-    ) r
-    WHERE b.state_code = '$STATE_CODE'
-    AND b.nearest_road_id IS NULL
-) sub
-WHERE b.osm_id = sub.osm_id;
+-- Nearest named road + distance for new/moved POIs
+-- (google_maps_crawler/app/database/schemas_nearest_road.sql)
+SELECT pois as assigned_pois FROM assign_nearest_roads('$STATE_CODE', 2147483647);
 
 -- Show results
 SELECT 
@@ -146,13 +155,16 @@ EOF
         docker exec roads-postgres psql -U postgres -d roads_db -f /tmp/map_${STATE_CODE}.sql
         rm -f /tmp/map_${STATE_CODE}.sql
         
+        # 3. Rebuild per-road POI aggregates (google_maps_crawler/app/database/schemas_road_poi_aggregate.sql)
+        echo "  → Refreshing road POI aggregates..."
+        docker exec roads-postgres psql -U postgres -d roads_db -c "SELECT refresh_road_poi_aggregate('$STATE_CODE')"
+        
         echo -e "${GREEN}✅ $STATE_CODE complete${NC}"
     else
         echo -e "${RED}❌ $STATE_CODE import failed${NC}"
     fi
     
     echo ""
-    sleep 1  # Small pause between states
 done
 
 # Map the 3 states that have POIs but are not mapped yet
@@ -161,30 +173,15 @@ for state in MI MD MA; do
     # Check if state has POIs and unmapped ones
     UNMAPPED=$(docker exec roads-postgres psql -U postgres -d roads_db -t -c "
         SELECT COUNT(*) FROM osm_businesses 
-        WHERE state_code = '$state' AND nearest_road_id IS NULL
+        WHERE state_code = '$state' AND nearest_road_checked_at IS NULL
     " | tr -d ' ')
     
     if [ "$UNMAPPED" -gt "0" ]; then
         echo "  → Mapping $state ($UNMAPPED unmapped POIs)..."
         cat > /tmp/map_${state}.sql << EOF
-UPDATE osm_businesses b
-SET nearest_road_id = sub.road_id
-FROM (
-    SELECT DISTINCT ON (b.osm_id)
-        b.osm_id,
-        r.osm_id as road_id
-    FROM osm_businesses b
-    CROSS JOIN LATERAL (
-        SELECT osm_id
-        FROM osm_roads_main r
-        WHERE r.state_code = b.state_code
-        ORDER BY r.geometry <-> b.geometry
-        LIMIT 1
-    ) r
-    WHERE b.state_code = '$state'
-    AND b.nearest_road_id IS NULL
-) sub
-WHERE b.osm_id = sub.osm_id;
+-- Nearest named road + distance for new/moved POIs
+-- (google_maps_crawler/app/database/schemas_nearest_road.sql)
+SELECT pois as assigned_pois FROM assign_nearest_roads('$state', 2147483647);
 
 SELECT 
     'State: $state' as info,
@@ -197,6 +194,7 @@ EOF
         docker cp /tmp/map_${state}.sql roads-postgres:/tmp/
         docker exec roads-postgres psql -U postgres -d roads_db -f /tmp/map_${state}.sql
         rm -f /tmp/map_${state}.sql
+        docker exec roads-postgres psql -U postgres -d roads_db -c "SELECT refresh_road_poi_aggregate('$state')"
     fi
 done
 
@@ -8,6 +8,34 @@ import psycopg2
 from psycopg2.extras import execute_batch
 import sys
 
+# Commercial types only (checked in this order)
+COMMERCIAL_TYPES = ('shop', 'amenity', 'tourism', 'office', 'craft', 'healthcare')
+
+# Skip these amenities
+SKIP_AMENITIES = {
+    'parking', 'parking_space', 'bicycle_parking', 'bench', 
+    'waste_basket', 'toilets', 'drinking_water', 'fountain'
+}
+
+def classify(tags):
+    """(business_type, business_subtype) of a commercial POI, else None"""
+    # Must have name to be a real business
+    if 'name' not in tags:
+        return None
+        
+    for biz_type in COMMERCIAL_TYPES:
+        biz_subtype = tags.get(biz_type)
+        if biz_subtype is not None:
+            break
+    else:
+        return None
+        
+    # Skip non-commercial
+    if biz_type == 'amenity' and biz_subtype in SKIP_AMENITIES:
+        return None
+        
+    return biz_type, biz_subtype
+
 class TypeOnlyHandler(osmium.SimpleHandler):
     def __init__(self, conn, state_code):
         super().__init__()
@@ -17,39 +45,12 @@ class TypeOnlyHandler(osmium.SimpleHandler):
         self.batch_size = 10000  # Larger batch for speed
         self.count = 0
         
-        # Commercial types only
-        self.commercial = {'shop', 'amenity', 'tourism', 'office', 'craft', 'healthcare'}
-        
-        # Skip these amenities
-        self.skip = {
-            'parking', 'parking_space', 'bicycle_parking', 'bench', 
-            'waste_basket', 'toilets', 'drinking_water', 'fountain'
-        }
-        
     def node(self, n):
-        tags = dict(n.tags)
-        
-        # Must have name to be a real business
-        if 'name' not in tags:
+        poi_type = classify(n.tags)
+        if not poi_type:
             return
-            
-        # Find type
-        biz_type = None
-        biz_subtype = None
+        biz_type, biz_subtype = poi_type
         
-        for t in self.commercial:
-            if t in tags:
-                biz_type = t
-                biz_subtype = tags[t]
-                break
-                
-        if not biz_type:
-            return
-            
-        # Skip non-commercial
-        if biz_type == 'amenity' and biz_subtype in self.skip:
-            return
-            
         # Simple record - only essentials (truncate to fit columns)
         self.batch.append((
             n.id,  # osm_id
@@ -132,7 +133,8 @@ def main():
     print(f"Importing {state_code} (types only)...")
     
     handler = TypeOnlyHandler(conn, state_code)
-    handler.apply_file(osm_file, locations=True)
+    # Nodes carry their own coordinates - no location index needed
+    handler.apply_file(osm_file)
     handler.close()
     
     # Summary
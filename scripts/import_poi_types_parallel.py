@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Parallel POI import - business type and subtype for many states at once
+Each STATE:FILE (a state's PBF, or one of its osmium-split regions) is a task
+for a process pool. A worker streams the commercial POIs of its file through
+COPY into an index-less temp table and merges that into osm_businesses in one
+statement, committing the file's rows and its poi_import_progress entry
+together - a rerun skips files that finished (unless they changed on disk).
+
+With --defer-indexes the secondary indexes of osm_businesses are dropped for
+the import and rebuilt in parallel at the end. Their definitions are kept in
+poi_import_deferred_indexes, so an interrupted run restores them next time.
+
+Usage (inside the osm-python container):
+    python3 /scripts/import_poi_types_parallel.py AL:/data/alabama-latest.osm.pbf GA:/data/georgia-latest.osm.pbf
+    python3 /scripts/import_poi_types_parallel.py --workers 6 --defer-indexes CA:/data/ca-1.osm.pbf CA:/data/ca-2.osm.pbf
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import osmium
+import psycopg2
+
+from import_poi_types_only import classify
+
+DB_PARAMS = {
+    'host': os.getenv('DB_HOST', 'roads-postgres'),
+    'port': os.getenv('DB_PORT', '5432'),
+    'database': os.getenv('DB_NAME', 'roads_db'),
+    'user': os.getenv('DB_USER', 'postgres'),
+    'password': os.getenv('DB_PASSWORD', 'roadsdb2024secure'),
+}
+
+COPY_ROWS = 100000       # rows buffered per COPY
+PROGRESS_EVERY = 250000  # POIs between progress lines
+
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS poi_import_progress (
+        source_file TEXT PRIMARY KEY,
+        state_code VARCHAR(2) NOT NULL,
+        file_size BIGINT,
+        file_mtime DOUBLE PRECISION,
+        status VARCHAR(10) NOT NULL,     -- running | done | failed
+        pois BIGINT,
+        inserted BIGINT,
+        error TEXT,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS poi_import_deferred_indexes (
+        index_name TEXT PRIMARY KEY,
+        definition TEXT NOT NULL
+    );
+"""
+
+
+def connect():
+    # A commit lost in a crash only means re-importing that file
+    return psycopg2.connect(**DB_PARAMS, options='-c synchronous_commit=off')
+
+
+def _copy_text(value):
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class CopyHandler(osmium.SimpleHandler):
+    """Streams commercial POI nodes into a COPY buffer"""
+
+    def __init__(self, cur, state_code):
+        super().__init__()
+        self.cur = cur
+        self.state_code = state_code
+        self.buffer = io.StringIO()
+        self.buffered = 0
+        self.count = 0
+        self.started = time.time()
+
+    def node(self, n):
+        poi_type = classify(n.tags)
+        if not poi_type:
+            return
+        biz_type, biz_subtype = poi_type
+
+        # Truncate to fit columns
+        self.buffer.write(
+            f"{n.id}\t{_copy_text(biz_type[:20])}\t{_copy_text(biz_subtype[:50])}\t"
+            f"{n.location.lon}\t{n.location.lat}\n"
+        )
+        self.buffered += 1
+        self.count += 1
+
+        if self.buffered >= COPY_ROWS:
+            self.flush()
+
+        if self.count % PROGRESS_EVERY == 0:
+            rate = self.count / max(time.time() - self.started, 0.001)
+            print(f"[{self.state_code}] {self.count:,} POIs ({rate:,.0f}/s)", flush=True)
+
+    def flush(self):
+        if not self.buffered:
+            return
+        self.buffer.seek(0)
+        self.cur.copy_expert(
+            "COPY poi_stage (osm_id, business_type, business_subtype, lon, lat) FROM STDIN",
+            self.buffer
+        )
+        self.buffer = io.StringIO()
+        self.buffered = 0
+
+
+def import_file(state_code, osm_file):
+    """Import one file (runs in a pool worker); returns a result dict"""
+    started = time.time()
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        stat = os.stat(osm_file)
+        cur.execute("""
+            INSERT INTO poi_import_progress (source_file, state_code, file_size, file_mtime, status, started_at)
+            VALUES (%s, %s, %s, %s, 'running', NOW())
+            ON CONFLICT (source_file) DO UPDATE SET
+                state_code = EXCLUDED.state_code,
+                file_size = EXCLUDED.file_size,
+                file_mtime = EXCLUDED.file_mtime,
+                status = 'running',
+                error = NULL,
+                started_at = EXCLUDED.started_at,
+                finished_at = NULL
+        """, (osm_file, state_code, stat.st_size, stat.st_mtime))
+        conn.commit()
+
+        # No indexes or constraints while loading; dropped with the session
+        cur.execute("""
+            CREATE TEMP TABLE poi_stage (
+                osm_id BIGINT,
+                business_type VARCHAR(20),
+                business_subtype VARCHAR(50),
+                lon DOUBLE PRECISION,
+                lat DOUBLE PRECISION
+            )
+        """)
+
+        handler = CopyHandler(cur, state_code)
+        # Nodes carry their own coordinates - no location index needed
+        handler.apply_file(osm_file)
+        handler.flush()
+
+        cur.execute("""
+            INSERT INTO osm_businesses (
+                osm_id, osm_type, business_type, business_subtype,
+                geometry, state_code, name
+            )
+            SELECT
+                osm_id, 'node', business_type, business_subtype,
+                ST_SetSRID(ST_MakePoint(lon, lat), 4326),
+                %s, ''
+            FROM poi_stage
+            ON CONFLICT (osm_id) DO NOTHING
+        """, (state_code,))
+        inserted = cur.rowcount
+
+        cur.execute("""
+            UPDATE poi_import_progress
+            SET status = 'done', pois = %s, inserted = %s, finished_at = NOW()
+            WHERE source_file = %s
+        """, (handler.count, inserted, osm_file))
+        conn.commit()
+
+        return {'state_code': state_code, 'file': osm_file, 'pois': handler.count,
+                'inserted': inserted, 'seconds': time.time() - started}
+
+    except Exception as e:
+        conn.rollback()
+        cur.execute(
+            "UPDATE poi_import_progress SET status = 'failed', error = %s, finished_at = NOW() WHERE source_file = %s",
+            (str(e), osm_file)
+        )
+        conn.commit()
+        return {'state_code': state_code, 'file': osm_file, 'error': str(e), 'seconds': time.time() - started}
+    finally:
+        conn.close()
+
+
+def pending_tasks(conn, tasks, force=False):
+    """Drop tasks whose file was already imported and hasn't changed since"""
+    if force:
+        return tasks
+    cur = conn.cursor()
+    cur.execute("SELECT source_file, file_size, file_mtime FROM poi_import_progress WHERE status = 'done'")
+    done = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+    pending = []
+    for state_code, osm_file in tasks:
+        stat = os.stat(osm_file)
+        if done.get(osm_file) == (stat.st_size, stat.st_mtime):
+            print(f"⏭️  {state_code} {osm_file} already imported")
+            continue
+        pending.append((state_code, osm_file))
+    return pending
+
+
+def defer_indexes(conn):
+    """Remember and drop the non-unique indexes of osm_businesses"""
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO poi_import_deferred_indexes (index_name, definition)
+        SELECT c.relname, pg_get_indexdef(x.indexrelid)
+        FROM pg_index x
+        JOIN pg_class c ON c.oid = x.indexrelid
+        -- ON CONFLICT (osm_id) needs the unique ones
+        WHERE x.indrelid = 'osm_businesses'::regclass AND NOT x.indisunique
+        ON CONFLICT (index_name) DO NOTHING
+        RETURNING index_name
+    """)
+    names = [row[0] for row in cur.fetchall()]
+    for name in names:
+        cur.execute(f'DROP INDEX IF EXISTS "{name}"')
+    conn.commit()
+    if names:
+        print(f"Deferred {len(names)} osm_businesses indexes until the import finishes")
+
+
+def create_deferred_index(index_name, definition):
+    conn = connect()
+    try:
+        started = time.time()
+        cur = conn.cursor()
+        cur.execute(definition.replace('CREATE INDEX ', 'CREATE INDEX IF NOT EXISTS ', 1))
+        cur.execute("DELETE FROM poi_import_deferred_indexes WHERE index_name = %s", (index_name,))
+        conn.commit()
+        return index_name, time.time() - started
+    finally:
+        conn.close()
+
+
+def restore_indexes(conn, pool):
+    """Rebuild deferred indexes, several at a time"""
+    cur = conn.cursor()
+    cur.execute("SELECT index_name, definition FROM poi_import_deferred_indexes ORDER BY index_name")
+    deferred = cur.fetchall()
+    if not deferred:
+        return
+    print(f"Rebuilding {len(deferred)} osm_businesses indexes...")
+    futures = [pool.submit(create_deferred_index, name, definition) for name, definition in deferred]
+    for future in as_completed(futures):
+        name, seconds = future.result()
+        print(f"  ✓ {name} ({seconds:.0f}s)")
+
+
+def parse_task(value):
+    state_code, sep, osm_file = value.partition(':')
+    if not sep or len(state_code) != 2 or not osm_file:
+        raise argparse.ArgumentTypeError(f"expected STATE:FILE, got {value!r}")
+    return state_code.upper(), osm_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import POI types from many PBF files in parallel")
+    parser.add_argument('tasks', nargs='+', type=parse_task, metavar='STATE:FILE')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--defer-indexes', action='store_true',
+                        help="Drop secondary osm_businesses indexes during the import, rebuild at the end")
+    parser.add_argument('--force', action='store_true', help="Re-import files that already finished")
+    args = parser.parse_args()
+
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute(SCHEMA_SQL)
+    conn.commit()
+
+    tasks = pending_tasks(conn, args.tasks, args.force)
+    # Largest files first so one big state doesn't finish alone at the end
+    tasks.sort(key=lambda task: os.path.getsize(task[1]), reverse=True)
+
+    failed = []
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        if tasks:
+            if args.defer_indexes:
+                defer_indexes(conn)
+
+            print(f"Importing {len(tasks)} files with {args.workers} workers...")
+            futures = {pool.submit(import_file, state_code, osm_file): (state_code, osm_file)
+                       for state_code, osm_file in tasks}
+            for finished, future in enumerate(as_completed(futures), 1):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    state_code, osm_file = futures[future]
+                    result = {'state_code': state_code, 'file': osm_file, 'error': str(e)}
+                if 'error' in result:
+                    failed.append(result)
+                    print(f"❌ [{finished}/{len(tasks)}] {result['state_code']} {result['file']}: {result['error']}", flush=True)
+                else:
+                    print(
+                        f"✓ [{finished}/{len(tasks)}] {result['state_code']}: {result['pois']:,} POIs, "
+                        f"{result['inserted']:,} new ({result['seconds']:.0f}s)",
+                        flush=True
+                    )
+
+        # Also finishes what an interrupted run left behind
+        restore_indexes(conn, pool)
+
+    if tasks:
+        cur.execute("ANALYZE osm_businesses")
+        conn.commit()
+    conn.close()
+
+    print(f"\nDone in {time.time() - started:.0f}s: {len(tasks) - len(failed)} imported, {len(failed)} failed")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 -- Optimize search performance for road queries
 
--- 1. Ensure materialized view exists and is refreshed
-REFRESH MATERIALIZED VIEW CONCURRENTLY city_roads_simple;
+-- 1. Bring city_roads_simple up to date (it is a table refreshed per partition,
+--    see google_maps_crawler/app/database/schemas_road_stats.sql)
+SELECT refresh_road_stats();
 
 -- 2. Create optimized indexes if not exists
 CREATE EXTENSION IF NOT EXISTS pg_trgm; -- For text search
@@ -49,41 +49,9 @@ LEFT JOIN osm_businesses b ON ST_DWithin(
 )
 GROUP BY rcm.city_name, rcm.state_code, r.highway;
 
--- 4. Create materialized view: osm_road_stats
-CREATE MATERIALIZED VIEW osm_road_stats AS
-SELECT 
-    state_code,
-    COUNT(*) as total_roads,
-    COUNT(DISTINCT osm_id) as unique_osm_ids,
-    COUNT(name) as roads_with_names,
-    COUNT(DISTINCT highway) as highway_types,
-    MIN(imported_at) as first_import,
-    MAX(imported_at) as last_import
-FROM osm_roads_main
-GROUP BY state_code;
-
--- Create index on materialized view
-CREATE INDEX idx_osm_road_stats_state ON osm_road_stats(state_code);
-
--- 5. Create materialized view: osm_road_stats_by_state
-CREATE MATERIALIZED VIEW osm_road_stats_by_state AS
-SELECT 
-    state_code,
-    highway,
-    COUNT(*) as road_count,
-    COUNT(name) as named_roads,
-    ROUND((COUNT(name)::numeric / COUNT(*)) * 100, 2) as named_percentage
-FROM osm_roads_main
-GROUP BY state_code, highway
-ORDER BY state_code, road_count DESC;
-
--- Create indexes
-CREATE INDEX idx_osm_road_stats_by_state_state ON osm_road_stats_by_state(state_code);
-CREATE INDEX idx_osm_road_stats_by_state_highway ON osm_road_stats_by_state(highway);
-
--- Refresh materialized views with data
-REFRESH MATERIALIZED VIEW osm_road_stats;
-REFRESH MATERIALIZED VIEW osm_road_stats_by_state;
+-- 4/5. osm_road_stats and osm_road_stats_by_state are views over road_stats_county
+-- (google_maps_crawler/app/database/schemas_road_stats.sql); just bring them up to date
+SELECT refresh_road_stats();
 
 -- Show results
 \echo 'Views and materialized views recreated successfully!'
@@ -95,12 +63,12 @@ WHERE viewname IN ('roads_in_target_cities', 'road_business_with_city', 'road_bu
 ORDER BY viewname;
 
 \echo ''
-\echo 'Checking materialized views:'
-SELECT schemaname, matviewname, matviewowner 
-FROM pg_matviews 
-WHERE matviewname IN ('osm_road_stats', 'osm_road_stats_by_state')
-ORDER BY matviewname;
+\echo 'Checking road stats views:'
+SELECT schemaname, viewname, viewowner 
+FROM pg_views 
+WHERE viewname IN ('osm_road_stats', 'osm_road_stats_by_state')
+ORDER BY viewname;
 
 \echo ''
-\echo 'Sample data from osm_road_stats:'
-SELECT * FROM osm_road_stats ORDER BY total_roads DESC LIMIT 5;
\ No newline at end of file
+\echo 'Sample data from osm_road_stats_by_state:'
+SELECT * FROM osm_road_stats_by_state ORDER BY total_segments DESC LIMIT 5;
\ No newline at end of file
@@ -1,4 +1,6 @@
 -- Script to run mapping state by state, skipping completed ones
+-- For full rebuilds prefer the parallel, resumable driver:
+--     cd google_maps_crawler && python -m app.database.road_city_mapping --workers 8
 
 -- First check what's already done
 WITH mapping_status AS (